@@ -0,0 +1,17 @@
+# agents/__init__.py
+"""
+Lazy agent registry: `get_agent("topic_scout")` builds the agent (importing crewai and
+creating its LLM) on first use; later calls return the same agent.
+`from agents.topic_scout import topic_scout` still works and goes through the registry.
+"""
+
+from utils.lazy_registry import LazyRegistry
+
+registry = LazyRegistry({
+    "content_planner": "agents.content_planner:build",
+    "seo_optimiser": "agents.seo_optimiser:build",
+    "topic_scout": "agents.topic_scout:build",
+    "visual_artist": "agents.visual_artist:build",
+})
+
+get_agent = registry.get
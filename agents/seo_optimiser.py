@@ -1,7 +1,4 @@
-from crewai import Agent
-from llm_factory import get_default_llm
-
-planner_llm = get_default_llm()
+from agents import registry
 
 
 
@@ -77,15 +74,21 @@ SEO ENHANCEMENT RULES (MANDATORY):
 
 
 
-seo_optimiser = Agent(
-    role="SEO Blog Writer",
-    goal="Write deeply helpful Salesforce articles in a friendly, beginner-focused style with images.",
-    backstory=(
-        "You are an expert Salesforce content creator writing for The Technology Fiction. "
-        "Your writing style mirrors Harsh Veer Nirwan's real blog: structured, visual, simple."
-    ),
-    llm=planner_llm,
-    verbose=True,
-    prompt=SEO_WRITER_PROMPT
-)
+def build():
+    from crewai import Agent
+    from llm_factory import get_llm_for
+
+    return Agent(
+        role="SEO Blog Writer",
+        goal="Write deeply helpful Salesforce articles in a friendly, beginner-focused style with images.",
+        backstory=(
+            "You are an expert Salesforce content creator writing for The Technology Fiction. "
+            "Your writing style mirrors Harsh Veer Nirwan's real blog: structured, visual, simple."
+        ),
+        llm=get_llm_for("seo_optimiser"),
+        verbose=True,
+        prompt=SEO_WRITER_PROMPT
+    )
+
 
+__getattr__ = registry.module_getattr("seo_optimiser")
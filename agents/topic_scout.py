@@ -1,10 +1,6 @@
 # agents/topic_scout.py
 
-from crewai import Agent
-from tools.search_tools import web_search  # assuming you already created this tool
-from llm_factory import get_default_llm
-
-planner_llm = get_default_llm()
+from agents import registry
 
 SALESFORCE_CONTENT_PILLARS = [
     "Apex Triggers interview questions and best practices",
@@ -25,28 +21,33 @@ SALESFORCE_CONTENT_PILLARS = [
 ]
 
 
-topic_scout = Agent(
-    role="Salesforce Topic Scout",
-    goal=(
-        "Pick ONE Salesforce blog topic per run that is interview-focused and SEO-worthy. "
-        "Prefer topics commonly asked in MNC interviews (Accenture, Deloitte, TCS, Infosys, "
-        "Wipro, Cognizant, Capgemini, Persistent)."
-    ),
-    backstory=(
-        "You are a senior Salesforce interview content strategist for The Technology Fiction (TechFi Labs). "
-        "You MUST pick topics based on the provided Salesforce content pillars. "
-        "Your output MUST be strictly valid JSON only.\n\n"
-
-        "IMPORTANT RULES:\n"
-        "1) Choose from SALESFORCE_CONTENT_PILLARS (or a very close variation).\n"
-        "2) Create a click-worthy blog title aligned to real interview questions/scenarios.\n"
-        "3) If doing 'news', only use the latest Salesforce release (avoid old releases unless explicitly asked).\n"
-        "4) Never include random strings or extra keys; return only the required JSON object.\n"
-    ),
-    llm=planner_llm,
-    tools=[web_search],
-    verbose=True,
-)
-
-
-
+def build():
+    from crewai import Agent
+    from llm_factory import get_llm_for
+    from tools import get_tool
+
+    return Agent(
+        role="Salesforce Topic Scout",
+        goal=(
+            "Pick ONE Salesforce blog topic per run that is interview-focused and SEO-worthy. "
+            "Prefer topics commonly asked in MNC interviews (Accenture, Deloitte, TCS, Infosys, "
+            "Wipro, Cognizant, Capgemini, Persistent)."
+        ),
+        backstory=(
+            "You are a senior Salesforce interview content strategist for The Technology Fiction (TechFi Labs). "
+            "You MUST pick topics based on the provided Salesforce content pillars. "
+            "Your output MUST be strictly valid JSON only.\n\n"
+
+            "IMPORTANT RULES:\n"
+            "1) Choose from SALESFORCE_CONTENT_PILLARS (or a very close variation).\n"
+            "2) Create a click-worthy blog title aligned to real interview questions/scenarios.\n"
+            "3) If doing 'news', only use the latest Salesforce release (avoid old releases unless explicitly asked).\n"
+            "4) Never include random strings or extra keys; return only the required JSON object.\n"
+        ),
+        llm=get_llm_for("topic_scout"),
+        tools=[get_tool("web_search")],
+        verbose=True,
+    )
+
+
+__getattr__ = registry.module_getattr("topic_scout")
@@ -1,13 +1,18 @@
-from crewai import Agent
-from llm_factory import get_default_llm
-
-planner_llm = get_default_llm()
-
-visual_artist = Agent(
-    role="Visual Artist",
-    goal="Generate clean, professional images that enhance Salesforce blogs.",
-    backstory="You create minimalistic illustrations and diagrams.",
-    verbose=True,
-    #llm="gpt-4.1-mini"
-    llm=planner_llm
-)
+from agents import registry
+
+
+def build():
+    from crewai import Agent
+    from llm_factory import get_llm_for
+
+    return Agent(
+        role="Visual Artist",
+        goal="Generate clean, professional images that enhance Salesforce blogs.",
+        backstory="You create minimalistic illustrations and diagrams.",
+        verbose=True,
+        #llm="gpt-4.1-mini"
+        llm=get_llm_for("visual_artist"),
+    )
+
+
+__getattr__ = registry.module_getattr("visual_artist")
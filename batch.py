@@ -0,0 +1,158 @@
+# batch.py
+"""
+Batch mode: several articles per process, written concurrently.
+
+    python main.py --batch 3                   # Topic Scout picks 3 different topics
+    python main.py --topics-file topics.txt    # "topic | main keyword" per line (or a JSON list)
+    python main.py --resume <batch-id>         # re-run the articles that didn't get posted
+
+- The agents in agents/* are built once. Each worker thread runs the pipeline with
+  its own copies of them (main.use_agent_copies); the copies share the LLM objects,
+  so HTTP pools, caches, provider rate limits and metrics are shared by the whole batch.
+- Topics are picked one after another (each pick excludes the earlier ones) while the
+  first articles are already being written.
+- Every article is a normal checkpointed run: data/runs/<batch-id>-NN/
+- data/runs/<batch-id>/manifest.json: one entry per article, rewritten as each one
+  finishes (status, post id, link, seconds, error). Trace + LLM metrics go next to it.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import settings
+from utils.run_checkpoint import RunCheckpoint
+
+
+def is_batch(run_id: str) -> bool:
+    return (Path(settings.RUNS_DIR) / run_id / "manifest.json").exists()
+
+
+def new_batch() -> RunCheckpoint:
+    return RunCheckpoint(f"batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+
+def load_topics_file(path: str) -> list[tuple[str, str]]:
+    """(topic, main_keyword) pairs from a JSON list or "topic | keyword" lines (# comments)."""
+    text = Path(path).read_text(encoding="utf-8")
+    if path.endswith(".json"):
+        return [(t["topic"], t.get("main_keyword") or t["topic"]) for t in json.loads(text)]
+
+    items = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        topic, _, keyword = line.partition("|")
+        items.append((topic.strip(), keyword.strip() or topic.strip()))
+    return items
+
+
+def pick_topics(count: int):
+    """Yield `count` different (topic, main_keyword) pairs from the Topic Scout."""
+    import main as pipeline
+
+    taken: list[str] = []
+    for _ in range(count):
+        topic, main_keyword = pipeline.pick_salesforce_topic_for_today(exclude=taken)
+        taken.append(topic)
+        yield topic, main_keyword
+
+
+class BatchRun:
+    def __init__(self, batch: RunCheckpoint):
+        self.batch = batch
+        saved = batch.load_json("manifest") or {}
+        self.articles: list[dict] = saved.get("articles", [])
+        self.created = saved.get("created") or datetime.now().isoformat(timespec="seconds")
+        self._lock = threading.Lock()
+
+    def _save(self):
+        with self._lock:
+            manifest = {
+                "batch_id": self.batch.run_id,
+                "created": self.created,
+                "updated": datetime.now().isoformat(timespec="seconds"),
+                "articles": [dict(a) for a in self.articles],
+            }
+        self.batch.save_json("manifest", manifest)
+
+    def _add(self, topic: str, main_keyword: str) -> dict:
+        with self._lock:
+            index = len(self.articles) + 1
+            entry = {
+                "index": index,
+                "topic": topic,
+                "main_keyword": main_keyword,
+                "run_id": f"{self.batch.run_id}-{index:02d}",
+                "status": "queued",
+            }
+            self.articles.append(entry)
+        return entry
+
+    def _run_article(self, entry: dict):
+        import main as pipeline
+
+        pipeline.use_agent_copies()
+        run = RunCheckpoint(entry["run_id"])
+        with self._lock:
+            entry.update(status="running", error=None)
+        self._save()
+
+        start = time.perf_counter()
+        status, error = "incomplete", None
+        try:
+            pipeline.run_blog_pipeline(entry["topic"], entry["main_keyword"], run=run)
+        except Exception as e:
+            status, error = "error", f"{e.__class__.__name__}: {e}"[:500]
+
+        post = run.load_json("post")
+        with self._lock:
+            entry.update(
+                status="posted" if post else status,
+                post_id=(post or {}).get("id"),
+                link=(post or {}).get("link"),
+                seconds=round(time.perf_counter() - start, 2),
+                stages=run.stages(),
+                error=error,
+            )
+        self._save()
+        print(f"📚 [{entry['index']}] {entry['status']}: {entry['topic']} ({entry['seconds']:.0f}s)")
+
+    def run(self, items=None, workers: int = None) -> list[dict]:
+        """
+        Run the pipeline for each (topic, main_keyword) in `items` (any iterable, consumed
+        while earlier articles are already running). Without items, re-run the unposted
+        articles of this batch.
+        """
+        import main as pipeline
+
+        workers = max(1, workers or settings.BATCH_WORKERS)
+        print(f"📚 Batch {self.batch.run_id}: {workers} concurrent pipelines")
+
+        # Start the optimizer's worker processes once for every pipeline
+        pipeline.warm_up_image_optimizer()
+
+        if items is None:
+            pending = [a for a in self.articles if a["status"] != "posted"]
+        else:
+            pending = (self._add(topic, main_keyword) for topic, main_keyword in items)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+            futures = []
+            for entry in pending:
+                self._save()
+                # copy_context → each pipeline's spans nest under the batch span
+                futures.append(pool.submit(copy_context().run, self._run_article, entry))
+            for future in as_completed(futures):
+                future.result()
+
+        self._save()
+        posted = sum(a["status"] == "posted" for a in self.articles)
+        print(f"📚 Batch {self.batch.run_id}: {posted}/{len(self.articles)} articles posted")
+        print(f"📄 Manifest: {self.batch.dir / 'manifest.json'}")
+        return self.articles
@@ -0,0 +1,294 @@
+# benchmarks/fake_services.py
+"""
+Local stand-ins for every external service the pipeline talks to, on ONE localhost port:
+
+- OpenAI-compatible API:  POST /v1/chat/completions, POST /v1/images/generations
+- Tavily:                 POST /search
+- WordPress REST API:     POST/GET /wp-json/wp/v2/posts, POST /wp-json/wp/v2/media, POST /wp-json/wp/v2/posts/<id>
+- Stats:                  GET /_stats (HTTP call counts + bytes per route), POST /_reset
+
+Chat answers are canned per agent (recognized from the prompt) and shaped like
+real agent output, so the full CrewAI → parse → rewrite → upload path runs.
+Latency model per chat request: `latency` + completion tokens / `token_rate`.
+
+Run standalone:  python -m benchmarks.fake_services --port 8765 --latency 0.2
+"""
+
+import argparse
+import base64
+import io
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _make_png(width: int = 1536, height: int = 1024) -> bytes:
+    """A diagram-sized PNG (Pillow if available, else a 1×1 PNG)."""
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError:
+        return base64.b64decode(
+            "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+        )
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    for i in range(6):
+        x = 80 + i * 240
+        draw.rectangle([x, 400, x + 180, 560], outline="navy", width=6, fill=(220, 232, 250))
+        draw.line([x + 180, 480, x + 240, 480], fill="black", width=4)
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _article_html(topic: str, kb: int) -> str:
+    paragraph = (
+        f"<p>{topic} helps Salesforce admins automate processes. "
+        "Use <strong>record-triggered flows</strong> and keep logic bulk-safe. "
+        'See <a href="https://thetechnologyfiction.com/salesforce-flow-best-practices/">Flow best practices</a>.</p>\n'
+    )
+    sections = []
+    for i in range(1, 7):
+        sections.append(f"<h2>Section {i}: {topic}</h2>\n")
+        if i in (2, 4, 5):
+            sections.append(f"<!-- IMAGE: {topic} diagram for section {i} -->\n")
+        sections.append(paragraph)
+    body = "".join(sections)
+    while len(body) < kb * 1024:
+        body += paragraph
+    return f"<h1>{topic}</h1>\n{body}<h2>FAQ</h2>\n<h3>What is it?</h3>\n<p>An answer.</p>\n"
+
+
+def canned_answer(prompt: str, article_kb: int) -> str:
+    """Final answer text for an agent prompt (recognized by its instructions)."""
+    topic_match = re.search(r"(?:for|TOPIC:)\s*'([^']+)'", prompt)
+    topic = topic_match.group(1) if topic_match else "Salesforce Flow Orchestration"
+
+    if "outline_seed" in prompt:
+        return "```json\n" + json.dumps({
+            "topic": "Salesforce Flow Orchestration Patterns",
+            "main_keyword": "Salesforce Flow Orchestration",
+            "content_mode": "evergreen",
+            "target_audience": "admins",
+            "reason": "benchmark",
+            "outline_seed": ["Intro", {"section": "Patterns", "points": ["a", "b"]}],
+        }) + "\n```"
+    if "SEO-optimized blog article" in prompt:
+        return json.dumps({
+            "title": f"{topic} Guide",
+            "slug": re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-"),
+            "meta_description": f"Learn {topic}.",
+            "content_html": _article_html(topic, article_kb),
+        })
+    if "IMAGE: description" in prompt or '"images"' in prompt:
+        return json.dumps({"images": [{"description": "diagram", "prompt": "flowchart"}]})
+    if "malformed JSON" in prompt or "does not parse" in prompt:
+        return prompt[prompt.find("{"):]
+    if "outline" in prompt.lower():
+        return "\n".join(f"H2: Section {i}\n- key point\n- key point" for i in range(1, 7))
+    return "OK"
+
+
+class FakeServices:
+    def __init__(self, port: int = 0, latency: float = 0.0, token_rate: float = 0.0,
+                 image_latency: float = 0.0, wp_latency: float = 0.0, article_kb: int = 12):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.image_latency = image_latency
+        self.wp_latency = wp_latency
+        self.article_kb = article_kb
+        self.png = _make_png()
+        self._lock = threading.Lock()
+        self._next_id = 100
+        self.stats = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.port = self.server.server_address[1]
+        self.base = f"http://127.0.0.1:{self.port}"
+
+    # ---------- bookkeeping ----------
+
+    def _count(self, route: str, bytes_in: int, bytes_out: int):
+        with self._lock:
+            s = self.stats.setdefault(route, {"calls": 0, "bytes_in": 0, "bytes_out": 0})
+            s["calls"] += 1
+            s["bytes_in"] += bytes_in
+            s["bytes_out"] += bytes_out
+
+    def _new_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    # ---------- routes ----------
+
+    def chat(self, body: dict) -> dict:
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        tools = body.get("tools") or []
+        search_tool = next((t["function"]["name"] for t in tools if "search" in t["function"]["name"].lower()), None)
+        prompt_tokens = max(1, len(prompt) // 4)
+
+        if search_tool and not any(m.get("role") == "tool" for m in messages):
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{self._new_id()}",
+                    "type": "function",
+                    "function": {"name": search_tool, "arguments": json.dumps({"query": "salesforce flow 2026"})},
+                }],
+            }
+            completion_tokens = 20
+        else:
+            content = canned_answer(prompt, self.article_kb)
+            message = {"role": "assistant", "content": content}
+            completion_tokens = max(1, len(content) // 4)
+
+        delay = self.latency + (completion_tokens / self.token_rate if self.token_rate else 0)
+        time.sleep(delay)
+        return {
+            "id": f"chatcmpl-{self._new_id()}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+
+    def image(self, body: dict) -> dict:
+        time.sleep(self.image_latency)
+        return {"created": int(time.time()), "data": [{"b64_json": base64.b64encode(self.png).decode("ascii")}]}
+
+    def search(self, body: dict) -> dict:
+        query = body.get("query", "")
+        return {
+            "query": query,
+            "results": [
+                {"title": f"Result {i} for {query}", "url": f"https://example.com/{i}",
+                 "content": "Salesforce Flow tips. " * 40, "score": 1 - i / 10}
+                for i in range(body.get("max_results") or 5)
+            ],
+        }
+
+    def media(self, filename: str) -> dict:
+        time.sleep(self.wp_latency)
+        media_id = self._new_id()
+        url = f"{self.base}/wp-content/uploads/{filename or media_id}"
+        return {"id": media_id, "source_url": url, "guid": {"rendered": url}, "media_details": {}}
+
+    def post(self, body: dict, post_id: int = None) -> dict:
+        time.sleep(self.wp_latency)
+        post_id = post_id or self._new_id()
+        return {
+            "id": post_id,
+            "status": body.get("status", "draft"),
+            "link": f"{self.base}/?p={post_id}",
+            "featured_media": body.get("featured_media", 0),
+        }
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload, status: int = 200, headers: dict = None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+                return len(data)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/_stats":
+                    with services._lock:
+                        self._send(services.stats)
+                    return
+                if path.endswith("/wp-json/wp/v2/posts"):
+                    sent = self._send([], headers={"X-WP-Total": "0", "X-WP-TotalPages": "1"})
+                    services._count("GET /wp/posts", 0, sent)
+                    return
+                self._send({"error": "not found"}, 404)
+
+            def do_POST(self):
+                path = self.path.split("?")[0]
+                raw = self._body()
+                if path == "/_reset":
+                    with services._lock:
+                        services.stats = {}
+                    self._send({"ok": True})
+                    return
+
+                is_json = (self.headers.get("Content-Type") or "").startswith("application/json")
+                body = json.loads(raw or b"{}") if is_json else {}
+
+                if path.endswith("/chat/completions"):
+                    route, payload, status = "POST /v1/chat/completions", services.chat(body), 200
+                elif path.endswith("/images/generations"):
+                    route, payload, status = "POST /v1/images/generations", services.image(body), 200
+                elif path.endswith("/search"):
+                    route, payload, status = "POST /tavily/search", services.search(body), 200
+                elif path.endswith("/wp-json/wp/v2/media"):
+                    disposition = self.headers.get("Content-Disposition") or ""
+                    match = re.search(r'filename="?([^";]+)', disposition) or re.search(rb'filename="([^"]+)"', raw)
+                    filename = match.group(1) if match else ""
+                    filename = filename.decode() if isinstance(filename, bytes) else filename
+                    route, payload, status = "POST /wp/media", services.media(filename), 201
+                elif re.search(r"/wp-json/wp/v2/posts/\d+$", path):
+                    route, payload, status = "POST /wp/posts/<id>", services.post(body, int(path.rsplit("/", 1)[1])), 200
+                elif path.endswith("/wp-json/wp/v2/posts"):
+                    route, payload, status = "POST /wp/posts", services.post(body), 201
+                else:
+                    self._send({"error": "not found"}, 404)
+                    return
+
+                sent = self._send(payload, status)
+                services._count(route, len(raw), sent)
+
+        return Handler
+
+    def start(self) -> "FakeServices":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI + Tavily + WordPress services for offline benchmarks.")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base seconds per chat completion")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Completion tokens/second (0 = instant)")
+    parser.add_argument("--image-latency", type=float, default=0.0)
+    parser.add_argument("--wp-latency", type=float, default=0.0)
+    parser.add_argument("--article-kb", type=int, default=12)
+    args = parser.parse_args()
+
+    services = FakeServices(args.port, args.latency, args.token_rate, args.image_latency, args.wp_latency, args.article_kb)
+    # First line of stdout is the base URL (read by the benchmark harness)
+    print(services.base, flush=True)
+    services.server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+# benchmarks/run_benchmark.py
+"""
+Offline end-to-end benchmark: runs the real pipeline (CrewAI agents, parsing, HTML
+rewriting, image optimization, uploads) against benchmarks/fake_services.py.
+
+    python -m benchmarks.run_benchmark --articles 3 --latency 0.2 --token-rate 400
+
+Reports per-stage latency (from the trace spans), throughput (articles/hour),
+peak RSS and HTTP call counts per route, saves everything to
+data/benchmarks/<timestamp>.json and compares with the previous result.
+
+All caches, checkpoints and the topic history go to a temp dir, so a benchmark
+never touches real data. Provider rate limits are disabled unless --keep-rate-limits.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.fake_services import FakeServices
+
+RESULTS_DIR = Path("data/benchmarks")
+
+# Spans reported as pipeline stages (everything else is still in the trace file)
+STAGE_SPANS = [
+    "pick_salesforce_topic_for_today",
+    "task: Topic Scout",
+    "task: Planner",
+    "task: Writer",
+    "task: Visual Artist",
+    "llm.call",
+    "web_search",
+    "diagram",
+    "openai.images.generate",
+    "image.optimize",
+    "wordpress POST media",
+    "wordpress POST posts",
+    "run_blog_pipeline",
+    "publish_from_json",
+]
+
+
+def _configure_env(base_url: str, workdir: Path, args):
+    """Point every client at the fakes. Must run before any repo module is imported."""
+    env = {
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "TAVILY_API_KEY": "tvly-bench",
+        "TAVILY_BASE_URL": base_url,
+        "WP_BASE_URL": base_url,
+        "WP_USERNAME": "bench",
+        "WP_APP_PASSWORD": "bench",
+        "USE_LOCAL_LLM": "false",
+        "GEMINI_IMAGE_MOCK": "false",
+        "LLM_CACHE_MODE": "on" if args.warm_cache else "off",
+        "LLM_CACHE_PATH": str(workdir / "llm_cache.sqlite"),
+        "SEARCH_CACHE_PATH": str(workdir / "search_cache.sqlite"),
+        "IMAGE_CACHE_ENABLED": "true" if args.warm_cache else "false",
+        "IMAGE_CACHE_DIR": str(workdir / "images"),
+        "RUNS_DIR": str(workdir / "runs"),
+        "EMBEDDING_BACKEND": "local",
+        "VECTOR_BACKEND": "numpy",
+        "VECTOR_STORE_PATH": str(workdir / "vector_store"),
+        "INTERNAL_LINKS_USE_POST_INDEX": "false",
+        "JSON_REPAIR_WITH_LLM": "true",
+        "TRACING_ENABLED": "true",
+    }
+    if not args.keep_rate_limits:
+        env.update({"OPENAI_CHAT_RPM": "0", "OPENAI_CHAT_TPM": "0", "OPENAI_IMAGES_RPM": "0", "TAVILY_RPM": "0", "WP_RPM": "0"})
+    os.environ.update(env)
+
+
+def _peak_rss_mb() -> dict:
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def _stage_stats(trace_path: Path) -> dict:
+    from utils.tracing import load_spans
+
+    stages = {}
+    for span in load_spans(trace_path):
+        if span["name"] not in STAGE_SPANS:
+            continue
+        seconds = (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e9
+        s = stages.setdefault(span["name"], {"count": 0, "total_s": 0.0, "max_s": 0.0})
+        s["count"] += 1
+        s["total_s"] += seconds
+        s["max_s"] = max(s["max_s"], seconds)
+    for s in stages.values():
+        s["mean_s"] = round(s["total_s"] / s["count"], 4)
+        s["total_s"] = round(s["total_s"], 4)
+        s["max_s"] = round(s["max_s"], 4)
+    return {name: stages[name] for name in STAGE_SPANS if name in stages}
+
+
+def run_benchmark(args) -> dict:
+    services = FakeServices(
+        latency=args.latency,
+        token_rate=args.token_rate,
+        image_latency=args.image_latency,
+        wp_latency=args.wp_latency,
+        article_kb=args.article_kb,
+    ).start()
+    workdir = Path(tempfile.mkdtemp(prefix="blog-bench-"))
+    _configure_env(services.base, workdir, args)
+
+    # Repo imports only now: settings are read from the environment at import time
+    t_import = time.perf_counter()
+    import main
+    import publish_from_json
+    import tools.topic_index as topic_index
+    from llm_metrics import metrics
+    from utils.run_checkpoint import RunCheckpoint
+    from utils.tracing import tracer
+    import_s = time.perf_counter() - t_import
+
+    topic_index.TOPIC_HISTORY_PATH = workdir / "topic_history.json"
+    trace_path = workdir / "trace.jsonl"
+    tracer.configure(trace_path)
+
+    walls = {}
+    published = 0
+
+    t0 = time.perf_counter()
+    if not args.skip_topic_scout:
+        main.pick_salesforce_topic_for_today()
+    walls["topic_scout_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    runs = []
+    for i in range(args.articles):
+        run = RunCheckpoint(f"bench-{i}")
+        main.run_blog_pipeline(f"Salesforce Benchmark Topic {i}", f"benchmark keyword {i}", run=run)
+        if run.load_json("post") is not None:
+            published += 1
+        runs.append(run)
+    walls["pipeline_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for run in runs:
+        if (run.dir / "writer.json").exists():
+            with tracer.span("publish_from_json"):
+                publish_from_json.publish_from_json(str(run.dir / "writer.json"))
+    walls["publish_s"] = time.perf_counter() - t0
+
+    services.stop()
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "articles": args.articles,
+            "latency": args.latency,
+            "token_rate": args.token_rate,
+            "image_latency": args.image_latency,
+            "wp_latency": args.wp_latency,
+            "article_kb": args.article_kb,
+            "warm_cache": args.warm_cache,
+            "keep_rate_limits": args.keep_rate_limits,
+        },
+        "import_s": round(import_s, 3),
+        "wall": {k: round(v, 3) for k, v in walls.items()},
+        "articles_published": published,
+        "articles_per_hour": round(published / walls["pipeline_s"] * 3600, 1) if walls["pipeline_s"] else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "http_calls": services.stats,
+        "stages": _stage_stats(trace_path),
+        "llm_by_agent": metrics.by_agent(),
+        "llm_by_route": metrics.by_route(),
+        "workdir": str(workdir),
+    }
+
+
+def _previous_result(exclude: Path = None) -> dict | None:
+    files = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return json.loads(files[-1].read_text(encoding="utf-8")) if files else None
+
+
+def format_report(result: dict, previous: dict | None = None) -> str:
+    def delta(now, before):
+        if before in (None, 0):
+            return ""
+        return f"  ({(now - before) / before:+.0%} vs previous)"
+
+    prev = previous or {}
+    lines = [
+        "========== BENCHMARK ==========",
+        f"Config: {result['config']}",
+        f"Import time: {result['import_s']:.2f}s{delta(result['import_s'], prev.get('import_s'))}",
+    ]
+    for name, seconds in result["wall"].items():
+        lines.append(f"Wall {name}: {seconds:.2f}s{delta(seconds, prev.get('wall', {}).get(name))}")
+    lines.append(
+        f"Throughput: {result['articles_per_hour']:.1f} articles/hour "
+        f"({result['articles_published']} published){delta(result['articles_per_hour'], prev.get('articles_per_hour'))}"
+    )
+    rss = result["peak_rss_mb"]
+    lines.append(
+        f"Peak RSS: {rss['self']:.0f} MB (children {rss['children']:.0f} MB)"
+        f"{delta(rss['self'], prev.get('peak_rss_mb', {}).get('self'))}"
+    )
+
+    lines.append("\nStages (from trace spans):")
+    for name, s in result["stages"].items():
+        before = prev.get("stages", {}).get(name, {}).get("total_s")
+        lines.append(
+            f"  {name:<34} n={s['count']:<4} total {s['total_s']:8.3f}s  mean {s['mean_s']:7.3f}s  "
+            f"max {s['max_s']:7.3f}s{delta(s['total_s'], before)}"
+        )
+
+    lines.append("\nLLM routes:")
+    for route, r in sorted(result.get("llm_by_route", {}).items()):
+        lines.append(
+            f"  {route:<30} {r['calls']:>5} calls  mean {r['mean_wall_s']:7.3f}s  p95 {r['p95_wall_s']:7.3f}s  "
+            f"{r['prompt_tokens'] + r['completion_tokens']:>8} tokens  ${r['cost_usd']:.4f}"
+        )
+
+    lines.append("\nHTTP calls:")
+    for route, s in sorted(result["http_calls"].items()):
+        lines.append(f"  {route:<30} {s['calls']:>5} calls  {s['bytes_in'] / 1024:9.1f} KB in  {s['bytes_out'] / 1024:9.1f} KB out")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark.")
+    parser.add_argument("--articles", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base seconds per chat completion")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="Simulated completion tokens/second (0 = instant)")
+    parser.add_argument("--image-latency", type=float, default=0.0)
+    parser.add_argument("--wp-latency", type=float, default=0.0)
+    parser.add_argument("--article-kb", type=int, default=12, help="Size of the fake writer's content_html")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep LLM + image caches on (second-run scenario)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep the configured provider rate limits")
+    parser.add_argument("--skip-topic-scout", action="store_true")
+    parser.add_argument("--compare", metavar="RESULT_JSON", help="Compare with this result instead of the latest one")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args)
+
+    previous = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else _previous_result()
+    print(format_report(result, previous))
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"\n💾 Saved benchmark result to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,9 @@ load_dotenv()
 
 class Settings:
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # read by the OpenAI SDK itself; None → api.openai.com
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+    TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL")  # None → https://api.tavily.com
 
     WP_BASE_URL = os.getenv("WP_BASE_URL")
     WP_USERNAME = os.getenv("WP_USERNAME")
@@ -22,8 +24,99 @@ class Settings:
     USE_LOCAL_LLM: bool = os.getenv("USE_LOCAL_LLM", "false").lower() == "true"
     LOCAL_LLM_MODEL: str = os.getenv("LOCAL_LLM_MODEL", "phi3:mini")
     OPENAI_LLM_MODEL: str = os.getenv("OPENAI_LLM_MODEL", "gpt-4.1-mini")
+    # Opt-in per-role models (unset → OPENAI_LLM_MODEL), e.g. gpt-4.1-nano / gpt-4.1
+    OPENAI_FAST_MODEL: str = os.getenv("OPENAI_FAST_MODEL") or OPENAI_LLM_MODEL  # topic scout, diagram prompts
+    OPENAI_WRITER_MODEL: str = os.getenv("OPENAI_WRITER_MODEL") or OPENAI_LLM_MODEL  # long-form article
+    LLM_ROUTES: str = os.getenv("LLM_ROUTES", "")  # "role=model|local|local/<model>,..." overrides (see llm_factory.ROUTES)
 
-    print("DEBUG USE_LOCAL_LLM:", os.getenv("USE_LOCAL_LLM"))
+    # ⏳ Provider rate limits (per minute, 0 = unlimited)
+    OPENAI_CHAT_RPM: int = int(os.getenv("OPENAI_CHAT_RPM", 3))
+    OPENAI_CHAT_TPM: int = int(os.getenv("OPENAI_CHAT_TPM", 40000))
+    # Completion tokens reserved per chat request when the LLM has no max_tokens (TPM counts them too)
+    OPENAI_CHAT_COMPLETION_TOKENS: int = int(os.getenv("OPENAI_CHAT_COMPLETION_TOKENS", 4096))
+    OPENAI_IMAGES_RPM: int = int(os.getenv("OPENAI_IMAGES_RPM", 5))
+    TAVILY_RPM: int = int(os.getenv("TAVILY_RPM", 60))
+    WP_RPM: int = int(os.getenv("WP_RPM", 60))
+
+    # 💾 LLM response cache: "on" | "refresh" (ignore cached, overwrite) | "off"
+    LLM_CACHE_MODE: str = os.getenv("LLM_CACHE_MODE", "on").lower()
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "data/cache/llm_cache.sqlite")
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
+
+    # 🔎 Tavily search result cache (TTL depends on today's content mode)
+    SEARCH_CACHE_PATH: str = os.getenv("SEARCH_CACHE_PATH", "data/cache/search_cache.sqlite")
+    SEARCH_CACHE_TTL_NEWS: int = int(os.getenv("SEARCH_CACHE_TTL_NEWS", 6 * 3600))
+    SEARCH_CACHE_TTL_EVERGREEN: int = int(os.getenv("SEARCH_CACHE_TTL_EVERGREEN", 14 * 24 * 3600))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1000))
+
+    # 🖼 In-content diagrams generated + uploaded in parallel (1 = sequential)
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", 3))
+
+    # 🗜 Image optimization before upload (needs Pillow)
+    IMAGE_OPTIMIZE: bool = os.getenv("IMAGE_OPTIMIZE", "true").lower() == "true"
+    IMAGE_OPTIMIZE_FORMAT: str = os.getenv("IMAGE_OPTIMIZE_FORMAT", "webp").lower()  # webp | png | avif | auto
+    IMAGE_OPTIMIZE_QUALITY: int = int(os.getenv("IMAGE_OPTIMIZE_QUALITY", 85))
+    IMAGE_OPTIMIZE_WORKERS: int = int(os.getenv("IMAGE_OPTIMIZE_WORKERS", 2))
+    IMAGE_MAX_WIDTH: int = int(os.getenv("IMAGE_MAX_WIDTH", 1200))
+
+    # 🗂 Generated image cache (reuses images + WordPress media across posts)
+    IMAGE_CACHE_ENABLED: bool = os.getenv("IMAGE_CACHE_ENABLED", "true").lower() == "true"
+    IMAGE_CACHE_DIR: str = os.getenv("IMAGE_CACHE_DIR", "data/cache/images")
+    IMAGE_CACHE_MAX_AGE_DAYS: int = int(os.getenv("IMAGE_CACHE_MAX_AGE_DAYS", 90))
+    IMAGE_CACHE_MAX_MB: int = int(os.getenv("IMAGE_CACHE_MAX_MB", 500))
+
+    # 🗂 Old-posts index (RAG)
+    CHROMA_PATH: str = os.getenv("CHROMA_PATH", "data/chroma")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", 100))
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "openai").lower()  # or "local" (offline)
+    LOCAL_EMBEDDING_DIM: int = int(os.getenv("LOCAL_EMBEDDING_DIM", 1024))
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma").lower()  # or "numpy" (mmap, no chromadb)
+    VECTOR_STORE_PATH: str = os.getenv("VECTOR_STORE_PATH", "data/vector_store")
+
+    # 🔗 Internal links offered to the writer (top-k retrieved from the catalog)
+    INTERNAL_LINKS_TOP_K: int = int(os.getenv("INTERNAL_LINKS_TOP_K", 5))
+    # true → also offer every post of the old-posts index (opens the vector store on each run)
+    INTERNAL_LINKS_USE_POST_INDEX: bool = os.getenv("INTERNAL_LINKS_USE_POST_INDEX", "false").lower() == "true"
+
+    # 🧬 Near-duplicate topic check (MinHash similarity 0..1)
+    TOPIC_DUPLICATE_THRESHOLD: float = float(os.getenv("TOPIC_DUPLICATE_THRESHOLD", 0.5))
+    TOPIC_DEDUP_RETRIES: int = int(os.getenv("TOPIC_DEDUP_RETRIES", 1))
+    # Also index the titles of every post already on WordPress (drafts included) at startup
+    TOPIC_INDEX_FROM_WORDPRESS: bool = os.getenv("TOPIC_INDEX_FROM_WORDPRESS", "true").lower() == "true"
+
+    # 🧾 Per-run checkpoints (python main.py --resume <run-id>)
+    RUNS_DIR: str = os.getenv("RUNS_DIR", "data/runs")
+
+    # 📚 Batch mode (python main.py --batch N): pipelines running at once, sharing provider rate limits
+    BATCH_WORKERS: int = int(os.getenv("BATCH_WORKERS", 2))
+
+    # 🛰 Job service (python service.py): warm agents + persistent SQLite job queue
+    SERVICE_HOST: str = os.getenv("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT: int = int(os.getenv("SERVICE_PORT", 8000))
+    JOB_QUEUE_PATH: str = os.getenv("JOB_QUEUE_PATH", "data/jobs.sqlite")
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_VISIBILITY_TIMEOUT: float = float(os.getenv("JOB_VISIBILITY_TIMEOUT", 900))  # seconds a claimed job stays hidden
+    JOB_RETRY_DELAY: float = float(os.getenv("JOB_RETRY_DELAY", 30))  # doubled on every further attempt
+
+    # 🧭 Span tracing → data/runs/<run-id>/trace.jsonl (python -m utils.tracing <run-id>)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+    # 📼 HTTP record / replay of provider traffic: "off" | "record" | "replay"
+    HTTP_CASSETTE_MODE: str = os.getenv("HTTP_CASSETTE_MODE", "off").lower()
+    HTTP_CASSETTE_PATH: str = os.getenv("HTTP_CASSETTE_PATH", "data/cassettes/latest.jsonl.gz")
+    HTTP_CASSETTE_LATENCY: float = float(os.getenv("HTTP_CASSETTE_LATENCY", 0))  # × recorded latency on replay
+
+    # 🩹 Malformed agent JSON: local fixes first, then one small "fix this JSON" request
+    JSON_REPAIR_WITH_LLM: bool = os.getenv("JSON_REPAIR_WITH_LLM", "true").lower() == "true"
+
+    # 🌐 WordPress HTTP client
+    WP_POOL_SIZE: int = int(os.getenv("WP_POOL_SIZE", 8))
+    WP_CONNECT_TIMEOUT: float = float(os.getenv("WP_CONNECT_TIMEOUT", 10))
+    WP_READ_TIMEOUT: float = float(os.getenv("WP_READ_TIMEOUT", 120))
+    WP_MAX_RETRIES: int = int(os.getenv("WP_MAX_RETRIES", 4))
+    WP_MEDIA_UPLOAD_MODE: str = os.getenv("WP_MEDIA_UPLOAD_MODE", "multipart").lower()  # or "raw"
 
 
 settings = Settings()
@@ -6,61 +6,8 @@ from textwrap import dedent
 
 from crewai import Crew, Task, Process
 from agents.seo_optimiser import seo_optimiser
-
-# ✅ INTERNAL LINKS – update URLs/titles to your real posts
-INTERNAL_LINKS = [
-    {
-        "title": "Salesforce Health Cloud Explained Simply",
-        "url": "https://thetechnologyfiction.com/blog/salesforce-health-cloud-explained-simply/",
-        "anchor": "Salesforce Health Cloud explained simply"
-    },
-    {
-        "title": "Beginner’s Guide to Salesforce Flow",
-        "url": "https://thetechnologyfiction.com/blog/salesforce-flow-beginners-guide/",
-        "anchor": "Salesforce Flow beginner’s guide"
-    },
-    {
-        "title": "Salesforce OmniStudio (Vlocity) Explained With Use Cases",
-        "url": "https://thetechnologyfiction.com/blog/salesforce-omnistudio-use-cases/",
-        "anchor": "Salesforce OmniStudio explained with use cases"
-    }
-]
-
-
-
-import time
-import threading
-
-# OpenAI allows 3 requests per minute on your plan
-MAX_REQUESTS_PER_MIN = 3
-REQUEST_WINDOW = 60  # seconds
-
-request_count = 0
-window_start_time = time.time()
-lock = threading.Lock()
-
-def wait_for_rate_limit():
-    global request_count, window_start_time
-
-    with lock:
-        current_time = time.time()
-        elapsed = current_time - window_start_time
-
-        # If 60 sec window passed → reset counter
-        if elapsed >= REQUEST_WINDOW:
-            window_start_time = current_time
-            request_count = 0
-
-        # If limit reached → wait until new window
-        if request_count >= MAX_REQUESTS_PER_MIN:
-            sleep_time = REQUEST_WINDOW - elapsed
-            print(f"⏳ Rate limit: sleeping {sleep_time:.1f}s to avoid 429...")
-            time.sleep(sleep_time)
-            window_start_time = time.time()
-            request_count = 0
-
-        request_count += 1
-
+from tools.internal_links import internal_links_prompt
+from utils.json_repair import parse_llm_json
 
 
 
@@ -68,6 +15,7 @@ def wait_for_rate_limit():
 # ✅ EDIT THESE TWO VALUES FOR EACH NEW ARTICLE
 TOPIC = "Salesforce Agentforce Use Cases"
 MAIN_KEYWORD = "Salesforce Agentforce"
+ARTICLE_KEYS = ("title", "slug", "content_html")
 
 
 def _slugify(text: str) -> str:
@@ -82,26 +30,9 @@ def _extract_article_from_result(result) -> dict:
     Try to extract a JSON object with title, slug, meta_description, content_html
     from the Crew result. Handles both dict and string outputs.
     """
-    if isinstance(result, dict):
-        # Already-structured result
-        if all(k in result for k in ["title", "slug", "meta_description", "content_html"]):
-            return result
-
-    # Otherwise, treat as string and try to parse JSON block
-    text = str(result)
-
-    # Find first { and last } and attempt to load as JSON
-    start = text.find("{")
-    end = text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("Could not find JSON block in SEO agent output.")
-
-    json_str = text[start : end + 1]
-
-    try:
-        data = json.loads(json_str)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse JSON from SEO output: {e}\nRaw JSON string: {json_str[:500]}")
+    data = parse_llm_json(result, ARTICLE_KEYS, label="SEO agent output")
+    if data is None:
+        raise ValueError(f"Could not find JSON block in SEO agent output.\nRaw output: {str(result)[:500]}")
 
     # Basic safety defaults
     title = data.get("title") or TOPIC
@@ -124,6 +55,9 @@ def generate_and_save_article(topic: str, main_keyword: str) -> Path:
     """
     print("🚀 Starting single-run article generation (SEO agent only)...")
 
+    # Only the most relevant internal links go into the writer prompt
+    internal_links = internal_links_prompt(f"{topic} {main_keyword}").replace("\n", "\n" + " " * 10)
+
     description = dedent(f"""
         Write a full SEO-optimized blog article in clean HTML.
 
@@ -146,7 +80,7 @@ def generate_and_save_article(topic: str, main_keyword: str) -> Path:
         INTERNAL LINKING (VERY IMPORTANT):
         - You MUST include 2–3 contextual internal links to the following articles:
 
-          {INTERNAL_LINKS}
+          {internal_links}
 
         - Insert these links naturally inside the article body.
         - Format them using clickable <a href="URL" target="_blank" rel="noopener noreferrer">anchor text</a>.
@@ -181,7 +115,6 @@ def generate_and_save_article(topic: str, main_keyword: str) -> Path:
         verbose=True,
     )
 
-    wait_for_rate_limit()
     result = crew.kickoff(inputs={"topic": topic, "main_keyword": main_keyword})
 
     print("\n🧩 Raw SEO agent result obtained. Parsing JSON...\n")
@@ -0,0 +1,103 @@
+# llm_cache.py
+
+import hashlib
+import json
+import threading
+
+from config.settings import settings
+from utils.kv_cache import SQLiteCache
+
+# Sampling params that change the answer → part of the cache key
+SAMPLING_PARAMS = ["temperature", "top_p", "max_tokens", "max_completion_tokens", "stop", "seed", "response_format"]
+
+
+class LLMCache:
+    """
+    Persistent on-disk cache of LLM responses (SQLite, see utils/kv_cache.py).
+
+    - Key: sha256 of model + messages + sampling params (+ tool names)
+    - TTL: entries older than `ttl_seconds` are treated as misses
+    - LRU: once the file holds more than `max_entries`, least recently used rows are evicted
+    - mode: "on" (read + write), "refresh" (skip reads, overwrite), "off" (bypass)
+    """
+
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int, mode: str = "on"):
+        self.store = SQLiteCache(path, table="llm_cache", max_entries=max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, messages, params: dict, tools=None) -> str:
+        tool_names = sorted(
+            (t.get("function", {}).get("name") or t.get("name") or "") if isinstance(t, dict) else str(t)
+            for t in (tools or [])
+        )
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params, "tools": tool_names},
+            sort_keys=True,
+            default=str,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        if self.mode != "on":
+            return None
+
+        value = self.store.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, response: str):
+        if self.mode == "off":
+            return
+        self.store.set(key, response, ttl_seconds=self.ttl_seconds)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        if self.mode == "off":
+            return "LLM cache: off"
+        return (
+            f"LLM cache ({self.mode}): {self.hits} hits / {self.misses} misses "
+            f"→ hit rate {self.hit_rate():.0%}"
+        )
+
+
+def cached_call(original_call, llm, messages, *args, **kwargs):
+    """Serve `llm.call(messages, ...)` from the cache, storing fresh string answers."""
+    if llm_cache.mode == "off":
+        return original_call(messages, *args, **kwargs)
+
+    model = getattr(llm, "model", "")
+    params = {name: getattr(llm, name, None) for name in SAMPLING_PARAMS}
+    tools = kwargs.get("tools") or (args[0] if args else None)
+    key = LLMCache.make_key(model, messages, params, tools)
+
+    cached = llm_cache.get(key)
+    if cached is not None:
+        print(f"💾 LLM cache hit ({model})")
+        return cached
+
+    response = original_call(messages, *args, **kwargs)
+    # Only plain text answers are safe to replay (tool calls / structured objects are not)
+    if isinstance(response, str) and response.strip():
+        llm_cache.set(key, response)
+    return response
+
+
+llm_cache = LLMCache(
+    path=settings.LLM_CACHE_PATH,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    mode=settings.LLM_CACHE_MODE,
+)
@@ -1,28 +1,123 @@
 # llm_factory.py
 
-from crewai import LLM as CrewLLM
+import threading
+
 from config.settings import settings
+from llm_cache import cached_call
+from llm_metrics import metrics
+from utils.rate_limiter import rate_limiter, estimate_request_tokens, OPENAI_CHAT
 
 
-def get_default_llm():
+def _wrap_llm_call(llm, wrapper):
     """
-    Returns an LLM object depending on environment:
-    - If USE_LOCAL_LLM=true → use local Ollama model (phi3:mini) via OpenAI-compatible API
-    - Else → use OpenAI (gpt-4.1-mini or whatever you set)
+    Route every `llm.call(...)` through `wrapper(original_call, llm, messages, *args, **kwargs)`.
+    CrewAI agents call `llm.call` once per LLM request, so this is where per-call
+    hooks (rate limiting, caching, ...) live. The last wrapper applied runs first.
     """
+    original_call = llm.call
+
+    def call(messages, *args, **kwargs):
+        return wrapper(original_call, llm, messages, *args, **kwargs)
+
+    # LLM objects are pydantic models → bypass field validation
+    object.__setattr__(llm, "call", call)
+    return llm
+
+
+def _rate_limited_call(original_call, llm, messages, *args, **kwargs):
+    tokens = estimate_request_tokens(messages, getattr(llm, "max_completion_tokens", None) or llm.max_tokens)
+    metrics.add_wait(rate_limiter.acquire(OPENAI_CHAT, tokens=tokens))
+    return original_call(messages, *args, **kwargs)
+
+
+# Agent role → model. Every role uses OPENAI_LLM_MODEL unless OPENAI_FAST_MODEL /
+# OPENAI_WRITER_MODEL are set. "local" = LOCAL_LLM_MODEL via Ollama; override any role with
+# LLM_ROUTES="topic_scout=local,seo_optimiser=gpt-4.1" (USE_LOCAL_LLM=true → every role local)
+ROUTES = {
+    "topic_scout": settings.OPENAI_FAST_MODEL,       # short JSON answer + a tool call
+    "visual_artist": settings.OPENAI_FAST_MODEL,     # diagram prompts
+    "content_planner": settings.OPENAI_LLM_MODEL,
+    "seo_optimiser": settings.OPENAI_WRITER_MODEL,   # the long-form article
+    "json_repair": settings.OPENAI_LLM_MODEL,
+    "default": settings.OPENAI_LLM_MODEL,
+}
+
+_pool: dict[tuple, object] = {}
+_pool_lock = threading.Lock()
+
+
+def parse_routes(spec: str) -> dict[str, str]:
+    """ "role=target,role=target" → {role: target} (target: model, "local" or "local/<model>")."""
+    routes = {}
+    for part in (spec or "").split(","):
+        role, _, target = part.partition("=")
+        if role.strip() and target.strip():
+            routes[role.strip()] = target.strip()
+    return routes
+
+
+def resolve_route(role: str) -> tuple[str, str]:
+    """(provider, model) for an agent role: "openai" or "local" (Ollama)."""
+    target = parse_routes(settings.LLM_ROUTES).get(role) or ROUTES.get(role) or ROUTES["default"]
     if settings.USE_LOCAL_LLM:
-        print(f"🧠 Using LOCAL Ollama model: {settings.LOCAL_LLM_MODEL}")
+        target = "local"
+    if target == "local" or target.startswith("local/"):
+        return "local", target.partition("/")[2] or settings.LOCAL_LLM_MODEL
+    return "openai", target.removeprefix("openai/")
+
+
+def _build_llm(provider: str, model: str, params: dict):
+    from crewai import LLM as CrewLLM
+
+    if provider == "local":
+        print(f"🧠 Using LOCAL Ollama model: {model}")
         # Ollama's OpenAI-compatible endpoint
-        return CrewLLM(
-            model=settings.LOCAL_LLM_MODEL,      # e.g. "phi3:mini"
+        llm = CrewLLM(
+            model=model,                          # e.g. "phi3:mini"
             base_url="http://localhost:11434/v1", # Ollama OpenAI-compatible URL
-            api_key="ollama"                     # dummy, not actually checked
+            api_key="ollama",                     # dummy, not actually checked
+            **params,
         )
     else:
-        print(f"🧠 Using OPENAI model: {settings.OPENAI_LLM_MODEL}")
-        return CrewLLM(
-            model=settings.OPENAI_LLM_MODEL,     # e.g. "gpt-4.1-mini"
-            api_key=settings.OPENAI_API_KEY      # from your .env / settings
+        print(f"🧠 Using OPENAI model: {model}")
+        llm = CrewLLM(
+            model=model,                          # e.g. "gpt-4.1-mini"
+            api_key=settings.OPENAI_API_KEY,      # from your .env / settings
+            **params,
         )
+        _wrap_llm_call(llm, _rate_limited_call)
+
+    metrics.instrument(llm)
+    _wrap_llm_call(llm, metrics.metered(f"{provider}/{model}"))
+
+    # Cache is checked before the rate limiter + metrics, so hits don't spend quota
+    return _wrap_llm_call(llm, cached_call)
 
 
+def get_llm(provider: str, model: str, **params):
+    """
+    Memoized pool: one LLM object (→ one HTTP client) per (provider, model, params),
+    shared by every agent routed to it.
+    """
+    key = (provider, model, tuple(sorted(params.items())))
+    with _pool_lock:
+        if key not in _pool:
+            _pool[key] = _build_llm(provider, model, params)
+        return _pool[key]
+
+
+def get_llm_for(role: str, **params):
+    """LLM for an agent role, per the routing table (see ROUTES / LLM_ROUTES)."""
+    provider, model = resolve_route(role)
+    return get_llm(provider, model, **params)
+
+
+def get_default_llm():
+    """
+    Returns the pooled LLM of the "default" route:
+    - If USE_LOCAL_LLM=true → local Ollama model (phi3:mini) via OpenAI-compatible API
+    - Else → OpenAI (gpt-4.1-mini or whatever you set), rate limited per call
+    Every pooled LLM is metered per request (see llm_metrics.py) and wrapped by the
+    on-disk response cache (see llm_cache.py).
+    """
+    return get_llm_for("default")
@@ -1,19 +1,268 @@
 # llm_metrics.py
+"""
+Per-call LLM instrumentation.
+
+Every real `llm.call` (cache hits never reach it, see llm_factory.py) is recorded with:
+agent / task label, route ("provider/model" of the pooled LLM), model, wall time,
+rate-limit wait, time to first token, prompt / completion / cached prompt tokens
+and estimated cost.
+
+- Token usage comes from the LLM's own usage tracking, captured per thread,
+  so concurrent calls on a shared LLM object don't mix their numbers.
+- Calls are non-streaming: the first token arrives with the full response,
+  so TTFT = wall time minus rate-limit wait.
+- `summary()` aggregates per agent and per route; `to_json()` / `to_prometheus()` export everything.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from utils.tracing import tracer
+
+# USD per 1M tokens: (input, cached input, output). Unknown / local models cost 0.
+PRICING = {
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5": (1.25, 0.125, 10.00),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    name = (model or "").split("/")[-1]
+    # Longest matching prefix: "gpt-4.1-mini-2025-04-14" → "gpt-4.1-mini", not "gpt-4.1"
+    prices = next((PRICING[p] for p in sorted(PRICING, key=len, reverse=True) if name.startswith(p)), None)
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1_000_000
+
+
+def _caller_label(kwargs: dict, fallback: str) -> tuple[str, str]:
+    agent = kwargs.get("from_agent")
+    task = kwargs.get("from_task")
+    agent_label = getattr(agent, "role", None) or fallback or "unknown"
+    task_label = getattr(task, "name", None) or (getattr(task, "description", None) or "").strip()[:60]
+    return agent_label, task_label
+
 
 class LLMMetrics:
     def __init__(self):
-        self.call_count = 0
+        self.call_count = 0  # crew runs announced via register_call
+        self.records: list[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stage = ""  # last label, for threads that never registered one
 
     def register_call(self, label: str = ""):
-        """Increment call counter and optionally log a label."""
-        self.call_count += 1
+        """Announce a crew run; `label` also tags LLM calls made without an agent on this thread."""
+        with self._lock:
+            self.call_count += 1
+            n = self.call_count
+        self._local.stage = label
+        self._stage = label
         if label:
-            print(f"[LLM] Call #{self.call_count} → {label}")
+            print(f"[LLM] Crew run #{n} → {label}")
         else:
-            print(f"[LLM] Call #{self.call_count}")
+            print(f"[LLM] Crew run #{n}")
+
+    # ---------- hooks ----------
+
+    def add_wait(self, seconds: float):
+        """Rate-limit wait spent inside the current call on this thread."""
+        self._local.wait = getattr(self._local, "wait", 0.0) + seconds
+
+    def track_usage(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0):
+        """Token usage of one provider response, added to the current call on this thread."""
+        pending = getattr(self._local, "usage", None)
+        if pending is not None:
+            pending.append((prompt_tokens, completion_tokens, cached_tokens))
+
+    def instrument(self, llm):
+        """Capture token usage per call by hooking the LLM's own usage tracking."""
+        from crewai.types.usage_metrics import UsageMetrics
+
+        track = getattr(llm, "_track_token_usage_internal", None)
+        if track is None:
+            return llm
+
+        def tracked(usage_data):
+            usage = UsageMetrics.from_provider_dict(usage_data)
+            if usage is not None:
+                self.track_usage(usage.prompt_tokens, usage.completion_tokens, usage.cached_prompt_tokens)
+            return track(usage_data)
+
+        # LLM objects are pydantic models → bypass field validation
+        object.__setattr__(llm, "_track_token_usage_internal", tracked)
+        return llm
+
+    def metered(self, route: str):
+        """llm_factory wrapper for one pooled LLM; its calls are reported under `route`."""
+        def metered_call(original_call, llm, messages, *args, **kwargs):
+            return self._measure(route, original_call, llm, messages, args, kwargs)
+        return metered_call
+
+    def _measure(self, route: str, original_call, llm, messages, args, kwargs):
+        model = getattr(llm, "model", "") or ""
+        route = route or model
+        with tracer.span("llm.call", model=model, route=route) as span:
+            self._local.wait = 0.0
+            self._local.usage = []
+            status = "ok"
+            start = time.perf_counter()
+            try:
+                return original_call(messages, *args, **kwargs)
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                wall = time.perf_counter() - start
+                wait = self._local.wait
+                usage = self._local.usage
+                self._local.usage = None
+
+                agent, task = _caller_label(kwargs, getattr(self._local, "stage", None) or self._stage)
+                prompt_tokens, completion_tokens, cached_tokens = (sum(col) for col in zip(*usage)) if usage else (0, 0, 0)
+                entry = {
+                    "ts": time.time(),
+                    "agent": agent,
+                    "task": task,
+                    "route": route,
+                    "model": model,
+                    "status": status,
+                    "wall_s": round(wall, 4),
+                    "rate_limit_wait_s": round(wait, 4),
+                    "ttft_s": round(wall - wait, 4),
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "cached_tokens": cached_tokens,
+                    "cost_usd": round(estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens), 6),
+                }
+                self.record(entry)
+                span.set(
+                    agent=agent,
+                    tokens=prompt_tokens + completion_tokens,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    cost_usd=entry["cost_usd"],
+                    rate_limit_wait_s=entry["rate_limit_wait_s"],
+                )
+
+    def record(self, entry: dict):
+        with self._lock:
+            self.records.append(entry)
+
+    # ---------- reports ----------
+
+    def by_agent(self) -> dict:
+        return self._aggregate("agent")
+
+    def by_route(self) -> dict:
+        """Per route: calls, latency (total, mean, p95 wall), tokens, cost."""
+        routes = self._aggregate("route")
+        with self._lock:
+            records = list(self.records)
+        for name, r in routes.items():
+            walls = sorted(rec["wall_s"] for rec in records if rec["route"] == name)
+            r["mean_wall_s"] = round(r["wall_s"] / r["calls"], 4)
+            r["p95_wall_s"] = walls[min(len(walls) - 1, int(len(walls) * 0.95))]
+        return routes
+
+    def _aggregate(self, field: str) -> dict:
+        with self._lock:
+            records = list(self.records)
+        groups = {}
+        for r in records:
+            a = groups.setdefault(r[field], {
+                "calls": 0, "errors": 0, "wall_s": 0.0, "rate_limit_wait_s": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0,
+            })
+            a["calls"] += 1
+            a["errors"] += r["status"] != "ok"
+            for key in ("wall_s", "rate_limit_wait_s", "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd"):
+                a[key] += r[key]
+        return groups
 
     def summary(self) -> str:
-        return f"Total LLM calls this run: {self.call_count}"
+        agents = self.by_agent()
+        lines = [f"Crew runs: {self.call_count} | LLM requests: {sum(a['calls'] for a in agents.values())}"]
+        for name, a in sorted(agents.items(), key=lambda item: -item[1]["wall_s"]):
+            lines.append(
+                f"  {name}: {a['calls']} calls, {a['wall_s']:.1f}s (waited {a['rate_limit_wait_s']:.1f}s), "
+                f"{a['prompt_tokens']} in / {a['completion_tokens']} out / {a['cached_tokens']} cached tokens, "
+                f"${a['cost_usd']:.4f}"
+            )
+        lines.append("Routes:")
+        for name, r in sorted(self.by_route().items(), key=lambda item: -item[1]["cost_usd"]):
+            lines.append(
+                f"  {name}: {r['calls']} calls, mean {r['mean_wall_s']:.2f}s / p95 {r['p95_wall_s']:.2f}s, "
+                f"{r['prompt_tokens'] + r['completion_tokens']} tokens, ${r['cost_usd']:.4f}"
+            )
+        total_cost = sum(a["cost_usd"] for a in agents.values())
+        total_tokens = sum(a["prompt_tokens"] + a["completion_tokens"] for a in agents.values())
+        lines.append(f"Total: {total_tokens} tokens, ${total_cost:.4f}")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        with self._lock:
+            records = list(self.records)
+        return json.dumps(
+            {"crew_runs": self.call_count, "by_agent": self.by_agent(), "by_route": self.by_route(), "calls": records},
+            indent=2,
+        )
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format, one series per agent + route + model."""
+        with self._lock:
+            records = list(self.records)
+        series = {}
+        for r in records:
+            key = (r["agent"], r["route"], r["model"], r["status"])
+            s = series.setdefault(key, {"calls": 0, "wall": 0.0, "wait": 0.0, "prompt": 0, "completion": 0, "cached": 0, "cost": 0.0})
+            s["calls"] += 1
+            s["wall"] += r["wall_s"]
+            s["wait"] += r["rate_limit_wait_s"]
+            s["prompt"] += r["prompt_tokens"]
+            s["completion"] += r["completion_tokens"]
+            s["cached"] += r["cached_tokens"]
+            s["cost"] += r["cost_usd"]
+
+        metrics = [
+            ("llm_requests_total", "counter", "LLM requests", "calls"),
+            ("llm_request_seconds_total", "counter", "Wall time spent in LLM requests", "wall"),
+            ("llm_rate_limit_wait_seconds_total", "counter", "Time spent waiting for the rate limiter", "wait"),
+            ("llm_prompt_tokens_total", "counter", "Prompt tokens", "prompt"),
+            ("llm_completion_tokens_total", "counter", "Completion tokens", "completion"),
+            ("llm_cached_prompt_tokens_total", "counter", "Cached prompt tokens", "cached"),
+            ("llm_cost_usd_total", "counter", "Estimated cost in USD", "cost"),
+        ]
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (agent, route, model, status), s in sorted(series.items()):
+                labels = f'agent="{_escape(agent)}",route="{_escape(route)}",model="{_escape(model)}",status="{status}"'
+                lines.append(f"{name}{{{labels}}} {s[field]:g}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str | Path):
+        """Write llm_metrics.json + llm_metrics.prom into `directory`."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "llm_metrics.json").write_text(self.to_json(), encoding="utf-8")
+        (directory / "llm_metrics.prom").write_text(self.to_prometheus(), encoding="utf-8")
+        print(f"📊 LLM metrics exported to {directory}/llm_metrics.json and llm_metrics.prom")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
 
 
 metrics = LLMMetrics()
@@ -1,89 +1,68 @@
-from crewai import Crew, Task, Process
-
-from agents.content_planner import content_planner
-from agents.seo_optimiser import seo_optimiser
-from agents.visual_artist import visual_artist
-
-from tools.search_tools import web_search
+# crewai, openai and tavily are imported on first use (agents/ + tools/ registries,
+# Crew/Task inside the pipeline functions) → importing main stays cheap
+from agents import get_agent
+from tools import get_tool
+from tools.search_tools import set_search_mode
 from tools.cms_tools import post_to_wordpress_raw
+from tools.internal_links import internal_links_prompt
 
 from datetime import datetime
-from agents.topic_scout import topic_scout
-import json
+from agents.topic_scout import SALESFORCE_CONTENT_PILLARS
+from tools.topic_index import build_topic_index, record_topic
 from textwrap import dedent
 
-import time
-import threading
-
 from llm_metrics import metrics
 
 from utils.sanitize_article_payload import sanitize_article_payload
-from tools.image_tools import generate_diagram_image_b64
-from tools.cms_tools import upload_image_base64_to_wordpress
-import re
+from utils.json_repair import parse_llm_json
+from utils.run_checkpoint import RunCheckpoint
+from utils.tracing import tracer
+from utils.html_rewriter import (
+    find_image_placeholders,
+    rewrite_html,
+    DiagramFigures,
+    PlaceholderToComment,
+    LinkAttributes,
+)
+from tools.image_tools import generate_diagram_image, IMAGE_MODEL
+from tools.image_cache import image_cache
+from tools.cms_tools import upload_image_to_wordpress
+from tools.image_optimizer import optimize_image, warm_up as warm_up_image_optimizer
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+import threading
 
+from config.settings import settings
 from datetime import datetime
 
 CURRENT_YEAR = datetime.now().year
 
+# Keys an agent's JSON must have (missing ones trigger the repair step)
+TOPIC_KEYS = ("topic", "main_keyword")
+ARTICLE_KEYS = ("title", "slug", "content_html")
 
-INTERNAL_LINKS = [
-    {
-        "title": "Apex Batch Class: The Ultimate Guide for Salesforce Developers (2025 Edition)",
-        "url": "https://thetechnologyfiction.com/blog/apex-batch-class-the-ultimate-guide-for-salesforce-developers-2025-edition/",
-        "anchor": "Salesforce Apex Batch Class beginner’s guide"
-    },
-    {
-        "title": "Salesforce Vlocity (OmniStudio) Explained Simply With Use Cases",
-        "url": "https://thetechnologyfiction.com/blog/salesforce-vlocity-omnistudio-explained-simply-with-use-cases/",
-        "anchor": "Salesforce Omnistudio use cases"
-    },
-    {
-        "title": "Linear Search and Sorting Algorithm in Salesforce Using Apex | 2025",
-        "url": "https://thetechnologyfiction.com/blog/linear-search-and-sorting-algorithm-in-salesforce-using-apex-2025/",
-        "anchor": "Algorithm in Salesforce"
-    },
-    {
-        "title": "Salesforce Data Loader: A Comprehensive Guide",
-        "url": "https://thetechnologyfiction.com/blog/salesforce-data-loader-a-comprehensive-guide/",
-        "anchor": "Salesforce Data Loader"
-    }
-    # add more as you create new posts
-]
-
-
+PIPELINE_AGENTS = ("topic_scout", "content_planner", "seo_optimiser", "visual_artist")
 
+# Batch mode runs several pipelines at once. CrewAI agents keep per-run state
+# (executor, tools handler), so each batch worker thread uses its own copies;
+# the copies share the original LLM objects → same HTTP pools, caches, limits, metrics.
+_thread_agents = threading.local()
 
-# OpenAI allows 3 requests per minute on your plan
-MAX_REQUESTS_PER_MIN = 3
-REQUEST_WINDOW = 60  # seconds
 
-request_count = 0
-window_start_time = time.time()
-lock = threading.Lock()
+def use_agent_copies():
+    """Give the current thread private copies of the pipeline agents."""
+    copies = {}
+    for name in PIPELINE_AGENTS:
+        copy = get_agent(name).copy()
+        # copy() hands over the same tools list → give each thread its own list
+        copy.tools = list(copy.tools or [])
+        copies[name] = copy
+    _thread_agents.agents = copies
 
 
-def wait_for_rate_limit():
-    global request_count, window_start_time
-
-    with lock:
-        current_time = time.time()
-        elapsed = current_time - window_start_time
-
-        # If 60 sec window passed → reset counter
-        if elapsed >= REQUEST_WINDOW:
-            window_start_time = current_time
-            request_count = 0
-
-        # If limit reached → wait until new window
-        if request_count >= MAX_REQUESTS_PER_MIN:
-            sleep_time = REQUEST_WINDOW - elapsed
-            print(f"⏳ Rate limit: sleeping {sleep_time:.1f}s to avoid 429...")
-            time.sleep(sleep_time)
-            window_start_time = time.time()
-            request_count = 0
-
-        request_count += 1
+def _agent(name: str):
+    copies = getattr(_thread_agents, "agents", None)
+    return copies[name] if copies else get_agent(name)
 
 
 
@@ -104,13 +83,16 @@ def get_content_mode_for_today() -> str:
 
 
 
-def pick_salesforce_topic_for_today() -> tuple[str, str]:
+@tracer.traced("pick_salesforce_topic_for_today")
+def pick_salesforce_topic_for_today(exclude: list[str] | None = None) -> tuple[str, str]:
     """
     Uses the Topic Scout agent + web search to select a Salesforce blog topic
     and main keyword for today. Returns (topic, main_keyword).
+    `exclude`: topics not published yet but already taken (e.g. earlier picks of a batch).
     """
     mode = get_content_mode_for_today()
     print(f"🧠 Topic mode for today: {mode.upper()}")
+    set_search_mode(mode)
 
     # Explanation text for the agent
     mode_instructions = {
@@ -209,146 +191,280 @@ def pick_salesforce_topic_for_today() -> tuple[str, str]:
         - "outline_seed" is just rough section ideas; the planner + writer will flesh them out.
     """)
 
+    topic_index = build_topic_index()
+    for taken in exclude or []:
+        topic_index.add(taken)
+    avoid: list[str] = list(exclude or [])
+
+    for attempt in range(1 + max(0, settings.TOPIC_DEDUP_RETRIES)):
+        task_description = description
+        if avoid:
+            task_description += dedent(f"""
+
+                ALREADY COVERED (CRITICAL):
+                We already published posts too similar to these. Pick a clearly DIFFERENT topic:
+                {chr(10).join("- " + title for title in avoid)}
+            """)
+
+        data = _run_topic_scout(task_description)
+        if data is None:
+            fallback_topic = "Salesforce Flow Best Practices in 2025"
+            fallback_keyword = "Salesforce Flow best practices"
+            print(f"➡️ Falling back to topic: {fallback_topic}")
+            return fallback_topic, fallback_keyword
+
+        topic = data.get("topic")
+        main_keyword = data.get("main_keyword")
+
+        if not topic:
+            print("\n⚠️ Topic missing in JSON. Falling back to default topic.")
+            topic = "Salesforce Flow Best Practices in 2025"
+        if not main_keyword:
+            main_keyword = topic
+
+        duplicate = topic_index.find_duplicate(topic) or topic_index.find_duplicate(main_keyword)
+        if duplicate is None:
+            print(f"✅ Chosen topic: {topic}")
+            print(f"✅ Main keyword: {main_keyword}")
+            print(f"📝 Reason: {data.get('reason')}")
+            print(f"🎯 Mode: {data.get('content_mode')} | Audience: {data.get('target_audience')}")
+            return topic, main_keyword
+
+        print(f"\n⚠️ Topic '{topic}' is too close to existing post '{duplicate[0]}' (similarity {duplicate[1]:.2f}).")
+        avoid.append(duplicate[0])
+
+    # Scout kept proposing covered topics → take the next uncovered backlog pillar
+    for pillar in SALESFORCE_CONTENT_PILLARS:
+        if topic_index.find_duplicate(pillar) is None:
+            print(f"➡️ Using next backlog topic: {pillar}")
+            return pillar, pillar
+
+    print(f"➡️ Backlog exhausted, keeping last proposal: {topic}")
+    return topic, main_keyword
+
+
+def _run_topic_scout(description: str) -> dict | None:
+    """Run the Topic Scout once and return its parsed JSON (None if unparseable)."""
+    from crewai import Crew, Task, Process
+
     topic_task = Task(
         description=description,
-        agent=topic_scout,
+        agent=_agent("topic_scout"),
         expected_output="A single JSON object with topic, main_keyword, content_mode, target_audience, reason, outline_seed."
     )
+    tracer.trace_task(topic_task, "Topic Scout")
 
     crew = Crew(
-        agents=[topic_scout],
+        agents=[_agent("topic_scout")],
         tasks=[topic_task],
         process=Process.sequential,
         verbose=True,
     )
 
-    wait_for_rate_limit()
     metrics.register_call(label="Topic Scout")
     result = crew.kickoff()
 
-    # Parse JSON from result
+    data = parse_llm_json(result, TOPIC_KEYS, label="Topic Scout output")
+    if data is None or "topic" not in data:
+        print("\n⚠️ Topic Scout did not return JSON with a 'topic' key.")
+        print("Raw result (truncated):\n", str(result)[:800])
+        return None
+    return data
 
-    text = str(result)
 
-    # 1️⃣ Try to extract JSON from a ```json ... ``` fenced block
-    json_str = None
-    fence_match = re.search(r"```json\s*(\{.*?})\s*```", text, re.DOTALL)
-    if fence_match:
-        json_str = fence_match.group(1)
-    else:
-        # 2️⃣ Fallback: scan for any dict that contains "topic"
-        best_data = None
-        idx = 0
-        while True:
-            start = text.find("{", idx)
-            if start == -1:
-                break
-            end = text.find("}", start)
-            if end == -1:
-                break
-
-            candidate_str = text[start : end + 1]
-            try:
-                candidate = json.loads(candidate_str)
-            except Exception:
-                idx = start + 1
-                continue
+@tracer.traced("diagram")
+def _generate_and_upload_diagram(idx: int, total: int, description: str, run: RunCheckpoint | None = None) -> str | None:
+    """
+    Generate one diagram + upload it to WordPress.
+    Returns the <figure> HTML, or None if the image could not be produced.
+    With a run checkpoint, image bytes and the uploaded media are saved as soon as they exist.
+    """
+    tracer.current().set(idx=idx, description=description)
+    saved = run.get_diagram(idx, description) if run else None
+    if saved and saved["media_url"]:
+        print(f"⏩ Diagram {idx}: already uploaded in this run (media ID {saved['media_id']}).")
+        return _figure_html(saved["media_url"], description)
 
-            if isinstance(candidate, dict) and "topic" in candidate:
-                best_data = candidate
-                break
+    print(f"🖼 Generating diagram {idx}/{total}: {description}")
 
-            idx = start + 1
+    prompt = (
+        f"Create a clean technical DIAGRAM / FLOWCHART / INFOGRAPHIC for Salesforce explaining: {description}. "
+        "Use boxes, arrows, labels, and clear structure. White background. Flat 2D. No people. No logos/branding."
+    )
 
-        if best_data is None:
-            print("\n⚠️ Topic Scout did not return JSON with a 'topic' key.")
-            print("Raw result (truncated):\n", text[:800])
-            fallback_topic = "Salesforce Flow Best Practices in 2025"
-            fallback_keyword = "Salesforce Flow best practices"
-            print(f"➡️ Falling back to topic: {fallback_topic}")
-            return fallback_topic, fallback_keyword
+    cache_key = image_cache.make_key(prompt, IMAGE_MODEL)
+    cached = image_cache.get(cache_key)
 
-        data = best_data
-    # If we got JSON from the fenced block, parse it
-    if json_str is not None:
-        try:
-            data = json.loads(json_str)
-        except Exception as e:
-            print("\n⚠️ Failed to parse Topic Scout JSON from fenced block.")
-            print("Error:", e)
-            print("JSON-ish string (truncated):\n", json_str[:800])
-            fallback_topic = "Salesforce Flow Best Practices in 2025"
-            fallback_keyword = "Salesforce Flow best practices"
-            print(f"➡️ Falling back to topic: {fallback_topic}")
-            return fallback_topic, fallback_keyword
+    if cached and cached["media_url"]:
+        print(f"♻️ Diagram {idx}: reusing cached image (media ID {cached['media_id']}).")
+        img_url, media_id, filename = cached["media_url"], cached["media_id"], cached["filename"]
+    else:
+        if saved and saved["data"]:
+            print(f"⏩ Diagram {idx}: reusing this run's image bytes, uploading.")
+            img_bytes, filename = saved["data"], saved["filename"]
+        elif cached:
+            print(f"♻️ Diagram {idx}: reusing cached image bytes, uploading.")
+            img_bytes, filename = cached["data"], cached["filename"]
+        else:
+            img_bytes = generate_diagram_image(prompt)
+            img_bytes, filename = optimize_image(img_bytes, f"diagram-{idx}.png")
+            if run:
+                run.save_diagram(idx, description, filename, data=img_bytes)
+
+        media = upload_image_to_wordpress(
+            img_bytes,
+            filename=filename
+        )
 
-    topic = data.get("topic")
-    main_keyword = data.get("main_keyword")
+        img_url, media_id = media.get("source_url"), media.get("id")
+        image_cache.put(cache_key, img_bytes, filename, media_id=media_id, media_url=img_url)
 
-    if not topic:
-        print("\n⚠️ Topic missing in JSON. Falling back to default topic.")
-        topic = "Salesforce Flow Best Practices in 2025"
-    if not main_keyword:
-        main_keyword = topic
+    if not img_url:
+        print(f"⚠️ Diagram {idx}: media upload succeeded but source_url missing. Skipping replacement for this image.")
+        return None
 
-    print(f"✅ Chosen topic: {topic}")
-    print(f"✅ Main keyword: {main_keyword}")
-    print(f"📝 Reason: {data.get('reason')}")
-    print(f"🎯 Mode: {data.get('content_mode')} | Audience: {data.get('target_audience')}")
+    if run:
+        run.save_diagram(idx, description, filename, media_id=media_id, media_url=img_url)
+    return _figure_html(img_url, description)
 
-    return topic, main_keyword
 
+def _figure_html(img_url: str, description: str) -> str:
+    return f"""
+        <figure class="wp-block-image">
+        <img src="{img_url}" alt="{description}">
+        <figcaption>{description}</figcaption>
+        </figure>
+        """
 
 
-def inject_images_into_content(content_html: str) -> str:
+def inject_images_into_content(content_html: str, run: RunCheckpoint | None = None) -> str:
     """
-    Finds IMAGE placeholders, generates diagrams via OpenAI,
-    uploads to WordPress, replaces placeholders with <img>.
+    Finds IMAGE placeholders (<!-- IMAGE: ... --> and <img_placeholder section="..."/>),
+    generates diagrams via OpenAI, uploads to WordPress, replaces placeholders with <img>.
+
+    Diagrams are generated + uploaded concurrently (IMAGE_WORKERS threads, still
+    bounded by the shared provider rate limits). A failed image leaves its placeholder
+    as an HTML comment and doesn't stop the others.
+
+    All HTML rewriting (figures, leftover placeholders, link attributes) happens in a
+    single pass, see utils/html_rewriter.py.
     """
-    pattern = r"<!-- IMAGE:\s*(.*?)\s*-->"
-    matches = re.findall(pattern, content_html)
+    descriptions = find_image_placeholders(content_html)
 
-    if not matches:
+    if not descriptions:
         print("🖼 No IMAGE placeholders found. Skipping image generation.")
-        return content_html
+        return rewrite_html(content_html, [LinkAttributes()])
+
+    total = len(descriptions)
+    figures: list[str | None] = [None] * total
+
+    # Start the optimizer's worker processes before the uploads need them
+    warm_up_image_optimizer()
+
+    with ThreadPoolExecutor(max_workers=max(1, settings.IMAGE_WORKERS)) as pool:
+        futures = {
+            # copy_context → each diagram's spans nest under the current pipeline span
+            pool.submit(copy_context().run, _generate_and_upload_diagram, idx, total, description, run): idx - 1
+            for idx, description in enumerate(descriptions, start=1)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                figures[i] = future.result()
+            except Exception as e:
+                print(f"⚠️ Diagram {i + 1}/{total} failed: {e}. Keeping its placeholder.")
 
-    for idx, description in enumerate(matches, start=1):
-        print(f"🖼 Generating diagram {idx}/{len(matches)}: {description}")
+    done = sum(f is not None for f in figures)
+    print(f"🖼 Injected {done}/{total} diagrams.")
+    return rewrite_html(content_html, [DiagramFigures(figures), PlaceholderToComment(), LinkAttributes()])
 
-        prompt = (
-            f"Create a clean technical DIAGRAM / FLOWCHART / INFOGRAPHIC for Salesforce explaining: {description}. "
-            "Use boxes, arrows, labels, and clear structure. White background. Flat 2D. No people. No logos/branding."
-        )
 
-        b64_img = generate_diagram_image_b64(prompt)
 
-        media = upload_image_base64_to_wordpress(
-            image_base64=b64_img,
-            filename=f"diagram-{idx}.png"
-        )
 
-        img_url = media.get("source_url")
-        if not img_url:
-            print("⚠️ Media upload succeeded but source_url missing. Skipping replacement for this image.")
-            continue
+@tracer.traced("run_blog_pipeline")
+def run_blog_pipeline(topic: str, main_keyword: str, run: RunCheckpoint | None = None):
+    """
+    Plan → write → diagrams → WordPress draft. Every stage is checkpointed under
+    data/runs/<run-id>/ (see utils/run_checkpoint.py); stages already done in `run`
+    are skipped, so a resumed run only pays for what failed or never ran.
+    """
+    print("🚀 Starting AI Blog Agent...\n")
+
+    run = run or RunCheckpoint()
+    tracer.current().set(topic=topic, run_id=run.run_id)
+    # Topics also come from --resume, --topics-file and service jobs, not only the scout
+    set_search_mode(get_content_mode_for_today())
+    print(f"🧾 Run ID: {run.run_id} (resume with: python main.py --resume {run.run_id})")
+    if run.load_json("topic") is None:
+        run.save_json("topic", {"topic": topic, "main_keyword": main_keyword})
+
+    posted = run.load_json("post")
+    if posted is not None:
+        print(f"⏩ Run {run.run_id} already posted to WordPress: id={posted.get('id')} link={posted.get('link')}")
+        return posted
+
+    raw_article = run.load_json("writer")
+    if raw_article is not None:
+        print("⏩ Writer JSON found in checkpoint, skipping planner + writer.")
+        result = raw_article
+    else:
+        result, raw_article = _plan_and_write(topic, main_keyword, run)
+        if raw_article is None:
+            return result
+        run.save_json("writer", raw_article)
 
-        img_tag = f"""
-        <figure class="wp-block-image">
-        <img src="{img_url}" alt="{description}">
-        <figcaption>{description}</figcaption>
-        </figure>
-        """
+    # ----------------------------------------
+    # 🔥 SANITIZE THE ARTICLE (MANDATORY FIELDS)
+    # ----------------------------------------
+    article = sanitize_article_payload(raw_article)
+
+    title = article["title"]
+    slug = article["slug"]
+    excerpt = article.get("meta_description") or "Salesforce article generated by AI automation."
+    content_html = inject_images_into_content(article["content_html"], run)
+
+    print("\n📝 Prepared article for WordPress:")
+    print(f"  Title: {title}")
+    print(f"  Slug: {slug}")
+    print(f"  Excerpt: {excerpt[:120]}...")
 
-        # Replace exactly one occurrence (first match)
-        content_html = re.sub(rf"<!-- IMAGE:\s*{re.escape(description)}\s*-->", img_tag, content_html, count=1)
+    # 📨 Post to WordPress as draft (Python, not LLM)
+    try:
+        wp_res = post_to_wordpress_raw(
+            title=title,
+            content=content_html,
+            slug=slug,
+            excerpt=excerpt
+        )
+        run.save_json("post", wp_res)
+        print("\n✅ Posted to WordPress as draft:")
+        print(f"  id={wp_res.get('id')}")
+        print(f"  status={wp_res.get('status')}")
+        print(f"  link={wp_res.get('link')}")
+    except Exception as e:
+        print("\n❌ Failed to post to WordPress.")
+        print("Error:", e)
+        print(f"↩️ Resume with: python main.py --resume {run.run_id}")
+        return result
 
-    return content_html
+    # The post exists now; a failure here only costs the duplicate-topic check
+    try:
+        record_topic(topic, main_keyword, title=title, slug=slug)
+    except Exception as e:
+        print(f"⚠️ Posted, but failed to record the topic in the topic index: {e}")
 
+    return result
 
 
+def _plan_and_write(topic: str, main_keyword: str, run: RunCheckpoint):
+    """
+    Planner (skipped when the outline is checkpointed) → writer + visual artist.
+    Returns (crew result, parsed article JSON or None).
+    """
+    from crewai import Crew, Task, Process
 
-def run_blog_pipeline(topic: str, main_keyword: str):
-    print("🚀 Starting AI Blog Agent...\n")
+    # Only the most relevant internal links go into the writer prompt
+    internal_links = internal_links_prompt(f"{topic} {main_keyword}").replace("\n", "\n" + " " * 10)
 
     # 1) PLAN: research + outline
     plan_task = Task(
@@ -356,16 +472,37 @@ def run_blog_pipeline(topic: str, main_keyword: str):
             f"Research and prepare a detailed blog outline for: '{topic}'. "
             f"Use web search and propose H2/H3 structure, plus key points to cover."
         ),
-        agent=content_planner,
-        tools=[web_search],
+        agent=_agent("content_planner"),
+        tools=[get_tool("web_search")],
         expected_output="A clear outline with H2/H3 headings and bullet points."
     )
 
+    tracer.trace_task(plan_task, "Planner")
+    outline = run.load_text("outline")
+    if outline is not None:
+        print("⏩ Planner outline found in checkpoint, skipping planner.")
+    else:
+        plan_crew = Crew(
+            agents=[_agent("content_planner")],
+            tasks=[plan_task],
+            process=Process.sequential,
+            verbose=True,
+        )
+        metrics.register_call(label=f"Planner for topic '{topic}'")
+        plan_crew.kickoff(inputs={"topic": topic, "main_keyword": main_keyword})
+        outline = str(getattr(plan_task.output, "raw", plan_task.output))
+        run.save_text("outline", outline)
+
+    outline_block = outline.replace("\n", "\n" + " " * 8)
+
     # 2) WRITE: full SEO article
     write_task = Task(
     description=dedent(f"""
         Using the outline from the planner, write a full SEO-optimized blog article in clean HTML.
 
+        OUTLINE FROM THE PLANNER:
+        {outline_block}
+
         MAIN KEYWORD:
         - '{main_keyword}' must appear in the title, introduction paragraph, and at least one <h2> header.
 
@@ -384,7 +521,7 @@ def run_blog_pipeline(topic: str, main_keyword: str):
         INTERNAL LINKING (VERY IMPORTANT):
         - You MUST include 2–3 contextual internal links to the following articles:
 
-          {INTERNAL_LINKS}
+          {internal_links}
 
         - Insert these links naturally inside the article body.
         - Format them using clickable <a href="URL" target="_blank" rel="noopener noreferrer">anchor text</a>.
@@ -414,7 +551,7 @@ def run_blog_pipeline(topic: str, main_keyword: str):
 
 
     """),
-    agent=seo_optimiser,
+    agent=_agent("seo_optimiser"),
     expected_output=(
         "A full HTML article PLUS a strict JSON block containing "
         "title, slug, meta_description, content_html."
@@ -451,7 +588,7 @@ def run_blog_pipeline(topic: str, main_keyword: str):
             If there are no placeholders, return:
             { "images": [] }
         """),
-        agent=visual_artist,
+        agent=_agent("visual_artist"),
         context=[write_task],
         expected_output="JSON with diagram prompts for each image placeholder."
         )
@@ -470,18 +607,18 @@ def run_blog_pipeline(topic: str, main_keyword: str):
         expected_output="The WordPress API response with the created post's ID and link."
     )
     '''
+    tracer.trace_task(write_task, "Writer")
+    tracer.trace_task(image_task, "Visual Artist")
     crew = Crew(
-        agents=[content_planner, seo_optimiser, visual_artist],
-        #tasks=[plan_task, write_task, image_task, publish_task],
-        tasks=[plan_task, write_task, image_task],
+        agents=[_agent("seo_optimiser"), _agent("visual_artist")],
+        tasks=[write_task, image_task],
         process=Process.sequential,
         verbose=True,
     )
 
 
-    wait_for_rate_limit()
-    metrics.register_call(label=f"Blog pipeline for topic '{topic}'")
-    result = crew.kickoff(inputs={"topic": topic, "main_keyword": main_keyword})
+    metrics.register_call(label=f"Writer for topic '{topic}'")
+    result = crew.kickoff()
 
     print("\n🎉 DONE! Final pipeline output:\n")
     print(result)
@@ -494,77 +631,87 @@ def run_blog_pipeline(topic: str, main_keyword: str):
 
     if writer_output is None:
         print("\n⚠️ write_task.output is None. Skipping WordPress posting.")
-        return result
-
-    # If CrewAI already gives us a dict, use it directly
-    if isinstance(writer_output, dict):
-        raw_article = writer_output
-    else:
-        # Otherwise, parse JSON from the text
-        text = str(writer_output)
-        start = text.find("{")
-        end = text.rfind("}")
-        if start == -1 or end == -1 or end <= start:
-            print("\n⚠️ Could not find article JSON in write_task.output. Skipping WordPress posting.")
-            print("Raw writer_output (truncated):\n", text[:500])
-            return result
-
-        json_str = text[start:end+1]
-        try:
-            raw_article = json.loads(json_str)
-        except Exception as e:
-            print("\n⚠️ Failed to parse article JSON from write_task.output. Skipping WordPress posting.")
-            print("Error:", e)
-            print("JSON string (truncated):\n", json_str[:500])
-            return result
-
-    # ----------------------------------------
-    # 🔥 SANITIZE THE ARTICLE (MANDATORY FIELDS)
-    # ----------------------------------------
-    article = sanitize_article_payload(raw_article)
-
-    title = article["title"]
-    slug = article["slug"]
-    excerpt = article.get("meta_description") or "Salesforce article generated by AI automation."
-    content_html = inject_images_into_content(article["content_html"])
-
-    print("\n📝 Prepared article for WordPress:")
-    print(f"  Title: {title}")
-    print(f"  Slug: {slug}")
-    print(f"  Excerpt: {excerpt[:120]}...")
-
-    # 📨 Post to WordPress as draft (Python, not LLM)
-    try:
-        wp_res = post_to_wordpress_raw(
-            title=title,
-            content=content_html,
-            slug=slug,
-            excerpt=excerpt
-        )
-        print("\n✅ Posted to WordPress as draft:")
-        print(f"  id={wp_res.get('id')}")
-        print(f"  status={wp_res.get('status')}")
-        print(f"  link={wp_res.get('link')}")
-    except Exception as e:
-        print("\n❌ Failed to post to WordPress.")
-        print("Error:", e)
+        return result, None
 
-    return result
+    raw_article = parse_llm_json(writer_output, ARTICLE_KEYS, label="writer output")
+    if raw_article is None:
+        print("\n⚠️ Could not find article JSON in write_task.output. Skipping WordPress posting.")
+        print("Raw writer_output (truncated):\n", str(writer_output)[:500])
+        print(f"↩️ Planner outline is saved, resume with: python main.py --resume {run.run_id}")
+    return result, raw_article
 
 
 
 
 if __name__ == "__main__":
-    # 1) Let Topic Scout choose the best topic for today
-    topic, main_keyword = pick_salesforce_topic_for_today()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI Blog Agent: pick a topic, write it, post a WordPress draft.")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a failed run (or batch) from its checkpoints in data/runs/")
+    parser.add_argument("--batch", type=int, metavar="N", help="Pick N different topics and write them concurrently")
+    parser.add_argument("--topics-file", help='Batch over a topics file ("topic | main keyword" lines or a JSON list)')
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent pipelines in batch mode (default: BATCH_WORKERS)")
+    parser.add_argument("--record", metavar="CASSETTE", help="Record all provider HTTP traffic to this cassette file")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Serve provider HTTP traffic from this cassette (offline)")
+    parser.add_argument("--replay-latency", type=float, default=None, help="Sleep this × the recorded latency per response")
+    args = parser.parse_args()
+
+    import sys
+    import batch
+    from utils import http_cassette
+
+    # batch.py imports the pipeline as "main" → give it this module instead of a second copy
+    sys.modules.setdefault("main", sys.modules[__name__])
+
+    if args.record or args.replay:
+        http_cassette.install("record" if args.record else "replay", args.record or args.replay, args.replay_latency)
+    elif settings.HTTP_CASSETTE_MODE != "off":
+        http_cassette.install(settings.HTTP_CASSETTE_MODE, settings.HTTP_CASSETTE_PATH)
+
+    batch_mode = bool(args.batch or args.topics_file) or bool(args.resume and batch.is_batch(args.resume))
+    if batch_mode:
+        run = RunCheckpoint.resume(args.resume) if args.resume else batch.new_batch()
+    else:
+        run = RunCheckpoint.resume(args.resume) if args.resume else RunCheckpoint()
+    if settings.TRACING_ENABLED:
+        tracer.configure(run.dir / "trace.jsonl")
+
+    if batch_mode:
+        with tracer.span("batch", batch_id=run.run_id, resumed=bool(args.resume)):
+            if args.resume:
+                items = None
+            elif args.topics_file:
+                items = batch.load_topics_file(args.topics_file)
+            else:
+                items = batch.pick_topics(args.batch)
+            batch.BatchRun(run).run(items, workers=args.workers)
 
-    # 2) Run your existing blog pipeline with that topic
-    run_blog_pipeline(
-        topic=topic,
-        main_keyword=main_keyword
-    )
+    else:
+        with tracer.span("run", run_id=run.run_id, resumed=bool(args.resume)):
+            saved_topic = run.load_json("topic")
+
+            # 1) Let Topic Scout choose the best topic for today (unless this run already has one)
+            if saved_topic:
+                topic, main_keyword = saved_topic["topic"], saved_topic["main_keyword"]
+                print(f"⏩ Resuming run {run.run_id}: {topic} (done: {', '.join(run.stages()) or 'nothing'})")
+            else:
+                topic, main_keyword = pick_salesforce_topic_for_today()
+                run.save_json("topic", {"topic": topic, "main_keyword": main_keyword})
+
+            # 2) Run your existing blog pipeline with that topic
+            run_blog_pipeline(
+                topic=topic,
+                main_keyword=main_keyword,
+                run=run,
+            )
 
     from llm_metrics import metrics
+    from llm_cache import llm_cache
     print("========== LLM METRICS ==========")
     print(metrics.summary())
-
+    print(llm_cache.summary())
+    metrics.export(run.dir)
+    if http_cassette.active():
+        print(http_cassette.active().summary())
+    if settings.TRACING_ENABLED:
+        print(f"🧭 Trace written to {tracer.path} (view: python -m utils.tracing {run.run_id})")
@@ -3,12 +3,17 @@ from pathlib import Path
 
 from config.settings import settings
 from tools.cms_tools import (
+    find_post_by_slug,
     post_to_wordpress_raw,
-    upload_image_base64_to_wordpress,
+    upload_image_to_wordpress,
     set_post_featured_image,
 )
-from tools.image_tools import generate_featured_image_raw
-from tools.image_file_loader import load_image_as_base64
+from tools.image_tools import generate_featured_image_raw, IMAGE_MODEL
+from tools.image_cache import image_cache
+from tools.image_file_loader import map_image_file
+from tools.image_optimizer import optimize_image
+from utils.html_rewriter import rewrite_html, HeroImage, LinkAttributes
+from utils.run_checkpoint import RunCheckpoint
 
 
 # ✅ EDIT THIS per article you want to publish
@@ -19,6 +24,7 @@ def inject_hero_image(content_html: str, media_url: str, title: str) -> str:
     """
     Inject a hero <img> tag right after the first <h1>...</h1> in the HTML.
     If no <h1> is found, prepend the hero image at the top.
+    Link attributes are normalized in the same pass (see utils/html_rewriter.py).
     """
     hero_img_html = (
         f'\n<p>'
@@ -27,14 +33,7 @@ def inject_hero_image(content_html: str, media_url: str, title: str) -> str:
         f'</p>\n'
     )
 
-    lower_html = content_html.lower()
-    h1_close_idx = lower_html.find("</h1>")
-
-    if h1_close_idx != -1:
-        insert_pos = h1_close_idx + len("</h1>")
-        return content_html[:insert_pos] + hero_img_html + content_html[insert_pos:]
-    else:
-        return hero_img_html + content_html
+    return rewrite_html(content_html, [HeroImage(hero_img_html), LinkAttributes()])
 
 
 
@@ -65,7 +64,12 @@ def get_best_media_url(media_json: dict) -> str | None:
 
 
 
-def publish_from_json(json_path: str):
+def publish_from_json(json_path: str, run: RunCheckpoint | None = None):
+    """
+    Featured image → draft post → featured_media. With `run` (service jobs), every
+    WordPress write is checkpointed, so a retry skips what already went through
+    instead of uploading another image / creating another draft.
+    """
     path = Path(json_path)
     if not path.exists():
         raise FileNotFoundError(f"JSON file not found: {path}")
@@ -84,15 +88,21 @@ def publish_from_json(json_path: str):
     # ----------------------------------------------------
     # 1️⃣ Decide image strategy: MOCK vs REAL
     # ----------------------------------------------------
-    if settings.GEMINI_IMAGE_MOCK:
+    media = run.load_json("featured_media") if run else None
+    if media:
+        media_id, media_url = media["media_id"], media["media_url"]
+        print(f"\n⏩ Featured image already uploaded by a previous attempt. Media ID = {media_id}")
+
+    elif settings.GEMINI_IMAGE_MOCK:
         print("\n🧪 MOCK MODE: Using local test image instead of Gemini...")
 
         # Load your real test image (adjust name if needed)
         local_img_path = "data/test_images/sample.png"
-        img_b64 = load_image_as_base64(local_img_path)
+        img_bytes = map_image_file(local_img_path)
 
         print("📤 Uploading local test image to WordPress media library...")
-        media_json = upload_image_base64_to_wordpress(img_b64, filename=f"{slug}.png")
+        img_bytes, filename = optimize_image(img_bytes, f"{slug}.png")
+        media_json = upload_image_to_wordpress(img_bytes, filename=filename)
         media_id = media_json.get("id")
         media_url = get_best_media_url(media_json)
 
@@ -105,25 +115,43 @@ def publish_from_json(json_path: str):
 
 
     else:
-        # REAL MODE → call Gemini + upload to WP
-        print("\n🖼️ Generating featured image via Gemini...")
+        # REAL MODE → generate (or reuse cached) image + upload to WP
         prompt = (
             f"Featured image for blog article titled '{title}'. "
             "Minimal, flat tech illustration, Salesforce automation theme, 16:9 aspect ratio."
         )
-        img_b64 = generate_featured_image_raw(prompt)
-
-        print("📤 Uploading image to WordPress media library...")
-        media_json = upload_image_base64_to_wordpress(img_b64, filename=f"{slug}.png")
-        media_id = media_json.get("id")
-        media_url = get_best_media_url(media_json)
-
-        print("📦 Full media JSON (debug, first 500 chars):")
-        print(str(media_json)[:500])
-
-        print(f"🎉 Uploaded LOCAL TEST IMAGE. Media ID = {media_id}")
-        print("🖼️ Test Image URL:", media_url)
-
+        cache_key = image_cache.make_key(prompt, IMAGE_MODEL)
+        cached = image_cache.get(cache_key)
+
+        if cached and cached["media_url"]:
+            media_id = cached["media_id"]
+            media_url = cached["media_url"]
+            print(f"\n♻️ Reusing cached featured image. Media ID = {media_id}")
+            print("🖼️ Image URL:", media_url)
+        else:
+            if cached:
+                print("\n♻️ Reusing cached featured image bytes...")
+                img_bytes, filename = cached["data"], cached["filename"]
+            else:
+                print("\n🖼️ Generating featured image...")
+                img_bytes = generate_featured_image_raw(prompt)
+                img_bytes, filename = optimize_image(img_bytes, f"{slug}.png")
+
+            print("📤 Uploading image to WordPress media library...")
+            media_json = upload_image_to_wordpress(img_bytes, filename=filename)
+            media_id = media_json.get("id")
+            media_url = get_best_media_url(media_json)
+            image_cache.put(cache_key, img_bytes, filename, media_id=media_id, media_url=media_url)
+
+            print("📦 Full media JSON (debug, first 500 chars):")
+            print(str(media_json)[:500])
+
+            print(f"🎉 Uploaded featured image. Media ID = {media_id}")
+            print("🖼️ Image URL:", media_url)
+
+
+    if run and not media:
+        run.save_json("featured_media", {"media_id": media_id, "media_url": media_url})
 
     # ----------------------------------------------------
     # 2️⃣ Inject hero <img> into HTML content (both modes)
@@ -134,13 +162,27 @@ def publish_from_json(json_path: str):
     # ----------------------------------------------------
     # 3️⃣ Create the WordPress Post (draft)
     # ----------------------------------------------------
-    print("\n📨 Creating WordPress post as draft...")
-    post_json = post_to_wordpress_raw(
-        title=title,
-        content=content_with_hero,
-        slug=slug,
-        excerpt=meta_description,
-    )
+    post_json = run.load_json("post") if run else None
+    if post_json is None and run and run.load_json("post_request"):
+        # A previous attempt sent the POST but never saw the answer (e.g. read timeout)
+        post_json = find_post_by_slug(slug)
+        if post_json:
+            print("⏩ Found the draft a previous attempt created.")
+            run.save_json("post", post_json)
+    if post_json is None:
+        print("\n📨 Creating WordPress post as draft...")
+        if run:
+            run.save_json("post_request", {"slug": slug})
+        post_json = post_to_wordpress_raw(
+            title=title,
+            content=content_with_hero,
+            slug=slug,
+            excerpt=meta_description,
+        )
+        if run:
+            run.save_json("post", post_json)
+    else:
+        print("\n⏩ Draft already created by a previous attempt.")
 
     post_id = post_json.get("id")
     post_link = post_json.get("link")
@@ -150,15 +192,20 @@ def publish_from_json(json_path: str):
     # ----------------------------------------------------
     # 4️⃣ Attach Featured Image (only in REAL mode)
     # ----------------------------------------------------
-    if not settings.GEMINI_IMAGE_MOCK and media_id:
+    if run and run.load_json("featured_set"):
+        print("\n⏩ Featured image already set on the post.")
+    elif not settings.GEMINI_IMAGE_MOCK and media_id:
         print("\n📌 Setting featured image on the post...")
         updated_post = set_post_featured_image(post_id, media_id)
         print("Post 'featured_media' field:", updated_post.get("featured_media"))
+        if run:
+            run.save_json("featured_set", {"post_id": post_id, "media_id": media_id})
     else:
         print("\n📌 Skipping featured_media update (MOCK mode).")
 
     print("\n✅ DONE — Post created with hero image injected into content!")
     print("Final Post URL:", post_link)
+    return post_json
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+# service.py
+"""
+Long-running job service: the agents, LLM clients, HTTP pools, caches and the image
+optimizer pool are built once and stay warm; work comes in as jobs over HTTP.
+
+    python service.py --workers 2 --port 8000
+
+    POST /jobs/generate   {"topic"?, "main_keyword"?}     Topic Scout picks one if topic is empty
+    POST /jobs/publish    {"run_id"} or {"json_path"}     publish_from_json on a writer JSON under RUNS_DIR
+    GET  /jobs            ?status=queued|running|done|failed&limit=50
+    GET  /jobs/{id}       status, attempts, result, error, per-stage timings
+    GET  /health          worker count, queue counts
+    GET  /metrics         LLM metrics (Prometheus text format)
+
+Jobs live in a SQLite queue (utils/job_queue.py) with retries + visibility timeouts,
+so queued work survives a restart. Generate and publish jobs checkpoint into
+data/runs/job-<id>/, so a retry resumes where the previous attempt failed and never
+uploads the featured image or creates the draft twice. Per-stage timings come from
+the trace spans of the job (utils/tracing.py).
+"""
+
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from config.settings import settings
+from llm_metrics import metrics
+from utils.job_queue import JobQueue
+from utils.run_checkpoint import RunCheckpoint
+from utils.tracing import tracer
+
+import main as pipeline
+import publish_from_json
+
+# Spans reported as per-stage timings of a job
+STAGE_SPANS = {
+    "pick_salesforce_topic_for_today",
+    "task: Topic Scout",
+    "task: Planner",
+    "task: Writer",
+    "task: Visual Artist",
+    "diagram",
+    "llm.call",
+    "web_search",
+    "openai.images.generate",
+    "image.optimize",
+    "wordpress POST media",
+    "wordpress POST posts",
+    "run_blog_pipeline",
+    "publish_from_json",
+}
+
+
+class GenerateRequest(BaseModel):
+    topic: str | None = None
+    main_keyword: str | None = None
+    max_attempts: int | None = None
+
+
+class PublishRequest(BaseModel):
+    run_id: str | None = None
+    json_path: str | None = None
+    max_attempts: int | None = None
+
+
+def publish_path(payload: dict) -> Path:
+    """Writer JSON of a publish job; only files under RUNS_DIR can be published over HTTP."""
+    runs_dir = Path(settings.RUNS_DIR).resolve()
+    if payload.get("run_id"):
+        path = (runs_dir / payload["run_id"] / "writer.json").resolve()
+    else:
+        path = Path(payload["json_path"]).resolve()
+    if not path.is_relative_to(runs_dir):
+        raise ValueError(f"{path} is outside the runs directory {runs_dir}")
+    return path
+
+
+class JobService:
+    def __init__(self, workers: int = None):
+        self.queue = JobQueue(
+            settings.JOB_QUEUE_PATH,
+            visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            retry_delay=settings.JOB_RETRY_DELAY,
+        )
+        self.workers = max(1, workers or settings.JOB_WORKERS)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._running: dict[str, str] = {}  # job id → trace id
+        self._timings: dict[str, dict] = {}  # trace id → {span name: {"count", "total_s"}}
+        self._lock = threading.Lock()
+        self._scout_lock = threading.Lock()  # search mode + topic index are process-wide
+        tracer.add_listener(self._on_span)
+
+    # ---------- per-stage timings ----------
+
+    def _on_span(self, span):
+        if span.name not in STAGE_SPANS:
+            return
+        with self._lock:
+            timings = self._timings.get(span.trace_id)
+            if timings is None:
+                return
+            stage = timings.setdefault(span.name, {"count": 0, "total_s": 0.0})
+            stage["count"] += 1
+            stage["total_s"] = round(stage["total_s"] + (span.end_ns - span.start_ns) / 1e9, 4)
+
+    def live_timings(self, job_id: str) -> dict | None:
+        with self._lock:
+            trace_id = self._running.get(job_id)
+            return dict(self._timings.get(trace_id, {})) if trace_id else None
+
+    # ---------- workers ----------
+
+    def start(self):
+        # Build the agents (LLM clients, tools) and start the optimizer's worker
+        # processes up front, so the first job doesn't pay for them
+        for name in pipeline.PIPELINE_AGENTS:
+            pipeline.get_agent(name)
+        pipeline.warm_up_image_optimizer()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+        print(f"🛰 Job service: {self.workers} workers, queue {settings.JOB_QUEUE_PATH} {self.queue.counts()}")
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _heartbeat(self):
+        """Extend the leases of jobs this process is still working on."""
+        interval = max(1.0, settings.JOB_VISIBILITY_TIMEOUT / 3)
+        while not self._stop.wait(interval):
+            with self._lock:
+                job_ids = list(self._running)
+            for job_id in job_ids:
+                self.queue.extend(job_id)
+
+    def _worker(self):
+        name = threading.current_thread().name
+        while not self._stop.is_set():
+            job = self.queue.claim(name)
+            if job is None:
+                self._stop.wait(1.0)
+                continue
+            self._execute(job)
+
+    def _execute(self, job: dict):
+        job_id = job["id"]
+        print(f"🛰 Job {job_id} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']} on {job['worker']}")
+        start = time.perf_counter()
+        with tracer.span("job", new_trace=True, job_id=job_id, kind=job["kind"], attempt=job["attempts"]) as span:
+            with self._lock:
+                self._running[job_id] = span.trace_id
+                self._timings[span.trace_id] = {}
+            try:
+                if job["kind"] == "generate":
+                    result = self._generate(job_id, job["payload"])
+                else:
+                    result = self._publish(job_id, job["payload"])
+                error = None
+            except Exception as e:
+                result, error = None, f"{e.__class__.__name__}: {e}"[:1000]
+
+        with self._lock:
+            self._running.pop(job_id, None)
+            timings = self._timings.pop(span.trace_id, {})
+        timings["job"] = {"count": 1, "total_s": round(time.perf_counter() - start, 4)}
+
+        if error is None:
+            self.queue.complete(job_id, result, timings)
+            print(f"✅ Job {job_id} done in {timings['job']['total_s']:.1f}s")
+        else:
+            status = self.queue.fail(job_id, error, timings)
+            print(f"❌ Job {job_id} failed ({error}) → {status}")
+
+    # ---------- job kinds ----------
+
+    def _generate(self, job_id: str, payload: dict) -> dict:
+        pipeline.use_agent_copies()
+        run = RunCheckpoint(f"job-{job_id}")
+
+        # A retry keeps the topic the first attempt picked
+        saved = run.load_json("topic")
+        if saved:
+            topic, main_keyword = saved["topic"], saved["main_keyword"]
+        elif payload.get("topic"):
+            topic, main_keyword = payload["topic"], payload.get("main_keyword") or payload["topic"]
+        else:
+            with self._scout_lock:
+                topic, main_keyword = pipeline.pick_salesforce_topic_for_today()
+
+        pipeline.run_blog_pipeline(topic, main_keyword, run=run)
+        post = run.load_json("post")
+        if post is None:
+            raise RuntimeError(f"Run {run.run_id} finished without a WordPress post (done: {', '.join(run.stages())})")
+        return {"run_id": run.run_id, "topic": topic, "main_keyword": main_keyword,
+                "post_id": post.get("id"), "link": post.get("link")}
+
+    def _publish(self, job_id: str, payload: dict) -> dict:
+        path = publish_path(payload)
+        # A retry skips the WordPress writes the previous attempt already made
+        run = RunCheckpoint(f"job-{job_id}")
+        with tracer.span("publish_from_json", path=str(path)):
+            post = publish_from_json.publish_from_json(str(path), run=run)
+        return {"json_path": str(path), "post_id": post.get("id"), "link": post.get("link")}
+
+
+service = JobService()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    service.start()
+    yield
+    service.stop()
+
+
+app = FastAPI(title="AI Blog Agent job service", lifespan=lifespan)
+
+
+def _job_view(job: dict) -> dict:
+    live = service.live_timings(job["id"]) if job["status"] == "running" else None
+    return {**job, "timings": live if live is not None else job["timings"]}
+
+
+@app.post("/jobs/generate", status_code=202)
+def create_generate_job(request: GenerateRequest):
+    payload = {"topic": request.topic, "main_keyword": request.main_keyword}
+    job_id = service.queue.enqueue("generate", payload, request.max_attempts)
+    return {"id": job_id, "status": "queued"}
+
+
+@app.post("/jobs/publish", status_code=202)
+def create_publish_job(request: PublishRequest):
+    if not (request.run_id or request.json_path):
+        raise HTTPException(status_code=422, detail="run_id or json_path is required")
+    payload = {"run_id": request.run_id, "json_path": request.json_path}
+    try:
+        publish_path(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    job_id = service.queue.enqueue("publish", payload, request.max_attempts)
+    return {"id": job_id, "status": "queued"}
+
+
+@app.get("/jobs")
+def list_jobs(status: str | None = None, limit: int = 50):
+    return [_job_view(job) for job in service.queue.list(status, limit)]
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = service.queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _job_view(job)
+
+
+@app.get("/health")
+def health():
+    return {"workers": service.workers, "jobs": service.queue.counts()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return metrics.to_prometheus()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="AI Blog Agent job service (warm agents + SQLite job queue).")
+    parser.add_argument("--host", default=settings.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent jobs (default: JOB_WORKERS)")
+    args = parser.parse_args()
+
+    if args.workers:
+        service.workers = max(1, args.workers)
+    # One process on purpose: the warm agents, pools and queue workers live in it
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -6,10 +6,10 @@ def main():
         "cloud icons, and business users collaborating. Clean modern blog featured image."
     )
 
-    img_b64 = generate_featured_image_raw(prompt)
-    print("Type:", type(img_b64))
-    print("Length:", len(img_b64))
-    print("Preview:", str(img_b64)[:200])
+    img_bytes = generate_featured_image_raw(prompt)
+    print("Type:", type(img_bytes))
+    print("Length:", len(img_bytes))
+    print("Preview:", bytes(img_bytes[:16]))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+# test_import_budget.py
+"""
+Import-time budget check (python -X importtime, fresh interpreter per entry point).
+
+Fails when an entry point takes longer than its budget to import, or pulls in one of
+the heavy libraries that should only load on first use (agents/ + tools/ registries).
+
+    python test_import_budget.py
+    IMPORT_BUDGET_SCALE=2 python test_import_budget.py     # slower machine / cold disk
+"""
+
+import os
+import subprocess
+import sys
+
+# Module → max cumulative import seconds (crewai alone is ~2.5s on a warm disk)
+BUDGETS = {
+    "config.settings": 0.15,
+    "publish_from_json": 0.5,
+    "main": 0.8,
+    "service": 1.2,
+}
+
+# Must not be imported until something is actually built / called
+HEAVY_MODULES = ("crewai", "openai", "tavily", "chromadb", "litellm")
+
+SCALE = float(os.getenv("IMPORT_BUDGET_SCALE", 1))
+
+
+def import_profile(module: str) -> tuple[float, set[str]]:
+    """(cumulative import seconds of `module`, top-level packages imported) in a fresh interpreter."""
+    env = {
+        "OPENAI_API_KEY": "sk-import-budget",
+        "TAVILY_API_KEY": "tvly-import-budget",
+        "WP_BASE_URL": "http://localhost",
+        "WP_USERNAME": "budget",
+        "WP_APP_PASSWORD": "budget",
+        **os.environ,
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    assert proc.returncode == 0, f"import {module} failed:\n{proc.stderr[-2000:]}"
+
+    seconds, packages = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        packages.add(name.strip().split(".")[0])
+        if name.strip() == module:
+            seconds = int(cumulative) / 1e6
+    return seconds, packages
+
+
+def test_import_budgets():
+    failures = []
+    for module, budget in BUDGETS.items():
+        seconds, packages = import_profile(module)
+        heavy = sorted(p for p in HEAVY_MODULES if p in packages)
+        print(f"{module:<20} {seconds:6.3f}s (budget {budget * SCALE:.2f}s) heavy imports: {', '.join(heavy) or 'none'}")
+        if seconds > budget * SCALE:
+            failures.append(f"{module} imports in {seconds:.3f}s > {budget * SCALE:.2f}s")
+        if heavy:
+            failures.append(f"{module} eagerly imports {', '.join(heavy)}")
+    assert not failures, "\n".join(failures)
+
+
+if __name__ == "__main__":
+    test_import_budgets()
+    print("✅ Import budgets OK")
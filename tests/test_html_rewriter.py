@@ -0,0 +1,77 @@
+# tests/test_html_rewriter.py
+from utils.html_rewriter import (
+    DiagramFigures,
+    HeroImage,
+    LinkAttributes,
+    PlaceholderToComment,
+    find_image_placeholders,
+    rewrite_html,
+)
+
+ARTICLE = (
+    "<h1>Flows</h1>"
+    "<p>Intro</p>"
+    "<!-- IMAGE: record-triggered flow -->"
+    "<h2>Setup</h2>"
+    '<img_placeholder section="flow builder canvas" />'
+    "<p>More</p>"
+    "<!--IMAGE:   debug log   -->"
+)
+
+
+def test_find_image_placeholders_in_document_order():
+    assert find_image_placeholders(ARTICLE) == ["record-triggered flow", "flow builder canvas", "debug log"]
+    assert find_image_placeholders("<p>no images</p>") == []
+
+
+def test_placeholder_attribute_fallbacks_and_closing_tag():
+    html = "<img_placeholder description='a'></img_placeholder><img_placeholder alt=b/>"
+    assert find_image_placeholders(html) == ["a", "b"]
+    assert rewrite_html(html, [PlaceholderToComment()]) == "<!-- IMAGE: a --><!-- IMAGE: b -->"
+
+
+def test_diagram_figures_replace_by_index_and_keep_failed_ones():
+    out = rewrite_html(ARTICLE, [DiagramFigures(["<figure>1</figure>", None, "<figure>3</figure>"])])
+    assert "<figure>1</figure>" in out
+    assert "<figure>3</figure>" in out
+    assert '<img_placeholder section="flow builder canvas" />' in out
+    assert "IMAGE: record-triggered flow" not in out
+
+
+def test_first_matching_transform_wins():
+    out = rewrite_html(ARTICLE, [DiagramFigures([None, "<figure>2</figure>"]), PlaceholderToComment()])
+    assert "<figure>2</figure>" in out
+    assert "<img_placeholder" not in out
+
+
+def test_hero_image_after_first_h1_only():
+    html = "<h1>A</h1><p>x</p><h1>B</h1>"
+    assert rewrite_html(html, [HeroImage("<img/>")]) == "<h1>A</h1><img/><p>x</p><h1>B</h1>"
+
+
+def test_hero_image_prepended_without_h1():
+    assert rewrite_html("<p>x</p>", [HeroImage("<img/>")]) == "<img/><p>x</p>"
+
+
+def test_external_links_get_target_and_rel():
+    out = rewrite_html('<a href="https://example.com">x</a>', [LinkAttributes()])
+    assert out == '<a href="https://example.com" target="_blank" rel="noopener noreferrer">x</a>'
+
+
+def test_existing_rel_is_extended_not_replaced():
+    out = rewrite_html("<a href='https://example.com' rel='nofollow' target='_self'>x</a>", [LinkAttributes()])
+    assert out == "<a href='https://example.com' rel=\"nofollow noopener noreferrer\" target='_self'>x</a>"
+
+
+def test_relative_and_complete_links_are_untouched():
+    html = (
+        '<a href="/blog/flows">x</a>'
+        '<a href="#top">y</a>'
+        '<a href="https://example.com" target="_blank" rel="noopener noreferrer">z</a>'
+    )
+    assert rewrite_html(html, [LinkAttributes()]) == html
+
+
+def test_text_between_tokens_is_copied_verbatim():
+    html = "<p>a &amp; b</p>\n<pre>{ }</pre>"
+    assert rewrite_html(html, [LinkAttributes(), PlaceholderToComment()]) == html
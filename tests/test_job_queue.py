@@ -0,0 +1,112 @@
+# tests/test_job_queue.py
+import pytest
+
+from utils import job_queue
+from utils.job_queue import JobQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(tmp_path / "jobs.sqlite", visibility_timeout=10, max_attempts=3, retry_delay=2)
+
+
+def test_enqueue_and_claim(queue):
+    job_id = queue.enqueue("generate", {"topic": "Flows"})
+    assert queue.get(job_id)["status"] == "queued"
+
+    job = queue.claim("w1")
+    assert job["id"] == job_id
+    assert job["payload"] == {"topic": "Flows"}
+    assert (job["status"], job["attempts"], job["worker"]) == ("running", 1, "w1")
+    assert queue.claim("w2") is None  # hidden while the lease runs
+
+
+def test_claim_takes_the_oldest_job_first(queue, clock):
+    first = queue.enqueue("generate", {})
+    clock.now += 1
+    second = queue.enqueue("publish", {})
+    assert queue.claim("w1")["id"] == first
+    assert queue.claim("w1")["id"] == second
+
+
+def test_complete(queue):
+    job_id = queue.enqueue("publish", {"run_id": "r1"})
+    queue.claim("w1")
+    queue.complete(job_id, {"post_id": 7}, {"job": {"count": 1, "total_s": 0.5}})
+
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"post_id": 7}
+    assert job["timings"]["job"]["total_s"] == 0.5
+    assert queue.claim("w1") is None
+    assert queue.counts() == {"done": 1}
+
+
+def test_fail_backs_off_then_gives_up_after_max_attempts(queue, clock):
+    job_id = queue.enqueue("generate", {})
+
+    for attempt, delay in ((1, 2), (2, 4)):
+        assert queue.claim("w1")["attempts"] == attempt
+        assert queue.fail(job_id, f"boom {attempt}") == "queued"
+        assert queue.get(job_id)["visible_at"] == clock.now + delay
+        clock.now += delay - 0.5
+        assert queue.claim("w1") is None  # still backing off
+        clock.now += 0.5
+
+    assert queue.claim("w1")["attempts"] == 3
+    assert queue.fail(job_id, "boom 3") == "failed"
+    clock.now += 100
+    assert queue.claim("w1") is None
+    assert queue.get(job_id)["error"] == "boom 3"
+
+
+def test_expired_lease_is_claimable_again(queue, clock):
+    job_id = queue.enqueue("generate", {})
+    queue.claim("w1")
+
+    clock.now += 9
+    queue.extend(job_id)  # heartbeat from the live worker
+    clock.now += 9
+    assert queue.claim("w2") is None
+
+    clock.now += 2  # worker died: lease expires
+    job = queue.claim("w2")
+    assert (job["id"], job["attempts"], job["worker"]) == (job_id, 2, "w2")
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(tmp_path, clock):
+    queue = JobQueue(tmp_path / "jobs.sqlite", visibility_timeout=10, max_attempts=1)
+    job_id = queue.enqueue("generate", {})
+    queue.claim("w1")
+
+    clock.now += 11
+    assert queue.claim("w2") is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "visibility timeout expired" in job["error"]
+
+
+def test_list_filters_by_status(queue, clock):
+    done = queue.enqueue("publish", {})
+    queue.claim("w1")
+    queue.complete(done)
+    clock.now += 1
+    queued = queue.enqueue("generate", {})
+
+    assert [j["id"] for j in queue.list()] == [queued, done]
+    assert [j["id"] for j in queue.list("queued")] == [queued]
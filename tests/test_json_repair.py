@@ -0,0 +1,75 @@
+# tests/test_json_repair.py
+import json
+
+import pytest
+
+from utils import json_repair
+from utils.json_repair import lenient_fix, parse_llm_json
+
+
+def _loads(text: str) -> dict:
+    fixed = lenient_fix(text)
+    assert fixed is not None
+    return json.loads(fixed)
+
+
+def test_lenient_fix_drops_trailing_commas():
+    assert _loads('{"title": "A", "tags": ["x", "y",],}') == {"title": "A", "tags": ["x", "y"]}
+
+
+def test_lenient_fix_escapes_unescaped_quotes():
+    data = _loads('{"content_html": "<a href="https://example.com">link</a>", "slug": "s"}')
+    assert data == {"content_html": '<a href="https://example.com">link</a>', "slug": "s"}
+
+
+def test_lenient_fix_escapes_raw_newlines_and_tabs():
+    data = _loads('{"content_html": "<p>one</p>\n<p>two</p>\t", "slug": "s"}')
+    assert data["content_html"] == "<p>one</p>\n<p>two</p>\t"
+
+
+def test_lenient_fix_closes_truncated_tail():
+    assert _loads('{"title": "A", "tags": ["x", "y"], "content_html": "<p>cut off') == {
+        "title": "A",
+        "tags": ["x", "y"],
+        "content_html": "<p>cut off",
+    }
+    assert _loads('{"title": "A", "meta":') == {"title": "A", "meta": None}
+    assert _loads('{"title": "A", "tags": ["x",') == {"title": "A", "tags": ["x"]}
+
+
+def test_lenient_fix_ignores_prose_before_the_object():
+    assert _loads('Here you go:\n{"title": "A",}') == {"title": "A"}
+    assert lenient_fix("no json here") is None
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_llm_fix(broken, required_keys):
+        calls.append(broken)
+        return '{"title": "Fixed", "slug": "fixed"}'
+
+    monkeypatch.setattr(json_repair, "_llm_fix", fake_llm_fix)
+    return calls
+
+
+def test_missing_keys_do_not_trigger_llm_repair(llm_calls):
+    data = parse_llm_json('{"title": "A"}', ("title", "slug"), use_llm=True)
+    assert data == {"title": "A"}
+    assert llm_calls == []
+
+
+def test_local_repair_does_not_trigger_llm_repair(llm_calls):
+    data = parse_llm_json('{"title": "A", "slug": "a",}', ("title", "slug"), use_llm=True)
+    assert data == {"title": "A", "slug": "a"}
+    assert llm_calls == []
+
+
+def test_llm_repair_only_when_nothing_parses(llm_calls):
+    data = parse_llm_json('{"title": ]]', ("title", "slug"), use_llm=True)
+    assert data == {"title": "Fixed", "slug": "fixed"}
+    assert len(llm_calls) == 1
+
+    assert parse_llm_json('{"title": ]]', ("title", "slug"), use_llm=False) is None
+    assert len(llm_calls) == 1
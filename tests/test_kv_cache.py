@@ -0,0 +1,89 @@
+# tests/test_kv_cache.py
+import pytest
+
+from utils import kv_cache
+from utils.kv_cache import SQLiteCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(kv_cache.time, "time", clock)
+    return clock
+
+
+def _rows(cache: SQLiteCache) -> int:
+    return cache._db().execute(f"SELECT COUNT(*) FROM {cache.table}").fetchone()[0]
+
+
+def test_set_and_get(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "c.sqlite", "t")
+    assert cache.get("k") is None
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    cache.set("k", "v2")
+    assert cache.get("k") == "v2"
+
+
+def test_entries_expire_after_their_ttl(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "c.sqlite", "t")
+    cache.set("short", "a", ttl_seconds=10)
+    cache.set("forever", "b")
+
+    clock.now += 9
+    assert cache.get("short") == "a"
+    clock.now += 2
+    assert cache.get("short") is None
+    assert _rows(cache) == 1  # expired row deleted on read
+
+    clock.now += 10**8
+    assert cache.get("forever") == "b"
+
+
+def test_max_age_ignores_old_rows_without_deleting_them(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "c.sqlite", "t")
+    cache.set("k", "v", ttl_seconds=100)
+    clock.now += 50
+    assert cache.get("k", max_age_seconds=30) is None
+    assert cache.get("k", max_age_seconds=60) == "v"
+
+
+def test_lru_eviction_keeps_recently_read_entries(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "c.sqlite", "t", max_entries=2)
+    cache.set("a", "1")
+    clock.now += 1
+    cache.set("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"  # a is now more recent than b
+    clock.now += 1
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert _rows(cache) == 2
+
+
+def test_writes_purge_expired_rows(tmp_path, clock):
+    cache = SQLiteCache(tmp_path / "c.sqlite", "t")
+    cache.set("old", "x", ttl_seconds=5)
+    clock.now += 6
+    cache.set("new", "y")
+    assert _rows(cache) == 1
+
+
+def test_tables_in_one_file_are_independent(tmp_path, clock):
+    path = tmp_path / "c.sqlite"
+    first, second = SQLiteCache(path, "first"), SQLiteCache(path, "second")
+    first.set("k", "1")
+    second.set("k", "2")
+    assert (first.get("k"), second.get("k")) == ("1", "2")
+    assert SQLiteCache(path, "first").get("k") == "1"  # persisted
@@ -0,0 +1,72 @@
+# tests/test_llm_cache.py
+import types
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, cached_call
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(tmp_path / "llm.sqlite", ttl_seconds=3600, max_entries=100)
+    monkeypatch.setattr(llm_cache, "llm_cache", cache)
+    return cache
+
+
+def _llm(**params):
+    return types.SimpleNamespace(**{"model": "gpt-test", "temperature": 0.7, **params})
+
+
+class Provider:
+    def __init__(self, response="answer"):
+        self.response = response
+        self.calls = 0
+
+    def __call__(self, messages, *args, **kwargs):
+        self.calls += 1
+        return self.response
+
+
+MESSAGES = [{"role": "user", "content": "Write about Flows"}]
+
+
+def test_repeated_call_is_served_from_the_cache(cache):
+    provider = Provider()
+    assert cached_call(provider, _llm(), MESSAGES) == "answer"
+    assert cached_call(provider, _llm(), MESSAGES) == "answer"
+    assert provider.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_messages_params_and_tools(cache):
+    provider = Provider()
+    cached_call(provider, _llm(), MESSAGES)
+    cached_call(provider, _llm(), [{"role": "user", "content": "Write about Apex"}])
+    cached_call(provider, _llm(temperature=0.0), MESSAGES)
+    cached_call(provider, _llm(), MESSAGES, tools=[{"function": {"name": "web_search"}}])
+    assert provider.calls == 4
+
+
+def test_only_plain_text_answers_are_cached(cache):
+    provider = Provider(response={"tool_calls": []})
+    cached_call(provider, _llm(), MESSAGES)
+    cached_call(provider, _llm(), MESSAGES)
+    assert provider.calls == 2
+
+
+def test_refresh_mode_skips_reads_but_overwrites(cache):
+    cached_call(Provider("old"), _llm(), MESSAGES)
+    cache.mode = "refresh"
+    assert cached_call(Provider("new"), _llm(), MESSAGES) == "new"
+    cache.mode = "on"
+    assert cached_call(Provider("unused"), _llm(), MESSAGES) == "new"
+
+
+def test_off_mode_bypasses_the_cache(cache):
+    cache.mode = "off"
+    provider = Provider()
+    cached_call(provider, _llm(), MESSAGES)
+    cached_call(provider, _llm(), MESSAGES)
+    assert provider.calls == 2
+    assert cache.summary() == "LLM cache: off"
@@ -0,0 +1,101 @@
+# tests/test_rate_limiter.py
+import threading
+
+import pytest
+
+from config.settings import settings
+from utils.rate_limiter import ProviderLimiter, RateLimiter, TokenBucket, estimate_request_tokens, estimate_tokens
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_bucket_starts_full_and_caps_bursts(clock):
+    bucket = TokenBucket(60, clock)  # 1 token / second, burst of 60
+    assert [bucket.reserve() for _ in range(60)] == [0.0] * 60
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    # A long idle period refills up to the capacity, never beyond
+    clock.now += 3600
+    assert [bucket.reserve() for _ in range(60)] == [0.0] * 60
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_bucket_refills_continuously(clock):
+    bucket = TokenBucket(60, clock)
+    bucket.reserve(60)
+    clock.now += 2.5
+    assert bucket.reserve(2) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.5)
+
+
+def test_waiters_are_served_in_reservation_order(clock):
+    bucket = TokenBucket(6, clock)  # 1 token / 10 s
+    bucket.reserve(6)
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([10.0, 20.0, 30.0])
+
+
+def test_oversized_request_is_capped_to_the_capacity(clock):
+    bucket = TokenBucket(100, clock)
+    bucket.reserve(100)
+    assert bucket.reserve(10_000) == pytest.approx(60.0)
+
+
+def test_disabled_bucket_never_waits(clock):
+    bucket = TokenBucket(0, clock)
+    assert bucket.reserve(10**9) == 0.0
+
+
+def test_provider_waits_for_the_slower_budget(clock):
+    sleeps = []
+    limiter = ProviderLimiter("openai_chat", rpm=60, tpm=600, clock=clock, sleep=sleeps.append)
+    assert limiter.acquire(tokens=600) == 0.0
+    # Requests are still available, tokens are not: 300 tokens at 10/s
+    assert limiter.acquire(tokens=300) == pytest.approx(30.0)
+    assert sleeps == [pytest.approx(30.0)]
+
+
+def test_provider_sleeps_outside_the_lock(clock):
+    """A thread waiting for its slot must not block other threads from reserving."""
+    release = threading.Event()
+    sleeping = threading.Event()
+
+    def slow_sleep(seconds):
+        sleeping.set()
+        assert release.wait(5)
+
+    limiter = ProviderLimiter("tavily", rpm=1, clock=clock, sleep=slow_sleep)
+    limiter.acquire()  # uses the only token
+    waiter = threading.Thread(target=limiter.acquire)
+    waiter.start()
+    assert sleeping.wait(5)
+
+    # The waiter is asleep; reserving on the same buckets still returns immediately
+    assert limiter.requests.reserve() == pytest.approx(120.0)
+    release.set()
+    waiter.join(5)
+    assert not waiter.is_alive()
+
+
+def test_unknown_provider_is_unlimited():
+    assert RateLimiter().acquire("somewhere", tokens=10**6) == 0.0
+
+
+def test_token_estimates_include_the_completion_budget(monkeypatch):
+    messages = [{"role": "system", "content": "x" * 400}, {"role": "user", "content": "y" * 800}]
+    assert estimate_tokens(messages) == 300
+    assert estimate_request_tokens(messages, max_tokens=2000) == 2300
+    assert estimate_request_tokens(messages, max_tokens=0) == 300
+
+    monkeypatch.setattr(settings, "OPENAI_CHAT_COMPLETION_TOKENS", 4096)
+    assert estimate_request_tokens(messages) == 300 + 4096
@@ -0,0 +1,68 @@
+# tests/test_tracing.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from utils.tracing import Tracer
+
+
+def _collect(tracer: Tracer) -> list:
+    spans = []
+    tracer.add_listener(spans.append)
+    return spans
+
+
+def test_spans_nest_and_propagate_through_copied_context():
+    tracer = Tracer()
+    spans = _collect(tracer)
+    with tracer.span("run") as run:
+        with tracer.span("stage") as stage:
+            with ThreadPoolExecutor(1) as pool:
+                pool.submit(copy_context().run, _search, tracer, "run").result()
+    search = next(s for s in spans if s.name == "web_search")
+    assert stage.parent_span_id == run.span_id
+    assert search.parent_span_id == stage.span_id
+    assert {s.trace_id for s in spans} == {run.trace_id}
+
+
+def test_overlapping_traces_keep_their_own_spans():
+    """Two concurrent jobs: each job's tool spans land in that job's trace, never the other's."""
+    tracer = Tracer()
+    spans = _collect(tracer)
+    both_started = threading.Barrier(2)
+    traces = {}
+
+    def job(name):
+        with tracer.span("job", new_trace=True, job=name) as span:
+            traces[name] = span.trace_id
+            both_started.wait(5)
+            with ThreadPoolExecutor(1) as pool:  # e.g. a CrewAI tool thread
+                pool.submit(copy_context().run, _search, tracer, name).result()
+            both_started.wait(5)
+
+    threads = [threading.Thread(target=job, args=(n,)) for n in ("a", "b")]
+    [t.start() for t in threads]
+    [t.join(5) for t in threads]
+
+    searches = {s.attributes["job"]: s for s in spans if s.name == "web_search"}
+    assert searches["a"].trace_id == traces["a"]
+    assert searches["b"].trace_id == traces["b"]
+
+
+def _search(tracer, name):
+    with tracer.span("web_search", job=name):
+        pass
+
+
+def test_thread_without_context_does_not_join_another_trace():
+    tracer = Tracer()
+    spans = _collect(tracer)
+    with tracer.span("job", new_trace=True) as job:
+        orphan = threading.Thread(target=_search, args=(tracer, "none"))
+        orphan.start()
+        orphan.join(5)
+        assert tracer.current() is job
+    search = next(s for s in spans if s.name == "web_search")
+    assert search.trace_id != job.trace_id
+    assert search.parent_span_id is None
+    assert tracer.current() is None
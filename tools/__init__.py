@@ -0,0 +1,14 @@
+# tools/__init__.py
+"""
+Lazy CrewAI tool registry: `get_tool("web_search")` wraps the plain function as a
+CrewAI tool (importing crewai) on first use. The plain functions need no crewai.
+"""
+
+from utils.lazy_registry import LazyRegistry
+
+registry = LazyRegistry({
+    "web_search": "tools.search_tools:build_web_search_tool",
+    "post_to_wordpress": "tools.cms_tools:build_post_to_wordpress_tool",
+})
+
+get_tool = registry.get
@@ -1,18 +1,119 @@
 import base64
+import mimetypes
+import random
+import time
+
 import requests
-from crewai.tools import tool
+from requests.adapters import HTTPAdapter
 from config.settings import settings
+from utils.rate_limiter import rate_limiter, WORDPRESS
+from utils.tracing import tracer
 
-def post_to_wordpress_raw(title: str, content: str, slug: str, excerpt: str) -> dict:
-    """Low-level helper: Post an article to WordPress as a draft and return raw JSON."""
-    auth = f"{settings.WP_USERNAME}:{settings.WP_APP_PASSWORD}"
-    token = base64.b64encode(auth.encode()).decode()
+# Status codes worth retrying (rate limited / transient server errors)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# POST to a create endpoint (posts, media): a 5xx or read timeout may come AFTER
+# WordPress committed it, so only retry when the request was certainly not processed.
+# Updates of an existing object (POST posts/<id>) pass idempotent=True.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+NON_IDEMPOTENT_RETRY_STATUSES = {429, 503}
+
+# Upper bound for a server-sent Retry-After (seconds)
+MAX_RETRY_AFTER = 60.0
+
+
+class WordPressClient:
+    """
+    Thin WordPress REST client shared by every CMS call in the process.
+
+    - One keep-alive `requests.Session` (TLS connection reused across calls)
+    - Connection pool sized for concurrent media uploads (WP_POOL_SIZE)
+    - Basic auth header built once
+    - Explicit (connect, read) timeouts
+    - Jittered exponential backoff on 429/5xx and connection resets/timeouts;
+      creating POSTs (not idempotent) only retry connection failures and 429/503
+    """
+
+    def __init__(self, base_url: str, username: str, app_password: str):
+        self.base_url = (base_url or "").rstrip("/")
+
+        token = base64.b64encode(f"{username}:{app_password}".encode()).decode()
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Basic {token}"})
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.WP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.timeout = (settings.WP_CONNECT_TIMEOUT, settings.WP_READ_TIMEOUT)
+        self.max_retries = settings.WP_MAX_RETRIES
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/wp-json/wp/v2/{path.lstrip('/')}"
+
+    def _backoff(self, attempt: int, response=None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when WordPress sends one."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), MAX_RETRY_AFTER)
+        return random.uniform(0, min(30.0, 1.0 * (2 ** attempt)))
+
+    def request(self, method: str, path: str, idempotent: bool = None, **kwargs) -> requests.Response:
+        """`idempotent`: safe to repeat after a 5xx / read timeout (default: by HTTP method)."""
+        url = self.url(path)
+        kwargs.setdefault("timeout", self.timeout)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        # ConnectTimeout is a ConnectionError; ReadTimeout means the server got the request
+        retry_errors = (requests.ConnectionError, requests.Timeout) if idempotent else (requests.ConnectionError,)
+        retry_statuses = RETRY_STATUSES if idempotent else NON_IDEMPOTENT_RETRY_STATUSES
+
+        with tracer.span(f"wordpress {method} {path}") as span:
+            for attempt in range(self.max_retries + 1):
+                span.set(attempts=attempt + 1)
+                rate_limiter.acquire(WORDPRESS)
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except retry_errors as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+                    print(f"🔁 WordPress {method} {path} failed ({e.__class__.__name__}). Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
+
+                if response.status_code in retry_statuses and attempt < self.max_retries:
+                    delay = self._backoff(attempt, response)
+                    print(f"🔁 WordPress {method} {path} → {response.status_code}. Retrying in {delay:.1f}s...")
+                    time.sleep(delay)
+                    continue
+
+                span.set(
+                    status_code=response.status_code,
+                    bytes_sent=_body_size(response.request.body),
+                    bytes=len(response.content),
+                )
+                response.raise_for_status()
+                return response
+
+    def post_json(self, path: str, payload: dict, idempotent: bool = False) -> requests.Response:
+        return self.request("POST", path, idempotent=idempotent, json=payload)
+
+
+def _body_size(body) -> int | None:
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray, memoryview, str)):
+        return len(body)
+    return None  # streamed body
+
+
+wp_client = WordPressClient(settings.WP_BASE_URL, settings.WP_USERNAME, settings.WP_APP_PASSWORD)
 
-    headers = {
-        "Authorization": f"Basic {token}",
-        "Content-Type": "application/json"
-    }
 
+def post_to_wordpress_raw(title: str, content: str, slug: str, excerpt: str) -> dict:
+    """Low-level helper: Post an article to WordPress as a draft and return raw JSON."""
     payload = {
         "title": title,
         "content": content,
@@ -23,22 +124,16 @@ def post_to_wordpress_raw(title: str, content: str, slug: str, excerpt: str) ->
         "author": settings.DEFAULT_AUTHOR_ID
     }
 
-    res = requests.post(
-    f"{settings.WP_BASE_URL.rstrip('/')}/wp-json/wp/v2/posts",
-    json=payload,
-    headers=headers
-    )
+    res = wp_client.post_json("posts", payload)
 
     print("Status:", res.status_code)
     print("Response text:", res.text[:500])  # debug, first 500 chars
 
-    res.raise_for_status()
     return res.json()
 
 
 
-@tool("Post to WordPress")
-def post_to_wordpress(title: str = None, content: str = None, slug: str = None, excerpt: str = None) -> str:
+def _post_to_wordpress(title: str = None, content: str = None, slug: str = None, excerpt: str = None) -> str:
     """
     CrewAI Tool: Post an article to WordPress as a draft.
     Returns a short string summary for the agent.
@@ -71,38 +166,48 @@ def post_to_wordpress(title: str = None, content: str = None, slug: str = None,
 
 
 
-def upload_image_base64_to_wordpress(image_base64: str, filename: str = "featured.png"):
-    """
-    Uploads a base64 PNG image to WordPress and returns media JSON (includes media ID).
-    Uses multipart/form-data which is the most compatible way with WordPress hosts.
+def upload_image_to_wordpress(image, filename: str = "featured.png"):
     """
+    Uploads raw image bytes (bytes / bytearray / memoryview, e.g. an mmap from
+    tools/image_file_loader.map_image_file) to WordPress and returns media JSON (includes media ID).
 
-    auth = f"{settings.WP_USERNAME}:{settings.WP_APP_PASSWORD}"
-    token = base64.b64encode(auth.encode()).decode()
-
-    binary_data = base64.b64decode(image_base64)
-
-    url = settings.WP_BASE_URL.rstrip("/") + "/wp-json/wp/v2/media"
-
-    headers = {
-        "Authorization": f"Basic {token}",
+    WP_MEDIA_UPLOAD_MODE:
+    - "multipart" (default): multipart/form-data, the most compatible way with WordPress hosts
+    - "raw": the bytes are sent as-is as the request body (no multipart copy), which
+      the WP REST API also accepts with a Content-Disposition header
+    """
+    mime_type = mimetypes.guess_type(filename)[0] or "image/png"
+    url = wp_client.url("media")
+
+    if settings.WP_MEDIA_UPLOAD_MODE == "raw":
+        print("📤 Uploading image as raw body to:", url)
+        headers = {
+            "Content-Type": mime_type,
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        }
+        response = wp_client.request("POST", "media", data=memoryview(image), headers=headers)
+    else:
+        files = {
+            "file": (filename, image, mime_type),
+        }
+        print("📤 Uploading image via multipart/form-data to:", url)
         # DO NOT set Content-Type here, requests will set correct multipart boundary
-    }
-
-    files = {
-        "file": (filename, binary_data, "image/png"),
-    }
-
-    print("📤 Uploading image via multipart/form-data to:", url)
-    response = requests.post(url, headers=headers, files=files)
+        response = wp_client.request("POST", "media", files=files)
 
     print("🔍 Media upload status:", response.status_code)
     print("🔍 Media upload response (first 500 chars):", response.text[:500])
 
-    response.raise_for_status()
     return response.json()
 
 
+def upload_image_base64_to_wordpress(image_base64: str, filename: str = "featured.png"):
+    """
+    Uploads a base64 PNG image to WordPress and returns media JSON (includes media ID).
+    Prefer upload_image_to_wordpress() when you already have the bytes.
+    """
+    return upload_image_to_wordpress(base64.b64decode(image_base64), filename=filename)
+
+
 
 
 
@@ -111,20 +216,63 @@ def set_post_featured_image(post_id: int, media_id: int):
     """
     Updates a WordPress post so that the given media_id becomes the featured image.
     """
-    auth = f"{settings.WP_USERNAME}:{settings.WP_APP_PASSWORD}"
-    token = base64.b64encode(auth.encode()).decode()
-
-    headers = {
-        "Authorization": f"Basic {token}",
-        "Content-Type": "application/json"
-    }
-
     payload = {
         "featured_media": media_id
     }
 
-    url = settings.WP_BASE_URL.rstrip("/") + f"/wp-json/wp/v2/posts/{post_id}"
-
-    response = requests.post(url, headers=headers, json=payload)
-    response.raise_for_status()
+    # Setting a field on an existing post can safely be repeated → retry 5xx too
+    response = wp_client.post_json(f"posts/{post_id}", payload, idempotent=True)
     return response.json()
+
+
+def find_post_by_slug(slug: str) -> dict | None:
+    """The post (any status but trash) with this slug, or None."""
+    response = wp_client.request(
+        "GET",
+        "posts",
+        params={"slug": slug, "status": "publish,future,draft,pending,private", "_fields": "id,link,status,slug"},
+    )
+    posts = response.json()
+    return posts[0] if posts else None
+
+
+def fetch_wordpress_posts(status: str = "publish", per_page: int = 100, fields: str = "id,link,title,content,modified"):
+    """
+    Yields every post (`fields`, default id, link, title, content, modified) page by page.
+    Used to (re)build the local old-posts index and the topic index.
+    `status` may list several, e.g. "publish,draft".
+    """
+    page = 1
+    while True:
+        response = wp_client.request(
+            "GET",
+            "posts",
+            params={
+                "status": status,
+                "per_page": per_page,
+                "page": page,
+                "_fields": fields,
+            },
+        )
+        posts = response.json()
+        yield from posts
+
+        total_pages = int(response.headers.get("X-WP-TotalPages", page))
+        if page >= total_pages or not posts:
+            break
+        page += 1
+
+
+def build_post_to_wordpress_tool():
+    """CrewAI tool for agents (see tools/__init__.py: get_tool("post_to_wordpress"))."""
+    from crewai.tools import tool
+
+    return tool("Post to WordPress")(_post_to_wordpress)
+
+
+def __getattr__(name):
+    if name == "post_to_wordpress":
+        from tools import get_tool
+
+        return get_tool("post_to_wordpress")
+    raise AttributeError(name)
@@ -1,24 +1,352 @@
 #(RAG for referencing old posts)
+#
+# Two interchangeable stores behind the same add_old_post / query_similar_posts API:
+# - VECTOR_BACKEND=chroma: persistent Chroma collection (default)
+# - VECTOR_BACKEND=numpy:  memory-mapped .npy matrix + JSON sidecar, no chromadb import
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
 
-import chromadb
-from chromadb.utils import embedding_functions
 from config.settings import settings
+from tools.local_embeddings import HashingEmbeddingFunction
+from utils.vector_math import normalize_rows, top_k_cosine
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings without chromadb: one API request per call, many texts per request."""
+
+    def __init__(self, model: str = "text-embedding-3-small"):
+        from openai import OpenAI
+
+        self.model = model
+        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+
+    def __call__(self, input):
+        response = self.client.embeddings.create(model=self.model, input=list(input))
+        return [np.asarray(d.embedding, dtype=np.float32) for d in response.data]
+
+
+class ChromaPostStore:
+    """Persistent Chroma collection + in-memory NumPy top-k over its vectors."""
+
+    def __init__(self, path: str, name: str, embedding_fn):
+        import chromadb
+
+        # Persistent on-disk index → survives between runs, safe to import twice
+        self.client = chromadb.PersistentClient(path=path)
+        self.embedding_fn = embedding_fn
+        self.collection = self.client.get_or_create_collection(name=name, embedding_function=embedding_fn)
+        # In-memory NumPy copy of the collection for fast top-k (rebuilt after writes)
+        self._matrix_index = None
+
+    def get_metadatas(self, ids: list[str]) -> dict:
+        if not ids:
+            return {}
+        found = self.collection.get(ids=ids, include=["metadatas"])
+        return dict(zip(found["ids"], found["metadatas"]))
+
+    def all_ids(self) -> list[str]:
+        return self.collection.get(include=[])["ids"]
+
+    def all_metadatas(self) -> list[dict]:
+        return self.collection.get(include=["metadatas"])["metadatas"]
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict]):
+        self.collection.upsert(documents=documents, metadatas=metadatas, ids=ids)
+        self._matrix_index = None
+
+    def delete(self, ids: list[str]):
+        self.collection.delete(ids=ids)
+        self._matrix_index = None
+
+    def _load_matrix_index(self) -> dict:
+        """Pull every stored vector once into a normalized float32 matrix."""
+        if self._matrix_index is None:
+            data = self.collection.get(include=["embeddings", "metadatas", "documents"])
+            embeddings = data["embeddings"]
+            has_vectors = embeddings is not None and len(embeddings)
+            matrix = np.asarray(embeddings if has_vectors else np.zeros((0, 1)), dtype=np.float32)
+            self._matrix_index = {
+                "ids": data["ids"],
+                "metadatas": data["metadatas"],
+                "documents": data["documents"],
+                "matrix": normalize_rows(matrix),
+            }
+        return self._matrix_index
+
+    def query_batch(self, texts: list[str], n: int):
+        """Returns (index, top-k row indices, top-k scores) for a batch of query texts."""
+        index = self._load_matrix_index()
+        queries = normalize_rows(np.asarray(self.embedding_fn(list(texts)), dtype=np.float32))
+        idx, scores = top_k_cosine(index["matrix"], queries, n)
+        return index, idx, scores
+
+
+class NumpyPostStore:
+    """
+    Tiny chromadb-free vector store, one version per write:
+    - vectors.<version>.npy: n × d float32, rows L2-normalized, opened with mmap_mode="r"
+    - meta.<version>.json:   one entry per row {"id", "document", "metadata"}
+    - CURRENT:               name of the live version, swapped with a single os.replace
+    Embeddings are reused by content hash, so re-indexing never re-embeds unchanged text.
+    """
+
+    def __init__(self, path: str, embedding_fn):
+        self.path = Path(path)
+        self.embedding_fn = embedding_fn
+        self.current_path = self.path / "CURRENT"
+        self._load()
+
+    def _files(self, version: str) -> tuple[Path, Path]:
+        return self.path / f"vectors.{version}.npy", self.path / f"meta.{version}.json"
+
+    def _load(self):
+        if self.current_path.exists():
+            vectors_path, meta_path = self._files(self.current_path.read_text(encoding="utf-8").strip())
+            self.rows = json.loads(meta_path.read_text(encoding="utf-8"))
+            self.matrix = np.load(vectors_path, mmap_mode="r") if self.rows else np.zeros((0, 0), dtype=np.float32)
+            if len(self.rows) != self.matrix.shape[0]:
+                raise ValueError(
+                    f"Vector store {self.path} is inconsistent: {len(self.rows)} metadata rows "
+                    f"but {self.matrix.shape[0]} vectors in {vectors_path.name}"
+                )
+        else:
+            self.rows = []
+            self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.by_id = {row["id"]: i for i, row in enumerate(self.rows)}
+        self.index = {
+            "ids": [row["id"] for row in self.rows],
+            "metadatas": [row["metadata"] for row in self.rows],
+            "documents": [row["document"] for row in self.rows],
+        }
+
+    def _save(self, rows: list[dict], matrix: np.ndarray):
+        self.path.mkdir(parents=True, exist_ok=True)
+        version = f"{time.time_ns():x}"
+        vectors_path, meta_path = self._files(version)
+        np.save(vectors_path, np.ascontiguousarray(matrix, dtype=np.float32))
+        meta_path.write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+        # Both files are complete before the pointer moves → readers see the old or the new version
+        tmp_current = self.path / "CURRENT.tmp"
+        tmp_current.write_text(version, encoding="utf-8")
+        os.replace(tmp_current, self.current_path)
+        self._load()
+        self._remove_old_versions(version)
+
+    def _remove_old_versions(self, keep: str):
+        keep_files = set(self._files(keep))
+        for old in list(self.path.glob("vectors.*.npy")) + list(self.path.glob("meta.*.json")):
+            if old not in keep_files:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # still memory-mapped somewhere (Windows) → next save retries
+
+    def get_metadatas(self, ids: list[str]) -> dict:
+        return {i: self.rows[self.by_id[i]]["metadata"] for i in ids if i in self.by_id}
+
+    def all_ids(self) -> list[str]:
+        return [row["id"] for row in self.rows]
+
+    def all_metadatas(self) -> list[dict]:
+        return self.index["metadatas"]
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict]):
+        # Embedding cache: reuse any stored vector with the same content hash
+        cached = {row["metadata"].get("content_hash"): i for i, row in enumerate(self.rows)}
+        to_embed = [j for j, meta in enumerate(metadatas) if meta["content_hash"] not in cached]
 
-client = chromadb.Client()
+        new_vectors = {}
+        if to_embed:
+            embedded = normalize_rows(np.asarray(self.embedding_fn([documents[j] for j in to_embed]), dtype=np.float32))
+            new_vectors = dict(zip(to_embed, embedded))
 
-embedding_fn = embedding_functions.OpenAIEmbeddingFunction(
-    api_key=settings.OPENAI_API_KEY,  
-    model_name="text-embedding-3-small"
-)
+        rows = list(self.rows)
+        vectors = list(self.matrix) if len(self.matrix) else []
+        for j, (post_id, document, meta) in enumerate(zip(ids, documents, metadatas)):
+            vector = new_vectors[j] if j in new_vectors else self.matrix[cached[meta["content_hash"]]]
+            row = {"id": post_id, "document": document, "metadata": meta}
+            if post_id in self.by_id:
+                rows[self.by_id[post_id]] = row
+                vectors[self.by_id[post_id]] = vector
+            else:
+                rows.append(row)
+                vectors.append(vector)
 
-collection = client.create_collection(
-    name="old_posts",
-    embedding_function=embedding_fn
-)
+        self._save(rows, np.vstack(vectors))
+
+    def delete(self, ids: list[str]):
+        drop = set(ids)
+        keep = [i for i, row in enumerate(self.rows) if row["id"] not in drop]
+        self._save([self.rows[i] for i in keep], self.matrix[keep])
+
+    def query_batch(self, texts: list[str], n: int):
+        """Returns (index, top-k row indices, top-k scores) for a batch of query texts."""
+        queries = normalize_rows(np.asarray(self.embedding_fn(list(texts)), dtype=np.float32))
+        if not self.rows:
+            n = 0
+        idx, scores = top_k_cosine(self.matrix, queries, n)
+        return self.index, idx, scores
+
+
+def _make_store():
+    if settings.EMBEDDING_BACKEND == "local":
+        # Offline hashed n-gram embeddings: no API key, no network
+        embedding_fn = HashingEmbeddingFunction(dim=settings.LOCAL_EMBEDDING_DIM)
+        name = "old_posts_local"
+    elif settings.VECTOR_BACKEND == "numpy":
+        embedding_fn = OpenAIEmbedder("text-embedding-3-small")
+        name = "old_posts"
+    else:
+        from chromadb.utils import embedding_functions
+
+        embedding_fn = embedding_functions.OpenAIEmbeddingFunction(
+            api_key=settings.OPENAI_API_KEY,
+            model_name="text-embedding-3-small"
+        )
+        name = "old_posts"
+
+    # Vectors of different embedding backends don't mix → one collection/dir per backend
+    if settings.VECTOR_BACKEND == "numpy":
+        return NumpyPostStore(Path(settings.VECTOR_STORE_PATH) / name, embedding_fn)
+    return ChromaPostStore(settings.CHROMA_PATH, name, embedding_fn)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The old-posts store, built (chromadb / OpenAI client loaded, index opened) on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _make_store()
+    return _store
+
+
+def __getattr__(name):
+    # `from tools.database_tools import store` keeps working, built on first access
+    if name == "store":
+        return get_store()
+    raise AttributeError(name)
+
+
+def _metadata(post: dict) -> dict:
+    return {
+        "title": post.get("title") or "",
+        "url": post["url"],
+        "modified": post.get("modified") or "",
+        "content_hash": content_hash(post.get("content")),
+    }
+
+
+def add_old_posts(posts: list[dict], batch_size: int = None):
+    """
+    Upsert many posts ({"title", "url", "content", optional "modified"}).
+    Each batch is embedded with ONE embeddings request.
+    """
+    batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+    for i in range(0, len(posts), batch_size):
+        batch = posts[i:i + batch_size]
+        get_store().upsert(
+            ids=[p["url"] for p in batch],
+            documents=[p["content"] for p in batch],
+            metadatas=[_metadata(p) for p in batch],
+        )
 
 
 def add_old_post(title, url, content):
-    collection.add(documents=[content], metadatas=[{"title": title, "url": url}], ids=[url])
+    add_old_posts([{"title": title, "url": url, "content": content}])
+
+
+def sync_old_posts(posts: list[dict], prune: bool = False) -> dict:
+    """
+    Incremental sync: only (re-)embed posts that are new or whose content hash or
+    modified date changed. With prune=True, posts missing from `posts` are removed.
+    Returns counts {"added", "updated", "unchanged", "removed"}.
+    """
+    ids = [p["url"] for p in posts]
+    existing = get_store().get_metadatas(ids)
+
+    changed = []
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    for post in posts:
+        old = existing.get(post["url"])
+        new = _metadata(post)
+        if old is None:
+            stats["added"] += 1
+            changed.append(post)
+        elif old.get("content_hash") != new["content_hash"] or old.get("modified") != new["modified"]:
+            stats["updated"] += 1
+            changed.append(post)
+        else:
+            stats["unchanged"] += 1
+
+    add_old_posts(changed)
+
+    if prune:
+        keep = set(ids)
+        stale = [i for i in get_store().all_ids() if i not in keep]
+        if stale:
+            get_store().delete(stale)
+        stats["removed"] = len(stale)
+
+    print(
+        f"🗂 Old-posts index synced: {stats['added']} added, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed."
+    )
+    return stats
+
+
+def sync_from_wordpress(prune: bool = True) -> dict:
+    """Pull every published post from WordPress and incrementally sync the index."""
+    from tools.cms_tools import fetch_wordpress_posts
+
+    posts = [
+        {
+            "title": p.get("title", {}).get("rendered", ""),
+            "url": p["link"],
+            "content": p.get("content", {}).get("rendered", ""),
+            "modified": p.get("modified", ""),
+        }
+        for p in fetch_wordpress_posts()
+    ]
+    return sync_old_posts(posts, prune=prune)
+
+
+def query_similar_posts_batch(texts: list[str], n=3) -> list[dict]:
+    """
+    Top-n most similar old posts for every text (one batched embedding + one matrix product).
+    Each result has the shape of a Chroma query result: {"ids", "metadatas", "documents", "distances"}.
+    """
+    index, idx, scores = get_store().query_batch(texts, n)
+    results = []
+    for rows, row_scores in zip(idx.tolist(), scores):
+        results.append({
+            "ids": [[index["ids"][i] for i in rows]],
+            "metadatas": [[index["metadatas"][i] for i in rows]],
+            "documents": [[index["documents"][i] for i in rows]],
+            "distances": [(1.0 - row_scores).tolist()],
+        })
+    return results
+
 
 def query_similar_posts(text, n=3):
-    return collection.query(query_texts=[text], n_results=n)
+    """Top-n most similar old posts by cosine similarity (NumPy brute force)."""
+    return query_similar_posts_batch([text], n)[0]
+
+
+if __name__ == "__main__":
+    sync_from_wordpress()
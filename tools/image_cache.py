@@ -0,0 +1,147 @@
+# tools/image_cache.py
+"""
+Content-addressed cache for generated images.
+
+- Key: sha256 of (image model, normalized prompt)
+- Blobs: image bytes stored once under data/cache/images/<sha256 of bytes>
+- Index (SQLite): key → blob hash, filename, WordPress media ID + URL
+- Eviction: entries older than IMAGE_CACHE_MAX_AGE_DAYS, then least recently used
+  entries until the blobs fit in IMAGE_CACHE_MAX_MB
+
+A hit with a media URL skips both the image API call and the WordPress upload.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from config.settings import settings
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace (word order is kept)."""
+    return " ".join(re.findall(r"[a-z0-9]+", prompt.lower()))
+
+
+class ImageCache:
+    def __init__(self, root: str, max_age_seconds: int, max_bytes: int):
+        self.root = Path(root)
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS images ("
+                " key TEXT PRIMARY KEY,"
+                " blob TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " filename TEXT,"
+                " media_id INTEGER,"
+                " media_url TEXT,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(prompt: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+    def _blob_path(self, blob: str) -> Path:
+        return self.root / blob[:2] / blob
+
+    def get(self, key: str) -> dict | None:
+        """
+        Returns {"data", "filename", "media_id", "media_url"}, or None when there is no
+        entry, it expired, or its blob file went missing (the entry is dropped).
+        """
+        if not settings.IMAGE_CACHE_ENABLED:
+            return None
+
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT blob, filename, media_id, media_url, created_at FROM images WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            blob, filename, media_id, media_url, created_at = row
+            path = self._blob_path(blob)
+            if now - created_at > self.max_age_seconds or not path.exists():
+                self._delete(db, key, blob)
+                db.commit()
+                return None
+            db.execute("UPDATE images SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+
+        return {
+            "data": path.read_bytes(),
+            "filename": filename,
+            "media_id": media_id,
+            "media_url": media_url,
+        }
+
+    def put(self, key: str, data, filename: str, media_id: int | None = None, media_url: str | None = None):
+        if not settings.IMAGE_CACHE_ENABLED:
+            return
+
+        blob = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(blob)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Unique temp file: concurrent workers may cache the same image at once
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{blob}.", suffix=".tmp", delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, path)
+
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO images (key, blob, size, filename, media_id, media_url, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, blob, len(data), filename, media_id, media_url, now, now),
+            )
+            self._evict(db, now)
+            db.commit()
+
+    def _delete(self, db: sqlite3.Connection, key: str, blob: str):
+        db.execute("DELETE FROM images WHERE key = ?", (key,))
+        # Blobs are shared by identical images → only remove the file when unreferenced
+        if db.execute("SELECT 1 FROM images WHERE blob = ? LIMIT 1", (blob,)).fetchone() is None:
+            self._blob_path(blob).unlink(missing_ok=True)
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        for key, blob in db.execute(
+            "SELECT key, blob FROM images WHERE created_at < ?", (now - self.max_age_seconds,)
+        ).fetchall():
+            self._delete(db, key, blob)
+
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob, size FROM images)").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, blob, size in db.execute("SELECT key, blob, size FROM images ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._delete(db, key, blob)
+            if db.execute("SELECT 1 FROM images WHERE blob = ? LIMIT 1", (blob,)).fetchone() is None:
+                total -= size
+
+
+image_cache = ImageCache(
+    root=settings.IMAGE_CACHE_DIR,
+    max_age_seconds=settings.IMAGE_CACHE_MAX_AGE_DAYS * 24 * 3600,
+    max_bytes=settings.IMAGE_CACHE_MAX_MB * 1024 * 1024,
+)
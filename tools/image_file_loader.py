@@ -1,13 +1,26 @@
 import base64
+import mmap
 from pathlib import Path
 
-def load_image_as_base64(image_path: str) -> str:
+
+def map_image_file(image_path: str) -> memoryview:
     """
-    Load a local PNG/JPG image and return base64 string.
+    Memory-map a local PNG/JPG image and return a read-only memoryview over it.
+    The bytes are paged in by the OS as the upload reads them (no Python copy).
     """
     path = Path(image_path)
     if not path.exists():
         raise FileNotFoundError(f"Local test image not found: {path}")
 
     with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+        if path.stat().st_size == 0:
+            return memoryview(b"")
+        # The mapping stays valid after the file is closed; the memoryview keeps it alive
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def load_image_as_base64(image_path: str) -> str:
+    """
+    Load a local PNG/JPG image and return base64 string.
+    """
+    return base64.b64encode(map_image_file(image_path)).decode("utf-8")
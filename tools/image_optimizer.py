@@ -0,0 +1,148 @@
+# tools/image_optimizer.py
+"""
+Optional image optimization before WordPress upload:
+- resize to IMAGE_MAX_WIDTH (keeps aspect ratio)
+- strip metadata (EXIF / text chunks are never copied over)
+- flat-color diagrams → lossless WebP or palette PNG; photos → lossy WebP / AVIF
+
+Encoding is CPU-bound, so it runs in a small pool of spawned worker processes
+(IMAGE_OPTIMIZE_WORKERS); scripts using it need an `if __name__ == "__main__":` guard.
+Needs Pillow; without it images are uploaded untouched.
+"""
+
+import io
+import mimetypes
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from config.settings import settings
+from utils.tracing import tracer
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency
+    Image = None
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+# Flat diagram: after a coarse quantize (5 bits per channel), the FLAT_TOP_COLORS most
+# frequent colors cover at least FLAT_COVERAGE of the pixels. Coverage, not a color
+# count: antialiased edges add hundreds of rare colors to an otherwise flat image.
+FLAT_TOP_COLORS = 32
+FLAT_COVERAGE = 0.9
+FLAT_SAMPLE_SIZE = (256, 256)
+
+# Palette size for the lossless flat path
+FLAT_MAX_COLORS = 256
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def is_flat(img) -> bool:
+    """Flat-color diagram (few dominant colors) vs photo / gradient-heavy image."""
+    sample = img.convert("RGB")
+    sample.thumbnail(FLAT_SAMPLE_SIZE)
+    coarse = sample.point(lambda v: v & 0xF8)
+    counts = sorted((c for c, _ in coarse.getcolors(maxcolors=sample.width * sample.height)), reverse=True)
+    return sum(counts[:FLAT_TOP_COLORS]) >= FLAT_COVERAGE * sum(counts)
+
+
+def _encode(data: bytes, max_width: int, target: str, quality: int) -> tuple[bytes, str]:
+    """Runs in a worker process. Returns (encoded bytes, file extension)."""
+    img = Image.open(io.BytesIO(data))
+    img.load()
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+    # Decided on the source, before resampling blends edges into extra colors
+    flat = is_flat(img)
+
+    if max_width and img.width > max_width:
+        height = round(img.height * max_width / img.width)
+        img = img.resize((max_width, height), Image.LANCZOS)
+    if flat:
+        # Snap antialiased edges to a palette so the lossless path stays small
+        method = Image.Quantize.FASTOCTREE if has_alpha else None
+        img = img.quantize(colors=FLAT_MAX_COLORS, method=method).convert("RGBA" if has_alpha else "RGB")
+
+    out = io.BytesIO()
+    if target == "png" or (target == "auto" and flat and not has_alpha):
+        # Palette PNG: tiny for diagrams with a handful of colors
+        method = Image.Quantize.FASTOCTREE if has_alpha else None
+        img.quantize(colors=FLAT_MAX_COLORS, method=method).save(out, format="PNG", optimize=True)
+        return out.getvalue(), ".png"
+    if target == "avif":
+        img.save(out, format="AVIF", quality=quality)
+        return out.getvalue(), ".avif"
+    if flat:
+        img.save(out, format="WEBP", lossless=True, method=6)
+    else:
+        img.save(out, format="WEBP", quality=quality, method=6)
+    return out.getvalue(), ".webp"
+
+
+def _noop():
+    return None
+
+
+def warm_up():
+    """
+    Start the worker processes now, so the first upload doesn't wait for them.
+    Workers are spawned (fresh interpreters), never forked from this process:
+    by the time images are optimized it runs threads (HTTP pools, CrewAI) whose
+    locks a forked child could inherit in a held state.
+    """
+    global _pool
+    if not settings.IMAGE_OPTIMIZE or Image is None:
+        return
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.IMAGE_OPTIMIZE_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool.submit(_noop).result()
+
+
+def optimize_image(data, filename: str) -> tuple[bytes, str]:
+    """
+    Returns (optimized bytes, new filename). Falls back to the original bytes when
+    optimization is disabled, Pillow is missing, encoding fails or the result is bigger.
+    """
+    if not settings.IMAGE_OPTIMIZE:
+        return data, filename
+    if Image is None:
+        print("⚠️ Pillow not installed → uploading image without optimization.")
+        return data, filename
+
+    original_size = len(data)
+    try:
+        warm_up()
+        with tracer.span("image.optimize", filename=filename, bytes_in=original_size) as span:
+            optimized, ext = _pool.submit(
+                _encode,
+                bytes(data),
+                settings.IMAGE_MAX_WIDTH,
+                settings.IMAGE_OPTIMIZE_FORMAT,
+                settings.IMAGE_OPTIMIZE_QUALITY,
+            ).result()
+            span.set(bytes=len(optimized))
+    except Exception as e:
+        print(f"⚠️ Image optimization failed for {filename}: {e}. Uploading original.")
+        return data, filename
+
+    if len(optimized) >= original_size:
+        print(f"🗜 {filename}: optimized version not smaller ({original_size} B), keeping original.")
+        return data, filename
+
+    new_filename = str(Path(filename).with_suffix(ext))
+    saved = original_size - len(optimized)
+    print(
+        f"🗜 {filename} → {new_filename}: {original_size / 1024:.0f} KB → {len(optimized) / 1024:.0f} KB "
+        f"(saved {saved / 1024:.0f} KB, -{saved / original_size:.0%})"
+    )
+    return optimized, new_filename
@@ -1,21 +1,51 @@
 # tools/image_tools_openai.py
 import base64
-from openai import OpenAI
 from config.settings import settings
+from utils.rate_limiter import rate_limiter, OPENAI_IMAGES
+from utils.tracing import tracer
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+_client = None
 
-def generate_diagram_image_b64(prompt: str) -> str:
+
+def _openai_client():
+    """OpenAI client, created (and openai imported) on the first image request."""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+
+        _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
+
+IMAGE_MODEL = "gpt-image-1.5"  # best quality
+
+
+def _generate_image_bytes(prompt: str, size: str) -> bytes:
+    """
+    Calls the image model and returns raw PNG bytes.
+    GPT image models always answer in base64 → this is the ONLY place we decode it.
+    """
+    with tracer.span("openai.images.generate", model=IMAGE_MODEL, size=size) as span:
+        span.set(rate_limit_wait_s=round(rate_limiter.acquire(OPENAI_IMAGES), 3))
+        img = _openai_client().images.generate(
+            model=IMAGE_MODEL,
+            prompt=prompt,
+            size=size,
+            n=1
+        )
+        data = base64.b64decode(img.data[0].b64_json)
+        span.set(bytes=len(data))
+        return data
+
+
+def generate_diagram_image(prompt: str) -> bytes:
+    """
+    Returns raw PNG bytes for an in-content diagram.
+    """
+    return _generate_image_bytes(prompt, size="1536x1024")  # nice for blog diagrams (landscape)
+
+
+def generate_featured_image_raw(prompt: str) -> bytes:
     """
-    Returns base64 png bytes as a base64 string (no data: prefix).
+    Returns raw PNG bytes for a post featured image.
     """
-    img = client.images.generate(
-        model="gpt-image-1.5",   # best quality
-        prompt=prompt,
-        size="1536x1024",        # nice for blog diagrams (landscape)
-        n=1
-    )
-    return img.data[0].b64_json  # GPT image models return base64 always :contentReference[oaicite:1]{index=1}
-
-def b64_to_bytes(b64_str: str) -> bytes:
-    return base64.b64decode(b64_str)
+    return _generate_image_bytes(prompt, size="1536x1024")
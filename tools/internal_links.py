@@ -0,0 +1,82 @@
+# tools/internal_links.py
+"""
+Internal-link retrieval for the writer prompt.
+
+Instead of pasting the whole catalog into every prompt, score it against the
+topic/outline and keep only the top-k candidates, in a compact one-line format.
+
+Catalog = data/internal_links.json (curated anchors) + every post in the old-posts
+index (tools/database_tools) when INTERNAL_LINKS_USE_POST_INDEX=true.
+Scoring uses the offline hashed n-gram embeddings + NumPy top-k, so it costs
+milliseconds and no API call.
+"""
+
+import json
+from pathlib import Path
+
+from config.settings import settings
+from tools.local_embeddings import HashingEmbeddingFunction
+from utils.rate_limiter import estimate_tokens
+from utils.vector_math import top_k_cosine
+
+CATALOG_PATH = Path("data/internal_links.json")
+
+# "salesforce" appears in every post of this blog → no signal for ranking links.
+# Retrieval-local: the catalog is embedded per call, never stored.
+_embedder = HashingEmbeddingFunction(dim=settings.LOCAL_EMBEDDING_DIM, extra_stopwords={"salesforce"})
+
+
+def load_internal_links() -> list[dict]:
+    """Curated catalog + indexed posts (deduplicated by URL, curated entries win)."""
+    links = json.loads(CATALOG_PATH.read_text(encoding="utf-8")) if CATALOG_PATH.exists() else []
+
+    if settings.INTERNAL_LINKS_USE_POST_INDEX:
+        try:
+            from tools.database_tools import get_store
+
+            links += [
+                {"title": m.get("title", ""), "url": m["url"], "anchor": m.get("title", "")}
+                for m in get_store().all_metadatas()
+                if m and m.get("url")
+            ]
+        except Exception as e:
+            print(f"⚠️ Old-posts index unavailable for internal links ({e}). Using catalog only.")
+
+    seen = set()
+    unique = []
+    for link in links:
+        if link["url"] not in seen:
+            seen.add(link["url"])
+            unique.append(link)
+    return unique
+
+
+def select_internal_links(query: str, k: int = None, links: list[dict] = None) -> list[dict]:
+    """Top-k catalog entries most similar to `query` (topic + keyword + outline)."""
+    k = k or settings.INTERNAL_LINKS_TOP_K
+    links = load_internal_links() if links is None else links
+    if len(links) <= k:
+        return links
+
+    matrix = _embedder.embed([f"{link['title']} {link.get('anchor', '')}" for link in links])
+    idx, _ = top_k_cosine(matrix, _embedder.embed([query]), k)
+    return [links[i] for i in idx[0]]
+
+
+def format_internal_links(links: list[dict]) -> str:
+    """Compact prompt format: one `- anchor → url` line per link."""
+    return "\n".join(f"- {link.get('anchor') or link['title']} → {link['url']}" for link in links)
+
+
+def internal_links_prompt(query: str, k: int = None) -> str:
+    """
+    Retrieve + format the internal links for a writer prompt, and report how many
+    prompt tokens that saves versus pasting the whole catalog.
+    """
+    catalog = load_internal_links()
+    selected = select_internal_links(query, k, links=catalog)
+    compact = format_internal_links(selected)
+
+    saved = estimate_tokens(str(catalog)) - estimate_tokens(compact)
+    print(f"🔗 Internal links: {len(selected)}/{len(catalog)} selected (~{saved} prompt tokens saved)")
+    return compact
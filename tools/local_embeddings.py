@@ -0,0 +1,84 @@
+# tools/local_embeddings.py
+"""
+Offline embedding backend: hashed n-gram vectors, computed on CPU with NumPy.
+
+Features per text: word unigrams, word bigrams and character trigrams, hashed
+(stable CRC32, not Python's salted hash) into `dim` buckets with a sign bit to
+cancel collisions, sublinear TF weighting (1 + log tf), then L2-normalized.
+Common filler words are dropped instead of using a corpus IDF, so a vector never
+changes when the corpus does (stored embeddings stay valid).
+
+No API key, no network: fine for CI and for similarity lookups over the post archive.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+from utils.vector_math import normalize_rows
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are",
+    "be", "this", "that", "it", "as", "at", "by", "from", "you", "your", "we", "our",
+    "can", "how", "what", "why", "when", "will", "use", "using", "vs",
+}
+
+
+def _features(text: str, stopwords=STOPWORDS) -> list[str]:
+    words = [w for w in _WORD_RE.findall(_TAG_RE.sub(" ", text or "").lower()) if w not in stopwords]
+    features = list(words)
+    features += [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"#{w}#"
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return features
+
+
+class HashingEmbeddingFunction:
+    """
+    Local embedding function. Follows Chroma's embedding-function protocol
+    (`__call__(input)`, `name`, `get_config`, ...) without importing chromadb.
+    """
+
+    def __init__(self, dim: int = 1024, extra_stopwords=()):
+        # Only for vectors that are never stored (e.g. per-query scoring): vectors
+        # in an index must all come from the same STOPWORDS to stay comparable
+        self.dim = dim
+        self.stopwords = STOPWORDS | set(extra_stopwords)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Returns a (len(texts) × dim) L2-normalized float32 matrix."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = _features(text, self.stopwords)
+            if not features:
+                continue
+            hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+            buckets = (hashes % self.dim).astype(np.int64)
+            signs = np.where(hashes >> 31, -1.0, 1.0)
+            # Sublinear TF: sum signs per bucket, then 1 + log|tf| keeping the sign
+            tf = np.bincount(buckets, weights=signs, minlength=self.dim)
+            nz = tf != 0
+            out[row, nz] = np.sign(tf[nz]) * (1.0 + np.log(np.abs(tf[nz])))
+        return normalize_rows(out)
+
+    def __call__(self, input):
+        return list(self.embed(list(input)))
+
+    @staticmethod
+    def name() -> str:
+        return "local_hashing"
+
+    def get_config(self) -> dict:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(dim=config.get("dim", 1024))
+
+    def default_space(self):
+        return "cosine"
@@ -1,11 +1,91 @@
-from crewai.tools import tool
-from tavily import TavilyClient
+import json
+import re
+
 from config.settings import settings
+from utils.kv_cache import SQLiteCache
+from utils.rate_limiter import rate_limiter, TAVILY
+from utils.tracing import tracer
+
+_tavily = None
+
+search_cache = SQLiteCache(
+    settings.SEARCH_CACHE_PATH,
+    table="search_cache",
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+)
+
+# Max age of a cached result per content mode: news goes stale fast, evergreen research doesn't
+SEARCH_CACHE_TTLS = {
+    "news": settings.SEARCH_CACHE_TTL_NEWS,
+    "evergreen": settings.SEARCH_CACHE_TTL_EVERGREEN,
+}
+
+# Filler words that don't change what Tavily returns
+_STOPWORDS = {"a", "an", "the", "of", "for", "in", "on", "and", "to", "with", "vs", "about"}
+
+# Set by main.py wherever a topic enters the pipeline (topic pick, run_blog_pipeline)
+_search_mode = "news"
+
+
+def set_search_mode(mode: str):
+    """Choose how old a cached web_search result may be ("news" or "evergreen" TTL)."""
+    global _search_mode
+    _search_mode = mode if mode in SEARCH_CACHE_TTLS else "news"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so near-identical queries share a cache key:
+    lowercase, punctuation stripped, filler words dropped, tokens de-duplicated and sorted.
+    "Salesforce Spring '25 Release Notes" == "release notes salesforce spring 25"
+    """
+    tokens = re.findall(r"[a-z0-9]+", query.lower())
+    return " ".join(sorted({t for t in tokens if t not in _STOPWORDS}))
+
 
-tavily = TavilyClient(api_key=settings.TAVILY_API_KEY)
+def _tavily_client():
+    """Tavily client, created (and tavily imported) on the first search."""
+    global _tavily
+    if _tavily is None:
+        from tavily import TavilyClient
 
-@tool
-def web_search(query: str):
+        _tavily = TavilyClient(api_key=settings.TAVILY_API_KEY, api_base_url=settings.TAVILY_BASE_URL)
+    return _tavily
+
+
+def web_search_raw(query: str):
     """Search the web for the most relevant information about Salesforce topics."""
-    results = tavily.search(query=query, max_results=5)
-    return results
+    max_results = 5
+    key = f"{normalize_query(query)}|{max_results}"
+
+    with tracer.span("web_search", query=query) as span:
+        # The TTL of the current mode applies at read time, whatever the mode was when cached
+        cached = search_cache.get(key, max_age_seconds=SEARCH_CACHE_TTLS[_search_mode])
+        if cached is not None:
+            print(f"💾 Search cache hit: {query}")
+            span.set(cache="hit", bytes=len(cached))
+            return json.loads(cached)
+
+        span.set(cache="miss", rate_limit_wait_s=round(rate_limiter.acquire(TAVILY), 3))
+        results = _tavily_client().search(query=query, max_results=max_results)
+
+        payload = json.dumps(results, default=str)
+        search_cache.set(key, payload, ttl_seconds=max(SEARCH_CACHE_TTLS.values()))
+        span.set(bytes=len(payload), results=len(results.get("results", [])) if isinstance(results, dict) else None)
+        return results
+
+
+def build_web_search_tool():
+    """CrewAI tool for agents (see tools/__init__.py: get_tool("web_search"))."""
+    from crewai.tools import tool
+
+    return tool("web_search")(web_search_raw)
+
+
+def __getattr__(name):
+    # `from tools.search_tools import web_search` → the shared, lazily built CrewAI tool
+    if name == "web_search":
+        from tools import get_tool
+
+        return get_tool("web_search")
+    raise AttributeError(name)
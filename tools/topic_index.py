@@ -0,0 +1,166 @@
+# tools/topic_index.py
+"""
+Near-duplicate topic detection (MinHash + LSH, NumPy).
+
+Past topics come from:
+- data/generated_posts/*.json (title + slug)
+- data/topic_history.json (every topic the pipeline published, see record_topic;
+  the GitHub workflow keeps it between runs with actions/cache)
+- the titles of every post on WordPress, drafts included (TOPIC_INDEX_FROM_WORDPRESS),
+  so a fresh checkout still knows what was published before
+- the internal-links catalog + old-posts index (tools/internal_links.load_internal_links)
+
+A candidate topic is shingled (words + word bigrams, years and filler words dropped),
+MinHashed, looked up in the LSH buckets, and compared to the few candidates it
+collides with → well under a millisecond per check.
+"""
+
+import html
+import json
+import re
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import settings
+
+GENERATED_POSTS_DIR = Path("data/generated_posts")
+TOPIC_HISTORY_PATH = Path("data/topic_history.json")
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 31) - 1  # Mersenne prime; a*x + b stays below 2^63
+
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "vs", "how",
+    "what", "why", "your", "you", "guide", "explained", "salesforce",
+}
+
+
+def shingles(text: str) -> set[str]:
+    words = [
+        w for w in re.findall(r"[a-z0-9]+", text.lower())
+        if w not in _STOPWORDS and not re.fullmatch(r"(19|20)\d\d", w)
+    ]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(text: str) -> np.ndarray | None:
+    items = shingles(text)
+    if not items:
+        return None
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in items), dtype=np.uint64, count=len(items))
+    return ((np.outer(_A, x) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+class TopicIndex:
+    def __init__(self):
+        self.signatures: list[np.ndarray] = []
+        self.labels: list[str] = []
+        self.buckets: list[dict] = [{} for _ in range(BANDS)]
+
+    def add(self, label: str, text: str = None):
+        sig = minhash(text or label)
+        if sig is None:
+            return
+        i = len(self.signatures)
+        self.signatures.append(sig)
+        self.labels.append(label)
+        for band in range(BANDS):
+            key = sig[band * ROWS:(band + 1) * ROWS].tobytes()
+            self.buckets[band].setdefault(key, []).append(i)
+
+    def most_similar(self, text: str) -> tuple[str, float] | None:
+        """Best (label, estimated Jaccard similarity) among LSH candidates, or None."""
+        sig = minhash(text)
+        if sig is None:
+            return None
+        candidates = set()
+        for band in range(BANDS):
+            candidates.update(self.buckets[band].get(sig[band * ROWS:(band + 1) * ROWS].tobytes(), ()))
+        best = None
+        for i in candidates:
+            score = float(np.mean(self.signatures[i] == sig))
+            if best is None or score > best[1]:
+                best = (self.labels[i], score)
+        return best
+
+    def find_duplicate(self, text: str, threshold: float = None) -> tuple[str, float] | None:
+        """(label, similarity) of an existing post too close to `text`, or None."""
+        threshold = settings.TOPIC_DUPLICATE_THRESHOLD if threshold is None else threshold
+        best = self.most_similar(text)
+        return best if best and best[1] >= threshold else None
+
+
+_history_lock = threading.Lock()
+
+
+def _load_history() -> list[dict]:
+    if TOPIC_HISTORY_PATH.exists():
+        return json.loads(TOPIC_HISTORY_PATH.read_text(encoding="utf-8"))
+    return []
+
+
+def _wordpress_titles() -> list[str]:
+    from tools.cms_tools import fetch_wordpress_posts
+
+    posts = fetch_wordpress_posts(status="publish,future,draft,pending", fields="title")
+    return [html.unescape(p.get("title", {}).get("rendered", "")) for p in posts]
+
+
+def build_topic_index() -> TopicIndex:
+    index = TopicIndex()
+
+    for path in sorted(GENERATED_POSTS_DIR.glob("*.json")):
+        try:
+            post = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        title = post.get("title") or path.stem
+        # Slugs are the short form of the title → index both under the same label
+        index.add(title)
+        index.add(title, (post.get("slug") or path.stem).replace("-", " "))
+
+    for entry in _load_history():
+        index.add(entry["topic"])
+        if entry.get("main_keyword"):
+            index.add(entry["topic"], entry["main_keyword"])
+
+    if settings.TOPIC_INDEX_FROM_WORDPRESS:
+        try:
+            titles = _wordpress_titles()
+            for title in titles:
+                index.add(title)
+            print(f"🧬 Topic index: {len(titles)} WordPress post titles loaded.")
+        except Exception as e:
+            print(f"⚠️ Could not load WordPress post titles for the topic index ({e}).")
+
+    from tools.internal_links import load_internal_links
+
+    for link in load_internal_links():
+        index.add(link["title"])
+
+    return index
+
+
+def record_topic(topic: str, main_keyword: str, title: str = None, slug: str = None):
+    """Remember a published topic so future runs don't pick it again."""
+    with _history_lock:  # batch pipelines finish concurrently
+        history = _load_history()
+        history.append({
+            "topic": topic,
+            "main_keyword": main_keyword,
+            "title": title,
+            "slug": slug,
+            "date": datetime.now().strftime("%Y-%m-%d"),
+        })
+        TOPIC_HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        TOPIC_HISTORY_PATH.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -0,0 +1,176 @@
+# utils/html_rewriter.py
+"""
+Single-pass HTML post-processing for generated articles.
+
+One compiled tokenizer regex walks the document once and yields only the tokens
+we care about (image placeholders, <img_placeholder/> tags, </h1>, <a ...>).
+Each token is offered to a list of transforms; untouched text between tokens is
+copied by slice into a parts list that is joined exactly once at the end.
+"""
+
+import re
+
+TOKEN_RE = re.compile(
+    r"<!--\s*IMAGE:\s*(?P<image>.*?)\s*-->"
+    r"|<img_placeholder\b(?P<placeholder>[^>]*?)/?>(?:\s*</img_placeholder\s*>)?"
+    r"|(?P<h1_close></h1\s*>)"
+    r"|<a\b(?P<anchor>[^>]*)>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+ATTR_RE = re.compile(r"""([a-zA-Z_:][-a-zA-Z0-9_:.]*)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+
+IMAGE = "image"              # <!-- IMAGE: description -->
+PLACEHOLDER = "placeholder"  # <img_placeholder section="..." />
+H1_CLOSE = "h1_close"        # </h1>
+ANCHOR = "anchor"            # <a ...>
+
+
+class Token:
+    """A matched token. `index` counts image-like tokens (IMAGE + PLACEHOLDER) in document order."""
+
+    __slots__ = ("kind", "match", "index")
+
+    def __init__(self, kind: str, match: re.Match, index: int):
+        self.kind = kind
+        self.match = match
+        self.index = index
+
+    @property
+    def text(self) -> str:
+        return self.match.group(0)
+
+    @property
+    def description(self) -> str:
+        """Image description for IMAGE / PLACEHOLDER tokens."""
+        if self.kind == IMAGE:
+            return self.match.group(IMAGE)
+        attrs = parse_attrs(self.match.group(PLACEHOLDER))
+        return attrs.get("section") or attrs.get("description") or attrs.get("alt") or ""
+
+
+def parse_attrs(attr_text: str) -> dict:
+    return {
+        m.group(1).lower(): next(g for g in m.groups()[1:] if g is not None)
+        for m in ATTR_RE.finditer(attr_text or "")
+    }
+
+
+def iter_tokens(html: str):
+    image_index = 0
+    for match in TOKEN_RE.finditer(html):
+        kind = match.lastgroup
+        index = -1
+        if kind in (IMAGE, PLACEHOLDER):
+            index = image_index
+            image_index += 1
+        yield Token(kind, match, index)
+
+
+def find_image_placeholders(html: str) -> list[str]:
+    """Descriptions of every image placeholder (both syntaxes), in document order."""
+    return [t.description for t in iter_tokens(html) if t.index >= 0]
+
+
+# ------------------------------------------------------------
+# Transforms: return replacement text for a token, or None to pass
+# ------------------------------------------------------------
+
+class DiagramFigures:
+    """Replace the N-th image placeholder with `figures[N]` (None → keep placeholder)."""
+
+    kinds = (IMAGE, PLACEHOLDER)
+
+    def __init__(self, figures: list):
+        self.figures = figures
+
+    def __call__(self, token: Token):
+        if token.index < len(self.figures) and self.figures[token.index] is not None:
+            return self.figures[token.index]
+        return None
+
+
+class PlaceholderToComment:
+    """Turn leftover <img_placeholder/> tags into the standard <!-- IMAGE: ... --> comment."""
+
+    kinds = (PLACEHOLDER,)
+
+    def __call__(self, token: Token):
+        return f"<!-- IMAGE: {token.description} -->"
+
+
+class HeroImage:
+    """Insert `html` right after the first </h1>; prepend it when the document has no <h1>."""
+
+    kinds = (H1_CLOSE,)
+
+    def __init__(self, html: str):
+        self.html = html
+        self.done = False
+
+    def __call__(self, token: Token):
+        if self.done:
+            return None
+        self.done = True
+        return token.text + self.html
+
+    def prefix(self) -> str:
+        return "" if self.done else self.html
+
+
+class LinkAttributes:
+    """
+    Make absolute http(s) links open in a new tab with rel="noopener noreferrer".
+    Existing rel values are kept (links stay dofollow unless the writer said otherwise).
+    """
+
+    kinds = (ANCHOR,)
+
+    def __call__(self, token: Token):
+        attr_text = token.match.group(ANCHOR)
+        attrs = parse_attrs(attr_text)
+        if not attrs.get("href", "").lower().startswith(("http://", "https://")):
+            return None
+
+        extra = ""
+        if "target" not in attrs:
+            extra += ' target="_blank"'
+        rel = attrs.get("rel")
+        if rel is None:
+            extra += ' rel="noopener noreferrer"'
+        elif not {"noopener", "noreferrer"} <= set(rel.lower().split()):
+            new_rel = " ".join(dict.fromkeys(rel.split() + ["noopener", "noreferrer"]))
+            attr_text = ATTR_RE.sub(
+                lambda m: f'rel="{new_rel}"' if m.group(1).lower() == "rel" else m.group(0), attr_text
+            )
+        elif not extra:
+            return None
+        return f"<a{attr_text.rstrip()}{extra}>"
+
+
+def rewrite_html(html: str, transforms: list) -> str:
+    """
+    Apply `transforms` in a single O(n) pass over `html`.
+    For each token, the first transform (in list order) that returns text wins.
+    """
+    by_kind: dict[str, list] = {}
+    for transform in transforms:
+        for kind in transform.kinds:
+            by_kind.setdefault(kind, []).append(transform)
+
+    parts = []
+    last = 0
+    for token in iter_tokens(html):
+        for transform in by_kind.get(token.kind, ()):
+            replacement = transform(token)
+            if replacement is not None:
+                parts.append(html[last:token.match.start()])
+                parts.append(replacement)
+                last = token.match.end()
+                break
+    parts.append(html[last:])
+
+    prefix = "".join(t.prefix() for t in transforms if hasattr(t, "prefix"))
+    if prefix:
+        parts.insert(0, prefix)
+    return "".join(parts)
@@ -0,0 +1,242 @@
+# utils/http_cassette.py
+"""
+Record / replay HTTP traffic at the transport level.
+
+Patched once, at class level, so every client is covered no matter when it was built:
+- httpx.HTTPTransport.handle_request     → OpenAI SDK (CrewAI LLMs, tools/image_tools)
+- requests.adapters.HTTPAdapter.send     → TavilyClient, cms_tools WordPress session
+
+Only hosts of the configured providers (OpenAI, Tavily, WordPress) are recorded /
+replayed; anything else (e.g. telemetry) passes through untouched.
+
+Cassette = one gzip'd JSONL file, appended as traffic happens (a killed run keeps
+what it recorded):
+    {"blob": "<sha256>", "data": "<base64>"}                 every distinct body, stored once
+    {"method", "path", "body_sha", "status", "headers", "body", "elapsed"}
+Request bodies are only hashed (no API keys / auth headers end up in the file).
+
+Replay matches requests per (method, path) in recorded order, preferring the entry
+with the same request-body hash, and can sleep `latency` × recorded time per response.
+Provider rate limits are switched off while replaying.
+
+    python main.py --record data/cassettes/run.jsonl.gz
+    python main.py --replay data/cassettes/run.jsonl.gz
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from config.settings import settings
+
+# Hop-by-hop / encoding headers: bodies are stored decoded
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive", "set-cookie"}
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _body_bytes(body) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return bytes(body)
+    return b""  # streamed body: not hashable without consuming it
+
+
+def _provider_hosts() -> set[str]:
+    urls = [
+        "https://api.openai.com",
+        "https://api.tavily.com",
+        settings.WP_BASE_URL,
+        settings.TAVILY_BASE_URL,
+        settings.OPENAI_BASE_URL,
+    ]
+    return {urlsplit(u).netloc for u in urls if u}
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str, latency: float = 0.0):
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.hosts = _provider_hosts()
+        self._lock = threading.Lock()
+        self._blobs_written: set[str] = set()
+        self._queues: dict[tuple[str, str], list[dict]] = {}
+        self._blobs: dict[str, bytes] = {}
+        self.recorded = 0
+        self.replayed = 0
+
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                self.path.unlink()
+        elif mode == "replay":
+            self._load()
+
+    def handles(self, url: str) -> bool:
+        return urlsplit(url).netloc in self.hosts
+
+    @staticmethod
+    def _path(url: str) -> str:
+        parts = urlsplit(url)
+        return parts.path + (f"?{parts.query}" if parts.query else "")
+
+    # ---------- record ----------
+
+    def record(self, method: str, url: str, request_body: bytes, status: int, headers: dict, body: bytes, elapsed: float):
+        body_sha = _sha(body)
+        lines = []
+        with self._lock:
+            if body_sha not in self._blobs_written:
+                self._blobs_written.add(body_sha)
+                lines.append({"blob": body_sha, "data": base64.b64encode(body).decode("ascii")})
+            lines.append({
+                "method": method,
+                "path": self._path(url),
+                "body_sha": _sha(request_body),
+                "status": status,
+                "headers": {k: v for k, v in headers.items() if k.lower() not in _DROP_HEADERS},
+                "body": body_sha,
+                "elapsed": round(elapsed, 4),
+            })
+            # gzip members can be concatenated → appending keeps the file valid
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(line, separators=(",", ":")) + "\n")
+            self.recorded += 1
+
+    # ---------- replay ----------
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if "blob" in entry:
+                    self._blobs[entry["blob"]] = base64.b64decode(entry["data"])
+                else:
+                    self._queues.setdefault((entry["method"], entry["path"]), []).append(entry)
+
+    def replay(self, method: str, url: str, request_body: bytes) -> tuple[int, dict, bytes]:
+        key = (method, self._path(url))
+        body_sha = _sha(request_body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                raise LookupError(f"HTTP cassette {self.path}: no recorded response left for {method} {key[1]}")
+            index = next((i for i, e in enumerate(queue) if e["body_sha"] == body_sha), 0)
+            entry = queue.pop(index)
+            self.replayed += 1
+        if self.latency:
+            time.sleep(entry["elapsed"] * self.latency)
+        return entry["status"], entry["headers"], self._blobs[entry["body"]]
+
+    def summary(self) -> str:
+        if self.mode == "record":
+            return f"📼 HTTP cassette: recorded {self.recorded} responses to {self.path}"
+        left = sum(len(q) for q in self._queues.values())
+        return f"📼 HTTP cassette: replayed {self.replayed} responses from {self.path} ({left} unused)"
+
+
+_active: Cassette | None = None
+_patched = False
+
+
+def _patch_httpx():
+    import httpx
+
+    original = httpx.HTTPTransport.handle_request
+
+    def handle_request(transport, request):
+        cassette = _active
+        url = str(request.url)
+        if cassette is None or not cassette.handles(url):
+            return original(transport, request)
+
+        request_body = request.read()
+        if cassette.mode == "replay":
+            status, headers, body = cassette.replay(request.method, url, request_body)
+            return httpx.Response(status, headers=headers, content=body, request=request)
+
+        start = time.perf_counter()
+        response = original(transport, request)
+        body = response.read()
+        cassette.record(request.method, url, request_body, response.status_code, dict(response.headers), body,
+                        time.perf_counter() - start)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    httpx.HTTPTransport.handle_request = handle_request
+
+
+def _patch_requests():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+
+    original = HTTPAdapter.send
+
+    def build_response(request, status: int, headers: dict, body: bytes, elapsed: float = 0.0):
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.reason = "REPLAYED"
+        return response
+
+    def send(adapter, request, **kwargs):
+        cassette = _active
+        if cassette is None or not cassette.handles(request.url):
+            return original(adapter, request, **kwargs)
+
+        request_body = _body_bytes(request.body)
+        if cassette.mode == "replay":
+            status, headers, body = cassette.replay(request.method, request.url, request_body)
+            return build_response(request, status, headers, body)
+
+        start = time.perf_counter()
+        response = original(adapter, request, **kwargs)
+        body = response.content  # decoded, stream consumed
+        cassette.record(request.method, request.url, request_body, response.status_code, dict(response.headers), body,
+                        time.perf_counter() - start)
+        return response
+
+    HTTPAdapter.send = send
+
+
+def install(mode: str, path: str, latency: float = None) -> Cassette | None:
+    """Start recording / replaying provider HTTP traffic ("off" uninstalls)."""
+    global _active, _patched
+    if mode == "off" or not path:
+        _active = None
+        return None
+    if not _patched:
+        _patch_httpx()
+        _patch_requests()
+        _patched = True
+    _active = Cassette(path, mode, settings.HTTP_CASSETTE_LATENCY if latency is None else latency)
+    if mode == "replay":
+        # Nothing reaches a provider → its limits don't apply; only `latency` adds delay
+        from utils.rate_limiter import rate_limiter, OPENAI_CHAT, OPENAI_IMAGES, TAVILY, WORDPRESS
+
+        for provider in (OPENAI_CHAT, OPENAI_IMAGES, TAVILY, WORDPRESS):
+            rate_limiter.configure(provider, 0)
+    print(f"📼 HTTP cassette {mode}: {path}")
+    return _active
+
+
+def active() -> Cassette | None:
+    return _active
@@ -0,0 +1,171 @@
+# utils/job_queue.py
+"""
+Persistent job queue for the service (service.py), backed by one SQLite table.
+
+- `enqueue` stores a job as "queued"; `claim` hands the oldest visible job to a
+  worker and hides it for `visibility_timeout` seconds (status "running").
+- A worker that is still busy keeps its jobs hidden with `extend`; if the process
+  dies, the lease runs out and the job becomes claimable again (counts as an attempt).
+- `fail` re-queues with exponential backoff (retry_delay × 2^(attempt-1)) until
+  `max_attempts` is reached, then the job is "failed". `complete` marks it "done".
+- Payload, result and per-stage timings are JSON columns.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+_COLUMNS = (
+    "id", "kind", "payload", "status", "attempts", "max_attempts", "created_at", "updated_at",
+    "visible_at", "worker", "result", "error", "timings",
+)
+
+
+class JobQueue:
+    def __init__(self, path: str, visibility_timeout: float = 900, max_attempts: int = 3, retry_delay: float = 30):
+        self.path = Path(path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " max_attempts INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " updated_at REAL NOT NULL,"
+                " visible_at REAL NOT NULL,"
+                " worker TEXT,"
+                " result TEXT,"
+                " error TEXT,"
+                " timings TEXT)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, visible_at)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _row(row) -> dict | None:
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        for field in ("payload", "result", "timings"):
+            job[field] = json.loads(job[field]) if job[field] else None
+        return job
+
+    def enqueue(self, kind: str, payload: dict, max_attempts: int = None) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO jobs (id, kind, payload, status, attempts, max_attempts, created_at, updated_at, visible_at) "
+                "VALUES (?, ?, ?, 'queued', 0, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), max_attempts or self.max_attempts, now, now, now),
+            )
+            db.commit()
+        return job_id
+
+    def claim(self, worker: str) -> dict | None:
+        """Oldest queued job (or running job whose lease expired), hidden for visibility_timeout."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            # Expired leases that already used their last attempt will never succeed
+            db.execute(
+                "UPDATE jobs SET status = 'failed', updated_at = ?, "
+                " error = COALESCE(error, '') || ' [visibility timeout expired]' "
+                "WHERE status = 'running' AND visible_at <= ? AND attempts >= max_attempts",
+                (now, now),
+            )
+            row = db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs "
+                "WHERE status IN ('queued', 'running') AND visible_at <= ? "
+                "ORDER BY created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                db.commit()
+                return None
+            job = self._row(row)
+            db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                " visible_at = ?, updated_at = ? WHERE id = ?",
+                (worker, now + self.visibility_timeout, now, job["id"]),
+            )
+            db.commit()
+        job.update(status="running", attempts=job["attempts"] + 1, worker=worker)
+        return job
+
+    def extend(self, job_id: str):
+        """Keep a running job hidden for another visibility_timeout."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE jobs SET visible_at = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+                (now + self.visibility_timeout, now, job_id),
+            )
+            db.commit()
+
+    def complete(self, job_id: str, result: dict = None, timings: dict = None):
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, timings = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), json.dumps(timings), now, job_id),
+            )
+            db.commit()
+
+    def fail(self, job_id: str, error: str, timings: dict = None) -> str:
+        """Re-queue with backoff, or mark failed after max_attempts. Returns the new status."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            attempts, max_attempts = db.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            status = "queued" if attempts < max_attempts else "failed"
+            delay = self.retry_delay * 2 ** (attempts - 1)
+            db.execute(
+                "UPDATE jobs SET status = ?, error = ?, timings = ?, visible_at = ?, updated_at = ? WHERE id = ?",
+                (status, error, json.dumps(timings), now + delay, now, job_id),
+            )
+            db.commit()
+        return status
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._db().execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def list(self, status: str = None, limit: int = 50) -> list[dict]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._lock:
+            rows = self._db().execute(query, params + (limit,)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
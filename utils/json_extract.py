@@ -0,0 +1,87 @@
+# utils/json_extract.py
+"""
+Pull JSON objects out of free-form LLM output.
+
+One left-to-right pass over the text:
+- tracks string / escape state, so braces inside strings (HTML, code samples) don't count
+- records every balanced {...} span; the outermost ones are the candidates
+- an unmatched "{" in prose is simply dropped at the end, objects after it still count
+
+Candidates inside ```json fences are tried first, then ranked by how many of the
+required keys they contain.
+"""
+
+import json
+import re
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?[ \t]*\n?(.*?)```", re.DOTALL)
+
+
+def iter_object_spans(text: str) -> list[tuple[int, int]]:
+    """(start, end) of every outermost balanced {...} in `text` (end exclusive), in order."""
+    spans = []
+    stack = []
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == "{":
+            stack.append(i)
+        elif ch == "}":
+            if stack:
+                spans.append((stack.pop(), i + 1))
+        elif ch == '"' and stack:
+            in_string = True
+
+    # Completed spans are appended inner-first → keep only those not inside another one
+    outer = []
+    for start, end in sorted(spans, key=lambda s: (s[0], -s[1])):
+        if not outer or start >= outer[-1][1]:
+            outer.append((start, end))
+    return outer
+
+
+def json_candidates(text: str) -> list[str]:
+    """Candidate JSON object strings: fenced blocks first, then the rest of the text."""
+    fenced = [m.group(1) for m in _FENCE_RE.finditer(text)]
+    candidates = []
+    for chunk in fenced + [_FENCE_RE.sub(" ", text)]:
+        candidates += [chunk[start:end] for start, end in iter_object_spans(chunk)]
+    return candidates
+
+
+def extract_json_object(text, required_keys=()) -> dict | None:
+    """
+    Best JSON object found in `text`: the first (fenced first) candidate with every
+    required key, else the one with the most required keys. None if nothing parses
+    or no candidate has any of the required keys.
+    """
+    if isinstance(text, dict):
+        return text
+
+    required_keys = tuple(required_keys)
+    best, best_score = None, 0
+    for candidate in json_candidates(str(text)):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(data, dict):
+            continue
+        if not required_keys:
+            return data
+        score = sum(k in data for k in required_keys)
+        if score == len(required_keys):
+            return data
+        if score > best_score:
+            best, best_score = data, score
+    return best
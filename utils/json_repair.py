@@ -0,0 +1,175 @@
+# utils/json_repair.py
+"""
+Repair malformed JSON from LLM output instead of re-running the crew.
+
+1. extract_json_object (normal parse)
+2. lenient_fix: one pass over the text that
+   - escapes raw newlines / tabs and stray double quotes inside strings
+     (typical in content_html)
+   - drops trailing commas before } and ]
+   - closes a truncated tail (open string, dangling comma / colon, open brackets)
+3. only if still nothing parses: one small "fix this JSON" LLM request with just
+   the broken JSON (JSON_REPAIR_WITH_LLM), still far cheaper than planner + writer again
+"""
+
+import re
+
+from config.settings import settings
+from utils.json_extract import extract_json_object
+
+_OBJECT_START_RE = re.compile(r'\{\s*"')
+_NEXT_RE = re.compile(r"\s*(\S?)")
+_VALUE_START = set('"{[-0123456789tfn')
+
+
+def _closes_string(src: str, i: int, stack: list[str]) -> bool:
+    """Is the quote at src[i] the end of the string, or a stray quote inside it?"""
+    m = _NEXT_RE.match(src, i + 1)
+    nxt = m.group(1)
+    if nxt in ("", ":", "}", "]"):
+        return True
+    if nxt != ",":
+        return False
+    after = _NEXT_RE.match(src, m.end()).group(1)
+    if stack and stack[-1] == "}":
+        # Inside an object a comma must be followed by the next key
+        return after in ("", '"', "}")
+    return after == "" or after in _VALUE_START or after == "]"
+
+
+def _strip_trailing(out: list[str], chars: str):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] in chars:
+        out.pop()
+
+
+def lenient_fix(text: str) -> str | None:
+    """Best-effort repaired JSON object string starting at the first '{"' (None if there is none)."""
+    m = _OBJECT_START_RE.search(text)
+    if not m:
+        return None
+    src = text[m.start():]
+
+    out = []
+    stack = []
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(src):
+        if in_string:
+            if escaped:
+                escaped = False
+                out.append(ch)
+            elif ch == "\\":
+                escaped = True
+                out.append(ch)
+            elif ch == '"':
+                if _closes_string(src, i, stack):
+                    in_string = False
+                    out.append(ch)
+                else:
+                    out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\r":
+                out.append("\\r")
+            elif ch == "\t":
+                out.append("\\t")
+            else:
+                out.append(ch)
+            continue
+
+        if ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            _strip_trailing(out, ",")
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                break
+            continue
+        elif ch == '"':
+            in_string = True
+        out.append(ch)
+    else:
+        # Truncated output: close whatever is still open
+        if in_string:
+            if escaped:
+                out.pop()
+            out.append('"')
+        _strip_trailing(out, ",")
+        if out and out[-1] == ":":
+            out.append("null")
+        out += reversed(stack)
+
+    return "".join(out)
+
+
+def _llm_fix(broken: str, required_keys) -> str:
+    from llm_factory import get_llm_for
+    from llm_metrics import metrics
+
+    keys = ", ".join(required_keys) or "the original keys"
+    metrics.register_call(label="JSON repair")
+    return get_llm_for("json_repair").call([
+        {
+            "role": "system",
+            "content": "You fix malformed JSON. Reply with the corrected JSON object only, no code fences, no commentary.",
+        },
+        {
+            "role": "user",
+            "content": (
+                f"This JSON object (keys: {keys}) does not parse. Fix the syntax only: "
+                "escape quotes and newlines inside strings, remove trailing commas, close truncated "
+                f"strings/brackets. Do not rewrite or shorten any values.\n\n{broken}"
+            ),
+        },
+    ])
+
+
+def _complete(data, required_keys) -> bool:
+    return data is not None and all(k in data for k in required_keys)
+
+
+def parse_llm_json(output, required_keys=(), label: str = "LLM output", use_llm: bool = None) -> dict | None:
+    """
+    Parse JSON from agent output; repair locally, then via one small LLM request if no
+    object parses at all. Returns the best (possibly partial) object found, or None.
+    """
+    data = extract_json_object(output, required_keys)
+    if _complete(data, required_keys):
+        return data
+
+    fixed = lenient_fix(str(output))
+    if fixed is None:
+        return data
+    repaired = extract_json_object(fixed, required_keys)
+    if _complete(repaired, required_keys):
+        print(f"🩹 Repaired malformed JSON in {label} locally.")
+        return repaired
+    data = data or repaired
+    if data is not None:
+        # Valid JSON that only lacks keys: the caller's fallbacks fill those in
+        return data
+
+    use_llm = settings.JSON_REPAIR_WITH_LLM if use_llm is None else use_llm
+    if not use_llm:
+        return None
+
+    print(f"🩹 Asking the LLM to fix malformed JSON in {label}...")
+    try:
+        response = str(_llm_fix(fixed, required_keys))
+    except Exception as e:
+        print(f"⚠️ JSON repair request failed: {e}")
+        return data
+
+    repaired = extract_json_object(response, required_keys)
+    if not _complete(repaired, required_keys):
+        retry = lenient_fix(response)
+        repaired = extract_json_object(retry, required_keys) if retry else repaired
+    if _complete(repaired, required_keys):
+        print(f"🩹 Repaired malformed JSON in {label} via LLM.")
+        return repaired
+    return repaired
@@ -0,0 +1,86 @@
+# utils/kv_cache.py
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SQLiteCache:
+    """
+    Small persistent key → text cache backed by one SQLite table.
+
+    - Each row carries its own expiry (`ttl_seconds` per `set`, 0 = never expires)
+    - Once the table holds more than `max_entries`, least recently used rows are evicted
+    - Safe to share between threads (one connection guarded by a lock)
+    """
+
+    def __init__(self, path: str, table: str, max_entries: int = 0):
+        self.path = Path(path)
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{self.table}_access ON {self.table}(last_access)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, max_age_seconds: int = 0):
+        """
+        Return the cached value, or None when missing/expired. `max_age_seconds` > 0
+        additionally ignores rows written longer ago than that (the row is kept).
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                f"SELECT value, expires_at, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] and row[1] < now:
+                db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                db.commit()
+                return None
+            if max_age_seconds > 0 and row[2] < now - max_age_seconds:
+                return None
+            db.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            db.commit()
+            return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: int = 0):
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds > 0 else 0
+        with self._lock:
+            db = self._db()
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, expires_at, now),
+            )
+            self._evict(db, now)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        db.execute(f"DELETE FROM {self.table} WHERE expires_at > 0 AND expires_at < ?", (now,))
+        if self.max_entries > 0:
+            db.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
@@ -0,0 +1,44 @@
+# utils/lazy_registry.py
+"""
+Build-on-first-use registry for the expensive pipeline objects (agents, CrewAI tools).
+
+Entries are "module:factory" strings, so importing a registry imports nothing heavy;
+the factory's module (and whatever it pulls in: crewai, openai, tavily, ...) is loaded
+the first time `get(name)` is called. Each object is built once and then shared.
+"""
+
+import importlib
+import threading
+
+
+class LazyRegistry:
+    def __init__(self, entries: dict[str, str]):
+        self._entries = dict(entries)
+        self._built: dict[str, object] = {}
+        self._lock = threading.RLock()  # factories may `get` other entries
+
+    def get(self, name: str):
+        obj = self._built.get(name)
+        if obj is not None:
+            return obj
+        if name not in self._entries:
+            raise KeyError(f"Unknown entry '{name}' (known: {', '.join(self._entries)})")
+        with self._lock:
+            if name not in self._built:
+                module_name, factory = self._entries[name].split(":")
+                self._built[name] = getattr(importlib.import_module(module_name), factory)()
+            return self._built[name]
+
+    def built(self) -> list[str]:
+        return list(self._built)
+
+    def module_getattr(self, *names: str):
+        """
+        A module-level `__getattr__` (PEP 562) serving `names` from the registry, so
+        `from agents.topic_scout import topic_scout` keeps working and builds lazily.
+        """
+        def __getattr__(attr):
+            if attr in names:
+                return self.get(attr)
+            raise AttributeError(attr)
+        return __getattr__
@@ -0,0 +1,125 @@
+# utils/rate_limiter.py
+
+import threading
+import time
+
+from config.settings import settings
+
+# Provider names used across the pipeline
+OPENAI_CHAT = "openai_chat"
+OPENAI_IMAGES = "openai_images"
+TAVILY = "tavily"
+WORDPRESS = "wordpress"
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` tokens per second.
+
+    `reserve()` never sleeps: it books the tokens (the balance may go negative)
+    and returns how long the caller must wait. The caller sleeps OUTSIDE the lock,
+    so other threads keep reserving against other buckets in the meantime, and
+    waiters are served in the order they reserved.
+    A limit of 0 (or less) disables the bucket.
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.per_minute = float(per_minute)
+        self.capacity = max(self.per_minute, 0.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Book `amount` tokens and return the seconds to wait before using them."""
+        if not self.enabled or amount <= 0:
+            return 0.0
+
+        # A single request bigger than the whole bucket would wait forever otherwise
+        amount = min(float(amount), self.capacity)
+        rate_per_sec = self.per_minute / 60.0
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate_per_sec)
+            self._updated = now
+
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / rate_per_sec
+
+
+class ProviderLimiter:
+    """Request-per-minute and token-per-minute budget for one provider."""
+
+    def __init__(self, name: str, rpm: float, tpm: float = 0, clock=time.monotonic, sleep=time.sleep):
+        self.name = name
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self._sleep = sleep
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request (and `tokens` tokens) may be sent. Returns seconds waited."""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            if wait >= 1:
+                print(f"⏳ Rate limit ({self.name}): waiting {wait:.1f}s to avoid 429...")
+            self._sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Registry of per-provider limiters shared by every thread in the process."""
+
+    def __init__(self):
+        self._providers: dict[str, ProviderLimiter] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, provider: str, rpm: float, tpm: float = 0) -> ProviderLimiter:
+        with self._lock:
+            limiter = ProviderLimiter(provider, rpm, tpm)
+            self._providers[provider] = limiter
+            return limiter
+
+    def get(self, provider: str) -> ProviderLimiter:
+        with self._lock:
+            limiter = self._providers.get(provider)
+            if limiter is None:
+                # Unknown providers are unlimited until configured
+                limiter = ProviderLimiter(provider, 0, 0)
+                self._providers[provider] = limiter
+            return limiter
+
+    def acquire(self, provider: str, tokens: int = 0) -> float:
+        return self.get(provider).acquire(tokens)
+
+
+def estimate_tokens(text) -> int:
+    """Rough token estimate (~4 chars per token) used for TPM budgeting."""
+    if text is None:
+        return 0
+    if isinstance(text, list):
+        return sum(estimate_tokens(m.get("content") if isinstance(m, dict) else m) for m in text)
+    return max(1, len(str(text)) // 4)
+
+
+def estimate_request_tokens(messages, max_tokens: int | None = None) -> int:
+    """
+    TPM cost of one chat request: prompt estimate + the completion budget, which
+    the provider counts against TPM as well (default OPENAI_CHAT_COMPLETION_TOKENS).
+    """
+    completion = max_tokens if max_tokens is not None else settings.OPENAI_CHAT_COMPLETION_TOKENS
+    return estimate_tokens(messages) + max(0, completion)
+
+
+rate_limiter = RateLimiter()
+rate_limiter.configure(OPENAI_CHAT, settings.OPENAI_CHAT_RPM, settings.OPENAI_CHAT_TPM)
+rate_limiter.configure(OPENAI_IMAGES, settings.OPENAI_IMAGES_RPM)
+rate_limiter.configure(TAVILY, settings.TAVILY_RPM)
+rate_limiter.configure(WORDPRESS, settings.WP_RPM)
@@ -0,0 +1,115 @@
+# utils/run_checkpoint.py
+"""
+Per-run checkpoints for the blog pipeline, so a failed run can be resumed
+(`python main.py --resume <run-id>`) without paying for finished stages again.
+
+data/runs/<run-id>/
+    run.json          manifest: run id, created, finished stages
+    topic.json        {"topic", "main_keyword"}
+    outline.txt       planner output
+    writer.json       parsed writer article JSON
+    diagrams.json     {"<idx>": {"description", "filename", "media_id", "media_url"}}
+    diagrams/         generated (optimized) diagram bytes, one file per placeholder
+    post.json         WordPress response of the final post
+    featured_media.json, post_request.json, featured_set.json
+                      publish_from_json steps of a service publish job
+
+Every file is written to a temp file first and swapped in with os.replace,
+so a killed process never leaves a half-written checkpoint behind.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from config.settings import settings
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class RunCheckpoint:
+    def __init__(self, run_id: str = None, root: str = None):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.dir = Path(root or settings.RUNS_DIR) / self.run_id
+        self._lock = threading.Lock()
+
+    @classmethod
+    def resume(cls, run_id: str, root: str = None) -> "RunCheckpoint":
+        run = cls(run_id, root)
+        if not run.dir.exists():
+            raise FileNotFoundError(f"No checkpoints for run '{run_id}' in {run.dir.parent}")
+        return run
+
+    # ---------- manifest ----------
+
+    def _manifest(self) -> dict:
+        path = self.dir / "run.json"
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+        return {"run_id": self.run_id, "created": datetime.now().isoformat(timespec="seconds"), "stages": {}}
+
+    def _mark(self, stage: str):
+        manifest = self._manifest()
+        manifest["stages"][stage] = datetime.now().isoformat(timespec="seconds")
+        _write_atomic(self.dir / "run.json", json.dumps(manifest, indent=2).encode("utf-8"))
+
+    def stages(self) -> list[str]:
+        return list(self._manifest()["stages"])
+
+    # ---------- JSON / text stages ----------
+
+    def load_json(self, stage: str):
+        path = self.dir / f"{stage}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def save_json(self, stage: str, data):
+        with self._lock:
+            _write_atomic(self.dir / f"{stage}.json", json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+            self._mark(stage)
+
+    def load_text(self, stage: str) -> str | None:
+        path = self.dir / f"{stage}.txt"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def save_text(self, stage: str, text: str):
+        with self._lock:
+            _write_atomic(self.dir / f"{stage}.txt", text.encode("utf-8"))
+            self._mark(stage)
+
+    # ---------- diagrams (called from the image worker threads) ----------
+
+    def get_diagram(self, idx: int, description: str) -> dict | None:
+        """
+        Checkpointed diagram for placeholder `idx`: {"description", "filename", "media_id",
+        "media_url", "data"} (data = bytes or None). None if nothing was saved for it.
+        """
+        with self._lock:
+            entry = (self.load_json("diagrams") or {}).get(str(idx))
+        if not entry or entry.get("description") != description:
+            return None
+        path = self.dir / "diagrams" / entry["filename"]
+        return {**entry, "data": path.read_bytes() if path.exists() else None}
+
+    def save_diagram(self, idx: int, description: str, filename: str, data=None,
+                     media_id: int | None = None, media_url: str | None = None):
+        if data is not None:
+            _write_atomic(self.dir / "diagrams" / filename, bytes(data))
+        with self._lock:
+            diagrams = self.load_json("diagrams") or {}
+            diagrams[str(idx)] = {
+                "description": description,
+                "filename": filename,
+                "media_id": media_id,
+                "media_url": media_url,
+            }
+            _write_atomic(self.dir / "diagrams.json", json.dumps(diagrams, ensure_ascii=False, indent=2).encode("utf-8"))
+            self._mark("diagrams")
@@ -0,0 +1,258 @@
+# utils/tracing.py
+"""
+Lightweight span tracing for the pipeline, exported as JSONL (one span per line).
+
+Span fields follow OTLP naming (trace_id, span_id, parent_span_id,
+start/end_time_unix_nano, attributes, status), so a run can be converted to
+OTLP/Jaeger later, but nothing beyond the standard library is needed.
+
+    with tracer.span("web_search", query=query) as span:
+        ...
+        span.set(results=len(results))
+
+Nesting follows contextvars only, so spans opened in worker threads need the
+context copied in (`pool.submit(contextvars.copy_context().run, fn, ...)`); CrewAI
+does this itself for its agent, task and tool threads. There is deliberately no
+process-wide fallback parent: with concurrent traces (batch, service jobs) it
+would attach a thread's spans to whichever trace started last. A span opened
+without a current span starts its own trace.
+
+CLI (waterfall + critical path of a recorded run):
+    python -m utils.tracing data/runs/<run-id>/trace.jsonl
+    python -m utils.tracing <run-id>
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "OK"
+        self.status_message = ""
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+            "thread": threading.current_thread().name,
+        }
+
+
+class Tracer:
+    def __init__(self):
+        self.path: Path | None = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def configure(self, path):
+        """Start exporting spans to `path` (JSONL, appended). None disables export."""
+        self.path = Path(path) if path else None
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def add_listener(self, fn):
+        """Call `fn(span)` for every finished span (even when no export path is configured)."""
+        self._listeners.append(fn)
+
+    def current(self) -> Span | None:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, new_trace: bool = False, **attributes):
+        """`new_trace=True` starts a separate trace (e.g. one per service job) instead of nesting."""
+        parent = None if new_trace else self.current()
+        span = Span(name, parent.trace_id if parent else _new_id(16), parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "ERROR"
+            span.status_message = f"{e.__class__.__name__}: {e}"[:300]
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span: Span):
+        for fn in self._listeners:
+            fn(span)
+        if self.path is None:
+            return
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def traced(self, name: str):
+        """Decorator: run the function inside a span called `name`."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def trace_task(self, task, name: str):
+        """Wrap a CrewAI Task so each execution becomes a span (Task objects are pydantic models)."""
+        execute_sync = task.execute_sync
+
+        def traced(*args, **kwargs):
+            with self.span(f"task: {name}", agent=getattr(task.agent, "role", "")) as span:
+                output = execute_sync(*args, **kwargs)
+                span.set(output_chars=len(str(getattr(output, "raw", output) or "")))
+                return output
+
+        object.__setattr__(task, "execute_sync", traced)
+        return task
+
+
+tracer = Tracer()
+
+
+# ---------- CLI: waterfall + critical path ----------
+
+def load_spans(path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _children_index(spans: list[dict]) -> dict:
+    children = {}
+    for s in spans:
+        children.setdefault(s["parent_span_id"], []).append(s)
+    for kids in children.values():
+        kids.sort(key=lambda s: s["start_time_unix_nano"])
+    return children
+
+
+def _duration(span: dict) -> float:
+    return (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e9
+
+
+def critical_path(span: dict, children: dict) -> list[dict]:
+    """
+    Spans that determine when `span` finishes: walking back from its end, take the
+    child that ends last, then the one that ends before that child started, ...
+    """
+    chain = []
+    cursor = span["end_time_unix_nano"]
+    for child in sorted(children.get(span["span_id"], []), key=lambda s: -s["end_time_unix_nano"]):
+        if child["end_time_unix_nano"] <= cursor:
+            chain.append(child)
+            cursor = child["start_time_unix_nano"]
+    path = [span]
+    for child in reversed(chain):
+        path += critical_path(child, children)
+    return path
+
+
+def _label(span: dict) -> str:
+    attrs = span.get("attributes") or {}
+    extras = [f"{k}={v}" for k, v in attrs.items() if k in ("idx", "status_code", "bytes", "tokens", "results", "cache")]
+    flag = " ❌" if span["status"]["code"] == "ERROR" else ""
+    return span["name"] + (f" [{', '.join(extras)}]" if extras else "") + flag
+
+
+def format_waterfall(spans: list[dict], width: int = 40) -> str:
+    children = _children_index(spans)
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if s["parent_span_id"] not in ids]
+    t0 = min(s["start_time_unix_nano"] for s in spans)
+    t1 = max(s["end_time_unix_nano"] for s in spans)
+    total = max(t1 - t0, 1)
+
+    lines = []
+
+    def walk(span, depth):
+        start = int((span["start_time_unix_nano"] - t0) / total * width)
+        length = max(1, int((span["end_time_unix_nano"] - span["start_time_unix_nano"]) / total * width))
+        bar = " " * start + "█" * min(length, width - start)
+        lines.append(f"{bar:<{width}} {_duration(span):8.2f}s  {'  ' * depth}{_label(span)}")
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["start_time_unix_nano"]):
+        walk(root, 0)
+    return "\n".join(lines)
+
+
+def _busy_seconds(spans: list[dict]) -> float:
+    """Wall time covered by `spans` (overlapping children, e.g. parallel diagrams, count once)."""
+    busy, end = 0, None
+    for s in sorted(spans, key=lambda s: s["start_time_unix_nano"]):
+        start = s["start_time_unix_nano"] if end is None else max(s["start_time_unix_nano"], end)
+        if s["end_time_unix_nano"] > start:
+            busy += s["end_time_unix_nano"] - start
+        end = s["end_time_unix_nano"] if end is None else max(end, s["end_time_unix_nano"])
+    return busy / 1e9
+
+
+def format_critical_path(spans: list[dict]) -> str:
+    children = _children_index(spans)
+    ids = {s["span_id"] for s in spans}
+    roots = [s for s in spans if s["parent_span_id"] not in ids]
+    lines = []
+    for root in sorted(roots, key=lambda s: s["start_time_unix_nano"]):
+        for span in critical_path(root, children):
+            self_time = max(0.0, _duration(span) - _busy_seconds(children.get(span["span_id"], [])))
+            lines.append(f"{_duration(span):8.2f}s  (self {self_time:6.2f}s)  {_label(span)}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m utils.tracing <trace.jsonl | run-id>")
+        return 1
+    path = Path(argv[0])
+    if not path.exists():
+        from config.settings import settings
+
+        path = Path(settings.RUNS_DIR) / argv[0] / "trace.jsonl"
+    spans = [s for s in load_spans(path) if s.get("end_time_unix_nano")]
+    if not spans:
+        print(f"No spans in {path}")
+        return 1
+
+    print(f"========== WATERFALL ({path}) ==========")
+    print(format_waterfall(spans))
+    print("\n========== CRITICAL PATH ==========")
+    print(format_critical_path(spans))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# utils/vector_math.py
+
+import numpy as np
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row (float32). All-zero rows stay zero."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_cosine(matrix: np.ndarray, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Brute-force cosine top-k for a batch of queries.
+
+    `matrix` (n × d) and `queries` (q × d) must already be L2-normalized, so cosine
+    similarity is a single matrix product. Returns (indices, scores), both q × k,
+    best match first. argpartition keeps selection O(n) per query.
+    """
+    queries = np.atleast_2d(queries)
+    n = matrix.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        empty = np.empty((queries.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+
+    scores = queries @ matrix.T
+    if k < n:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(n), (queries.shape[0], n)).copy()
+    top_scores = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(top_scores, order, axis=1)